@@ -1,91 +1,231 @@
 """Integration with Google Gemini for PSI performance reports."""
 from __future__ import annotations
 
+import asyncio
+import base64
+import hashlib
 import json
 import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from contextlib import AsyncExitStack
 from datetime import datetime
 from decimal import Decimal
 from textwrap import dedent
-from typing import Any, Iterable, Mapping, MutableMapping
+from typing import Any, AsyncIterator, Awaitable, Callable, Iterable, Iterator, Mapping, MutableMapping, Optional
 
 from dotenv import load_dotenv
 
 load_dotenv()
 
-try:  # pragma: no cover - optional dependency during local testing
-    import google.generativeai as google_genai
-    from google.generativeai.types import BlockedPromptException
-except Exception:  # pragma: no cover - fallback when SDK is unavailable
-    google_genai = None  # type: ignore[assignment]
-
-    class BlockedPromptException(Exception):
-        """Placeholder exception when Gemini SDK is not installed."""
-
 from pydantic import BaseModel, Field, ValidationError, conint
 
+import gemini_files
+import gemini_limiter
+import gemini_resilience
+import json_stream
+import report_cache
+import storage
+
 
 API_KEY = os.getenv("GOOGLE_API_KEY") or os.getenv("GEMINI_API_KEY")
 MODEL_NAME = os.getenv("GEMINI_MODEL", "gemini-2.0-flash")
 
-MODEL = None
-if google_genai and API_KEY:  # pragma: no branch - simple initialization guard
-    google_genai.configure(api_key=API_KEY)
-    MODEL = google_genai.GenerativeModel(
-        model_name=MODEL_NAME,
-        generation_config=google_genai.GenerationConfig(
-            temperature=0.4,
-            top_p=0.8,
-            max_output_tokens=1024,
-            response_mime_type="application/json",
-            response_schema={
+PSI_GENERATION_CONFIG: dict[str, Any] = {
+    "temperature": 0.4,
+    "top_p": 0.8,
+    "max_output_tokens": 1024,
+    "response_mime_type": "application/json",
+    "response_schema": {
+        "type": "object",
+        "properties": {
+            "scores": {
                 "type": "object",
                 "properties": {
-                    "scores": {
-                        "type": "object",
-                        "properties": {
-                            "presence": {"type": "integer"},
-                            "skill": {"type": "integer"},
-                            "intent": {"type": "integer"},
-                            "psi": {"type": "number"},
-                        },
-                        "required": ["presence", "skill", "intent"],
-                    },
-                    "player_evaluation": {"type": "string"},
-                    "player_strengths": {
-                        "type": "array",
-                        "items": {"type": "string"},
-                    },
-                    "player_weaknesses": {
-                        "type": "array",
-                        "items": {"type": "string"},
-                    },
-                    "actions_strengths": {
-                        "type": "array",
-                        "items": {"type": "string"},
-                    },
-                    "actions_weaknesses": {
-                        "type": "array",
-                        "items": {"type": "string"},
-                    },
-                    "course_forward": {"type": "string"},
-                    "summary_bullets": {
-                        "type": "array",
-                        "items": {"type": "string"},
-                    },
+                    "presence": {"type": "integer"},
+                    "skill": {"type": "integer"},
+                    "intent": {"type": "integer"},
+                    "psi": {"type": "number"},
                 },
-                "required": [
-                    "scores",
-                    "player_evaluation",
-                    "player_strengths",
-                    "player_weaknesses",
-                    "actions_strengths",
-                    "actions_weaknesses",
-                    "course_forward",
-                    "summary_bullets",
-                ],
+                "required": ["presence", "skill", "intent"],
             },
-        ),
-    )
+            "player_evaluation": {"type": "string"},
+            "player_strengths": {
+                "type": "array",
+                "items": {"type": "string"},
+            },
+            "player_weaknesses": {
+                "type": "array",
+                "items": {"type": "string"},
+            },
+            "actions_strengths": {
+                "type": "array",
+                "items": {"type": "string"},
+            },
+            "actions_weaknesses": {
+                "type": "array",
+                "items": {"type": "string"},
+            },
+            "course_forward": {"type": "string"},
+            "summary_bullets": {
+                "type": "array",
+                "items": {"type": "string"},
+            },
+        },
+        "required": [
+            "scores",
+            "player_evaluation",
+            "player_strengths",
+            "player_weaknesses",
+            "actions_strengths",
+            "actions_weaknesses",
+            "course_forward",
+            "summary_bullets",
+        ],
+    },
+}
+
+VIDEO_MAX_OUTPUT_TOKENS = 8192
+
+VIDEO_GENERATION_CONFIG: dict[str, Any] = {
+    "temperature": 0.4,
+    "top_p": 0.8,
+    "max_output_tokens": VIDEO_MAX_OUTPUT_TOKENS,
+    "response_mime_type": "application/json",
+}
+
+# Structured output emits schema properties in alphabetical order, which would
+# stream the scores second to last. Streamed PSI reports instead describe the
+# object in the prompt, as the video prompts do, so the keys come in the order
+# a coach reads them.
+PSI_STREAM_GENERATION_CONFIG: dict[str, Any] = {
+    key: value for key, value in PSI_GENERATION_CONFIG.items() if key != "response_schema"
+}
+
+# Generation setups by name; a name stands for its config and response schema
+PSI = "psi"
+PSI_STREAM = "psi_stream"
+VIDEO = "video"
+GENERATION_CONFIGS: dict[str, dict[str, Any]] = {
+    PSI: PSI_GENERATION_CONFIG,
+    PSI_STREAM: PSI_STREAM_GENERATION_CONFIG,
+    VIDEO: VIDEO_GENERATION_CONFIG,
+}
+
+PREWARM = os.getenv("GEMINI_PREWARM", "true").lower() == "true"
+MODEL_REGISTRY_SIZE = int(os.getenv("GEMINI_MODEL_REGISTRY_SIZE", "256"))
+
+
+class BlockedPromptException(Exception):
+    """Placeholder exception when Gemini SDK is not installed."""
+
+
+# The Gemini SDK takes longer to import than the rest of the app together, so
+# it is loaded and configured on first use rather than at import time.
+_sdk_lock = threading.Lock()
+_sdk_loaded = False
+_google_genai: Any = None
+
+
+def _sdk() -> Any:
+    """The configured ``google.generativeai`` module, or None when unavailable."""
+    global _sdk_loaded, _google_genai
+    if not _sdk_loaded:
+        with _sdk_lock:
+            if not _sdk_loaded:
+                try:  # pragma: no cover - optional dependency during local testing
+                    import google.generativeai as google_genai
+                except Exception:  # pragma: no cover - fallback when SDK is unavailable
+                    google_genai = None
+                if google_genai is not None and API_KEY:
+                    google_genai.configure(api_key=API_KEY)
+                _google_genai = google_genai
+                _sdk_loaded = True
+    return _google_genai
+
+
+class ModelRegistry:
+    """Configured ``GenerativeModel`` objects, built once per distinct setup.
+
+    Models are keyed by model name, generation setup and system instruction,
+    so text and video calls and each coach's instructions get their own
+    model. They all share the SDK's default client, so a new instruction costs
+    one small object and no new connection. The least recently used models
+    beyond ``max_entries`` are dropped.
+    """
+
+    def __init__(self, max_entries: int = MODEL_REGISTRY_SIZE) -> None:
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._models: OrderedDict[tuple[str, str, str | None], Any] = OrderedDict()
+        self._counters = {"hits": 0, "misses": 0, "evictions": 0}
+
+    def get(self, setup: str = PSI, system_instruction: str | None = None, model_name: str = MODEL_NAME) -> Any:
+        """The model for ``setup``, or None when Gemini is not configured."""
+        key = (model_name, setup, (system_instruction or "").strip() or None)
+        with self._lock:
+            model = self._models.get(key)
+            if model is not None:
+                self._models.move_to_end(key)
+                self._counters["hits"] += 1
+                return model
+
+        google_genai = _sdk()
+        if google_genai is None or not API_KEY:
+            return None
+        model = google_genai.GenerativeModel(
+            model_name=model_name,
+            generation_config=google_genai.GenerationConfig(**GENERATION_CONFIGS[setup]),
+            system_instruction=key[2],
+        )
+        with self._lock:
+            # Another thread may have built the same model meanwhile; keep one.
+            model = self._models.setdefault(key, model)
+            self._models.move_to_end(key)
+            self._counters["misses"] += 1
+            while len(self._models) > self.max_entries:
+                self._models.popitem(last=False)
+                self._counters["evictions"] += 1
+        return model
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {**self._counters, "models": len(self._models), "max_entries": self.max_entries}
+
+
+MODELS = ModelRegistry()
+
+
+def get_model(setup: str = PSI, system_instruction: str | None = None) -> Any:
+    """A configured model from :data:`MODELS`; None when Gemini is not configured."""
+    if not API_KEY:
+        return None
+    return MODELS.get(setup, system_instruction)
+
+
+async def get_model_async(setup: str = PSI, system_instruction: str | None = None) -> Any:
+    """:func:`get_model` without blocking the event loop on the first SDK import."""
+    if _sdk_loaded or not API_KEY:
+        return get_model(setup, system_instruction)
+    return await asyncio.to_thread(get_model, setup, system_instruction)
+
+
+def prewarm() -> None:
+    """Load the SDK and model in a worker thread so the first report does not wait."""
+    if PREWARM and API_KEY:
+        asyncio.get_running_loop().run_in_executor(None, get_model)
+
+
+def _report_errors() -> tuple[type[BaseException], ...]:
+    google_genai = _sdk()
+    blocked = google_genai.types.BlockedPromptException if google_genai is not None else BlockedPromptException
+    return (blocked, ValidationError, json.JSONDecodeError, AttributeError, TypeError)
+
+
+def _degraded_errors() -> tuple[type[BaseException], ...]:
+    return (*_report_errors(), gemini_resilience.Unavailable)
 
 
 PSI_WEIGHTS = {
@@ -133,6 +273,34 @@ Instructions:
 8. IMPORTANT: Factor in the athlete's level ({player_level}) and gender ({player_gender}) when evaluating performance. Tailor your feedback, expectations, and recommended drills to their specific level and consider any gender-specific physical or tactical considerations in badminton training.
 """
 
+PSI_STREAM_FORMAT = """
+Schema (write the keys in exactly this order):
+{
+  "scores": {"presence": <0-10>, "skill": <0-10>, "intent": <0-10>, "psi": <weighted average>},
+  "player_evaluation": "<at most 100 words>",
+  "player_strengths": ["...", ...],
+  "player_weaknesses": ["...", ...],
+  "actions_strengths": ["...", ...],
+  "actions_weaknesses": ["...", ...],
+  "course_forward": "<at most 300 words>",
+  "summary_bullets": ["<five bullets>", ...]
+}
+"""
+
+# Top-level report fields in the order a streamed report sends them
+PSI_REPORT_FIELDS = (
+    "scores",
+    "player_evaluation",
+    "player_strengths",
+    "player_weaknesses",
+    "actions_strengths",
+    "actions_weaknesses",
+    "course_forward",
+    "summary_bullets",
+)
+# Name of the last item yielded by :func:`stream_psi_report`
+REPORT = "report"
+
 
 class Scores(BaseModel):
     presence: conint(ge=0, le=10)
@@ -150,6 +318,9 @@ class PSIReport(BaseModel):
     actions_weaknesses: list[str] = Field(default_factory=list)
     course_forward: str
     summary_bullets: list[str] = Field(default_factory=list)
+    # Set on fallback reports written without Gemini; regenerate them later
+    degraded: bool = False
+    degraded_reason: str | None = None
 
     def weighted_psi(self) -> float:
         weighted = (
@@ -222,9 +393,214 @@ def generate_feedback(evaluation: Any, player: Any | None = None) -> str:
     return generate_psi_report(evaluation, player=player).formatted()
 
 
-def generate_psi_report(evaluation: Any, player: Any | None = None) -> PSIReport:
-    """Create a PSI report using Gemini or a deterministic fallback."""
+def formatted_report(payload: Mapping[str, Any]) -> str:
+    """Render the formatted text of a stored PSI report payload."""
+    return PSIReport.model_validate(payload).formatted()
+
+
+def generate_psi_report(
+    evaluation: Any,
+    player: Any | None = None,
+    force: bool = False,
+    lane: str = gemini_limiter.INTERACTIVE,
+    instructions: str | None = None,
+) -> PSIReport:
+    """Create a PSI report using Gemini or a deterministic fallback.
+
+    Reports are served from the persistent cache when the same notes, player
+    profile, model and generation config were seen before; ``force`` skips the
+    lookup and regenerates. ``lane`` is the rate limiter priority of the call.
+    ``instructions`` are the coach's standing AI instructions, passed to the
+    model as its system instruction.
+    """
+    prompt, evaluation_data = _build_psi_prompt(evaluation, player)
+
+    model = get_model(PSI, instructions)
+    if model is None:  # Gemini unavailable
+        return _fallback_report(evaluation_data)
+
+    key = _psi_cache_key(prompt, instructions)
+    if not force and (cached := report_cache.get(key)) is not None:
+        return PSIReport.model_validate(cached)
+
+    try:
+        response = gemini_resilience.call(
+            lambda timeout: _generate(model, prompt, lane, _psi_token_estimate(prompt), timeout)
+        )
+    except _degraded_errors() as exc:
+        return _fallback_report(evaluation_data, reason=str(exc))
+    report, valid = _report_from_response(response, evaluation_data)
+    if valid:
+        report_cache.put(key, MODEL_NAME, report.model_dump())
+    return report
+
+
+async def generate_psi_report_async(
+    evaluation: Any,
+    player: Any | None = None,
+    force: bool = False,
+    lane: str = gemini_limiter.INTERACTIVE,
+    instructions: str | None = None,
+) -> PSIReport:
+    """Async variant of :func:`generate_psi_report` that does not hold a thread."""
+    prompt, evaluation_data = _build_psi_prompt(evaluation, player)
+
+    model = await get_model_async(PSI, instructions)
+    if model is None:  # Gemini unavailable
+        return _fallback_report(evaluation_data)
+
+    key = _psi_cache_key(prompt, instructions)
+    if not force and (cached := await asyncio.to_thread(report_cache.get, key)) is not None:
+        return PSIReport.model_validate(cached)
+
+    try:
+        response = await gemini_resilience.call_async(
+            lambda timeout: _generate_async(model, prompt, lane, _psi_token_estimate(prompt), timeout)
+        )
+    except _degraded_errors() as exc:
+        return _fallback_report(evaluation_data, reason=str(exc))
+    report, valid = _report_from_response(response, evaluation_data)
+    if valid:
+        await asyncio.to_thread(report_cache.put, key, MODEL_NAME, report.model_dump())
+    return report
+
+
+async def stream_psi_report(
+    evaluation: Any,
+    player: Any | None = None,
+    force: bool = False,
+    lane: str = gemini_limiter.INTERACTIVE,
+    instructions: str | None = None,
+) -> AsyncIterator[tuple[str, Any]]:
+    """Generate a PSI report with a streamed Gemini call.
+
+    Yields ``(name, value)`` for each top-level report field as soon as its
+    JSON is complete, scores first, then ``(REPORT, PSIReport)`` once the whole
+    response has been validated. That final report is the one to store; the
+    fields before it are a preview. Cached and fallback reports are yielded
+    field by field straight away.
+    """
+    prompt, evaluation_data = _build_psi_prompt(evaluation, player)
+    prompt += PSI_STREAM_FORMAT
+
+    report = None
+    model = await get_model_async(PSI_STREAM, instructions)
+    key = _psi_cache_key(prompt, instructions, PSI_STREAM_GENERATION_CONFIG)
+    if model is None:  # Gemini unavailable
+        report = _fallback_report(evaluation_data)
+    elif not force and (cached := await asyncio.to_thread(report_cache.get, key)) is not None:
+        report = PSIReport.model_validate(cached)
+    if report is not None:
+        payload = report.as_dict()
+        for name in PSI_REPORT_FIELDS:
+            yield name, payload[name]
+        yield REPORT, report
+        return
+
+    parser = json_stream.FieldParser()
+    try:
+        async for text in _generate_stream_async(model, prompt, lane, _psi_token_estimate(prompt)):
+            for field in parser.feed(text):
+                yield field
+    except _degraded_errors() as exc:
+        yield REPORT, _fallback_report(evaluation_data, reason=str(exc))
+        return
+    report, valid = _report_from_text(parser.document, evaluation_data)
+    if valid:
+        await asyncio.to_thread(report_cache.put, key, MODEL_NAME, report.model_dump())
+    yield REPORT, report
+
+
+def _psi_cache_key(
+    prompt: str, instructions: str | None, config: Mapping[str, Any] = PSI_GENERATION_CONFIG
+) -> str:
+    if instructions and instructions.strip():
+        # Only keyed when set, so reports cached without instructions stay valid.
+        config = {**config, "system_instruction": instructions.strip()}
+    return report_cache.cache_key(MODEL_NAME, config, prompt)
+
+
+def _psi_token_estimate(prompt: str) -> int:
+    return gemini_limiter.estimate_tokens(prompt, PSI_GENERATION_CONFIG["max_output_tokens"])
+
+
+def _generate(model: Any, contents: Any, lane: str, tokens: int, timeout: float) -> Any:
+    """One rate-limited generation request, bounded by ``timeout`` once sent."""
+    with gemini_limiter.GENERATE.acquire(lane, tokens) as permit:
+        response = model.generate_content(contents, request_options={"timeout": timeout})
+        permit.record_usage(response)
+    return response
+
+
+async def _generate_async(model: Any, contents: Any, lane: str, tokens: int, timeout: float) -> Any:
+    async with gemini_limiter.GENERATE.acquire_async(lane, tokens) as permit:
+        response = await asyncio.wait_for(
+            model.generate_content_async(contents, request_options={"timeout": timeout}), timeout
+        )
+        permit.record_usage(response)
+    return response
+
+
+async def _generate_stream_async(
+    model: Any,
+    contents: Any,
+    lane: str,
+    tokens: int,
+    call_timeout: float = gemini_resilience.CALL_TIMEOUT_SECONDS,
+    deadline_seconds: float = gemini_resilience.DEADLINE_SECONDS,
+) -> AsyncIterator[str]:
+    """A rate-limited streamed generation, yielding text as it arrives.
+
+    Opening the stream and waiting for the first chunk is retried like any
+    other call. After that each chunk must arrive within ``call_timeout``. A
+    stream that breaks off is not retried, since its fields have already been
+    forwarded; a transient failure is raised as ``Unavailable``.
+    """
+    stack, permit, response, chunks, chunk = await gemini_resilience.call_async(
+        lambda timeout: _open_stream(model, contents, lane, tokens, timeout), call_timeout, deadline_seconds
+    )
+    try:
+        while chunk is not None:
+            yield _chunk_text(chunk)
+            chunk = await asyncio.wait_for(anext(chunks, None), call_timeout)
+        permit.record_usage(response)
+    except BaseException as exc:
+        # Hands the error to the limiter, so a 429 still pauses the queue.
+        await stack.__aexit__(type(exc), exc, exc.__traceback__)
+        if isinstance(exc, Exception) and gemini_resilience.is_transient(exc):
+            gemini_resilience.BREAKER.record_failure()
+            raise gemini_resilience.Unavailable(f"Gemini stream interrupted: {exc}") from exc
+        raise
+    await stack.aclose()
+
+
+async def _open_stream(model: Any, contents: Any, lane: str, tokens: int, timeout: float) -> tuple[Any, ...]:
+    """Start a streamed generation and wait for its first chunk, holding a limiter permit."""
+    stack = AsyncExitStack()
+    try:
+        permit = await stack.enter_async_context(gemini_limiter.GENERATE.acquire_async(lane, tokens))
+        response = await asyncio.wait_for(
+            model.generate_content_async(contents, stream=True, request_options={"timeout": timeout}), timeout
+        )
+        chunks = aiter(response)
+        first = await asyncio.wait_for(anext(chunks, None), timeout)
+    except BaseException as exc:
+        await stack.__aexit__(type(exc), exc, exc.__traceback__)
+        raise
+    return stack, permit, response, chunks, first
+
+
+def _chunk_text(chunk: Any) -> str:
+    # A chunk carrying only a finish reason or safety ratings has no text.
+    try:
+        return _response_text(chunk)
+    except (AttributeError, ValueError):
+        return ""
+
+
+def _build_psi_prompt(evaluation: Any, player: Any | None) -> tuple[str, dict[str, Any]]:
     evaluation_data = _extract_evaluation_data(evaluation)
+    notes = {key: value for key, value in evaluation_data.items() if key != "player_name"}
     player_name = getattr(player, "name", None) or evaluation_data.get("player_name") or "the athlete"
     player_level = getattr(player, "level", None) or "not specified"
     player_gender = getattr(player, "gender", None) or "not specified"
@@ -232,24 +608,31 @@ def generate_psi_report(evaluation: Any, player: Any | None = None) -> PSIReport
         player_name=player_name,
         player_level=player_level,
         player_gender=player_gender,
-        **evaluation_data
+        **notes
     )
+    return prompt, evaluation_data
 
-    if MODEL is None:  # Gemini unavailable
-        return _fallback_report(evaluation_data)
 
+def _report_from_response(response: Any, evaluation_data: Mapping[str, Any]) -> tuple[PSIReport, bool]:
+    """Parse a Gemini response; the flag is False when the fallback was used."""
     try:
-        response = MODEL.generate_content(prompt)
         raw_text = _response_text(response)
+    except _report_errors() as exc:
+        return _fallback_report(evaluation_data, reason=str(exc)), False
+    return _report_from_text(raw_text, evaluation_data)
+
+
+def _report_from_text(raw_text: str, evaluation_data: Mapping[str, Any]) -> tuple[PSIReport, bool]:
+    try:
         payload = json.loads(raw_text)
         normalised = _normalise_payload(payload, evaluation_data)
         report = PSIReport.model_validate(normalised)
-    except (BlockedPromptException, ValidationError, json.JSONDecodeError, AttributeError, TypeError) as exc:
-        return _fallback_report(evaluation_data, reason=str(exc))
+    except _report_errors() as exc:
+        return _fallback_report(evaluation_data, reason=str(exc)), False
 
     if report.scores.psi is None:
         report.scores.psi = report.weighted_psi()
-    return report
+    return report, True
 
 
 def _response_text(response: Any) -> str:
@@ -422,6 +805,8 @@ def _fallback_report(evaluation_data: Mapping[str, Any], reason: str | None = No
         actions_weaknesses=["Schedule a manual review session."],
         course_forward="AI insights are temporarily unavailable. Use the coach's notes to plan drills.",
         summary_bullets=["AI fallback response", "Review session manually", "Use coach insights", "Plan custom drills", "Monitor progress"],
+        degraded=True,
+        degraded_reason=reason or "Gemini API not configured",
     )
 
 
@@ -765,7 +1150,9 @@ class VideoAnalysisReport(BaseModel):
 def generate_video_analysis(
     video_analysis: Any,
     player: Any,
-    partner: Any | None = None
+    partner: Any | None = None,
+    on_status: Callable[[str], None] | None = None,
+    instructions: str | None = None,
 ) -> dict[str, Any]:
     """
     Generate AI analysis for uploaded video using Gemini Video API.
@@ -773,13 +1160,131 @@ def generate_video_analysis(
     For singles: Analyzes single player performance.
     For doubles: Analyzes both players individually + team dynamics.
 
+    ``on_status`` is called with ``"processing"`` once the upload to Gemini
+    has finished and generation starts. ``instructions`` are the coach's
+    standing AI instructions, passed to the model as its system instruction.
+
     Returns dict with analysis results.
     """
+    prompt, player_name, partner_name, game_format = _build_video_prompt(video_analysis, player, partner)
+
+    # Check if Gemini is available
+    model = get_model(VIDEO, instructions)
+    if model is None:
+        return _fallback_video_analysis(player_name, partner_name, game_format, "Gemini API not configured")
+
+    # Try to process video with Gemini
+    try:
+        video_file = _upload_video(getattr(video_analysis, "video_path", ""))
+
+        # Wait for processing
+        delays = _poll_delays()
+        while video_file.state.name == "PROCESSING":
+            time.sleep(next(delays))
+            video_file = _get_file(video_file.name)
+
+        if video_file.state.name == "FAILED":
+            raise Exception("Video processing failed")
+        if on_status:
+            on_status("processing")
+
+        # Generate analysis
+        response = gemini_resilience.call(
+            lambda timeout: _generate(
+                model, [video_file, prompt], gemini_limiter.VIDEO, _video_token_estimate(prompt), timeout
+            ),
+            gemini_resilience.VIDEO_CALL_TIMEOUT_SECONDS,
+            gemini_resilience.VIDEO_DEADLINE_SECONDS,
+        )
+        return _parse_video_response(_response_text(response), player_name, partner_name, game_format)
+
+    except Exception as e:
+        # Fallback if video processing fails
+        return _fallback_video_analysis(player_name, partner_name, game_format, str(e))
+
+
+async def generate_video_analysis_async(
+    video_analysis: Any,
+    player: Any,
+    partner: Any | None = None,
+    on_status: Callable[[str], Awaitable[None]] | None = None,
+    instructions: str | None = None,
+    on_field: Callable[[str, Any], Awaitable[None]] | None = None,
+) -> dict[str, Any]:
+    """Async variant of :func:`generate_video_analysis`.
+
+    The blocking SDK upload runs in a worker thread, while the PROCESSING poll
+    and generation are awaited, so waiting on Gemini never pins a thread.
+    With ``on_field`` the analysis is streamed, and the callback receives each
+    top-level field of the report as soon as Gemini has finished writing it.
+    """
+    prompt, player_name, partner_name, game_format = _build_video_prompt(video_analysis, player, partner)
+
+    model = await get_model_async(VIDEO, instructions)
+    if model is None:
+        return _fallback_video_analysis(player_name, partner_name, game_format, "Gemini API not configured")
+
+    try:
+        video_file = await asyncio.to_thread(_upload_video, getattr(video_analysis, "video_path", ""))
+
+        delays = _poll_delays()
+        while video_file.state.name == "PROCESSING":
+            await asyncio.sleep(next(delays))
+            video_file = await asyncio.to_thread(_get_file, video_file.name)
+
+        if video_file.state.name == "FAILED":
+            raise Exception("Video processing failed")
+        if on_status:
+            await on_status("processing")
+
+        if on_field is None:
+            response = await gemini_resilience.call_async(
+                lambda timeout: _generate_async(
+                    model, [video_file, prompt], gemini_limiter.VIDEO, _video_token_estimate(prompt), timeout
+                ),
+                gemini_resilience.VIDEO_CALL_TIMEOUT_SECONDS,
+                gemini_resilience.VIDEO_DEADLINE_SECONDS,
+            )
+            result_text = _response_text(response)
+        else:
+            parser = json_stream.FieldParser()
+            async for text in _generate_stream_async(
+                model,
+                [video_file, prompt],
+                gemini_limiter.VIDEO,
+                _video_token_estimate(prompt),
+                gemini_resilience.VIDEO_CALL_TIMEOUT_SECONDS,
+                gemini_resilience.VIDEO_DEADLINE_SECONDS,
+            ):
+                for name, value in parser.feed(text):
+                    await on_field(name, value)
+            result_text = parser.text
+        return _parse_video_response(result_text, player_name, partner_name, game_format)
+
+    except Exception as e:
+        return _fallback_video_analysis(player_name, partner_name, game_format, str(e))
+
+
+POLL_INITIAL_DELAY = 1.0
+POLL_MAX_DELAY = 10.0
+
+
+def _poll_delays() -> Iterator[float]:
+    """Exponential backoff for Gemini file-state polling."""
+    delay = POLL_INITIAL_DELAY
+    while True:
+        yield delay
+        delay = min(delay * 2, POLL_MAX_DELAY)
+
+
+def _build_video_prompt(
+    video_analysis: Any, player: Any, partner: Any | None
+) -> tuple[str, str, str | None, str]:
+    """Render the singles or doubles prompt; returns prompt, names and format."""
     session_id = getattr(video_analysis, "session_id", "N/A")
     date = getattr(video_analysis, "date", datetime.utcnow())
     event_type = getattr(video_analysis, "event_type", "practice_match")
     game_format = getattr(video_analysis, "game_format", "singles")
-    video_path = getattr(video_analysis, "video_path", "")
 
     player_name = getattr(player, "name", "Player 1")
     player_level = getattr(player, "level", "intermediate")
@@ -806,6 +1311,7 @@ def generate_video_analysis(
             event_type=event_type
         )
     else:
+        partner_name = None
         prompt = dedent(VIDEO_ANALYSIS_PROMPT_SINGLES).format(
             player_name=player_name,
             player_level=player_level,
@@ -816,148 +1322,116 @@ def generate_video_analysis(
             event_type=event_type
         )
 
-    # Check if Gemini is available
-    if MODEL is None or google_genai is None:
-        return _fallback_video_analysis(player_name, partner_name if partner else None, game_format, "Gemini API not configured")
+    return prompt, player_name, partner_name, game_format
 
-    # Try to process video with Gemini
+
+def _upload_video(video_path: str) -> Any:
+    """Return a Gemini file handle for a stored video, uploading only if needed."""
+    # Blob references point at a file on disk and already carry their hash
+    if storage.is_blob_ref(video_path):
+        return _upload_once(storage.blob_digest(video_path), str(storage.blob_path(video_path)))
+
+    if not video_path.startswith('data:video'):
+        # File path provided - upload directly
+        return _upload_once(_file_digest(video_path), video_path)
+
+    # Base64 encoded video from older rows - decode to a temporary file
+    video_bytes = base64.b64decode(video_path.split(',')[1])
+    digest = hashlib.sha256(video_bytes).hexdigest()
+    remote_file = _reuse_remote_file(digest)
+    if remote_file is not None:
+        return remote_file
+    with tempfile.NamedTemporaryFile(delete=False, suffix='.mp4') as tmp_file:
+        tmp_file.write(video_bytes)
+        temp_video_path = tmp_file.name
     try:
-        # Handle base64 video data or file path
-        if video_path.startswith('data:video'):
-            # Base64 encoded video - need to decode and save temporarily
-            import base64
-            import tempfile
-            import os
-
-            # Extract base64 data
-            video_data = video_path.split(',')[1]
-            video_bytes = base64.b64decode(video_data)
-
-            # Save to temporary file
-            with tempfile.NamedTemporaryFile(delete=False, suffix='.mp4') as tmp_file:
-                tmp_file.write(video_bytes)
-                temp_video_path = tmp_file.name
-
-            try:
-                # Upload video to Gemini
-                video_file = google_genai.upload_file(path=temp_video_path)
-
-                # Wait for processing
-                import time
-                while video_file.state.name == "PROCESSING":
-                    time.sleep(2)
-                    video_file = google_genai.get_file(video_file.name)
-
-                if video_file.state.name == "FAILED":
-                    raise Exception("Video processing failed")
-
-                # Create video model for analysis with JSON schema
-                video_model = google_genai.GenerativeModel(
-                    model_name=MODEL_NAME,
-                    generation_config=google_genai.GenerationConfig(
-                        temperature=0.4,
-                        top_p=0.8,
-                        max_output_tokens=8192,
-                        response_mime_type="application/json",
-                    )
-                )
-
-                # Generate analysis
-                response = video_model.generate_content([video_file, prompt])
-                result_text = _response_text(response)
-
-                # Delete temporary file
-                os.unlink(temp_video_path)
-
-                # Clean up the response text
-                result_text = result_text.strip()
-
-                # Remove markdown code blocks if present
-                if result_text.startswith('```json'):
-                    result_text = result_text[7:]  # Remove ```json
-                if result_text.startswith('```'):
-                    result_text = result_text[3:]  # Remove ```
-                if result_text.endswith('```'):
-                    result_text = result_text[:-3]  # Remove trailing ```
-                result_text = result_text.strip()
-
-                # Parse JSON response
-                try:
-                    analysis_data = json.loads(result_text)
-                    return _normalize_video_analysis(analysis_data, player_name, partner_name if partner else None, game_format)
-                except json.JSONDecodeError as e:
-                    # Log the error for debugging
-                    print(f"JSON Decode Error: {e}")
-                    print(f"Response text: {result_text[:500]}")
-                    # If not valid JSON, try to extract and fix it
-                    fixed_result = _try_fix_json(result_text)
-                    if fixed_result:
-                        return _normalize_video_analysis(fixed_result, player_name, partner_name if partner else None, game_format)
-                    # Last resort: parse as text
-                    return _parse_text_video_analysis(result_text, player_name, partner_name if partner else None, game_format)
-
-            finally:
-                # Cleanup temporary file if it still exists
-                if os.path.exists(temp_video_path):
-                    os.unlink(temp_video_path)
-        else:
-            # File path provided - upload directly
-            video_file = google_genai.upload_file(path=video_path)
-
-            # Wait for processing
-            import time
-            while video_file.state.name == "PROCESSING":
-                time.sleep(2)
-                video_file = google_genai.get_file(video_file.name)
-
-            if video_file.state.name == "FAILED":
-                raise Exception("Video processing failed")
-
-            # Create video model for analysis with JSON schema
-            video_model = google_genai.GenerativeModel(
-                model_name=MODEL_NAME,
-                generation_config=google_genai.GenerationConfig(
-                    temperature=0.4,
-                    top_p=0.8,
-                    max_output_tokens=8192,
-                    response_mime_type="application/json",
-                )
-            )
+        return _upload_once(digest, temp_video_path, reuse=False)
+    finally:
+        os.unlink(temp_video_path)
 
-            # Generate analysis
-            response = video_model.generate_content([video_file, prompt])
-            result_text = _response_text(response)
 
-            # Clean up the response text
-            result_text = result_text.strip()
-
-            # Remove markdown code blocks if present
-            if result_text.startswith('```json'):
-                result_text = result_text[7:]  # Remove ```json
-            if result_text.startswith('```'):
-                result_text = result_text[3:]  # Remove ```
-            if result_text.endswith('```'):
-                result_text = result_text[:-3]  # Remove trailing ```
-            result_text = result_text.strip()
-
-            # Parse JSON response
-            try:
-                analysis_data = json.loads(result_text)
-                return _normalize_video_analysis(analysis_data, player_name, partner_name if partner else None, game_format)
-            except json.JSONDecodeError as e:
-                # Log the error for debugging
-                print(f"JSON Decode Error: {e}")
-                print(f"Response text: {result_text[:500]}")
-                # If not valid JSON, try to extract and fix it
-                fixed_result = _try_fix_json(result_text)
-                if fixed_result:
-                    return _normalize_video_analysis(fixed_result, player_name, partner_name if partner else None, game_format)
-                # Last resort: parse as text
-                return _parse_text_video_analysis(result_text, player_name, partner_name if partner else None, game_format)
+def _upload_once(digest: str, path: str, reuse: bool = True) -> Any:
+    if reuse:
+        remote_file = _reuse_remote_file(digest)
+        if remote_file is not None:
+            return remote_file
+    remote_file = gemini_resilience.call(lambda timeout: _files_request(_sdk().upload_file, path=path))
+    gemini_files.remember(digest, remote_file)
+    return remote_file
+
+
+def _reuse_remote_file(digest: str) -> Any | None:
+    """Fetch a previously uploaded copy of this video if Gemini still has it."""
+    remote_name = gemini_files.lookup(digest)
+    if remote_name is None:
+        return None
+    try:
+        remote_file = _get_file(remote_name)
+    except gemini_resilience.Unavailable:
+        raise
+    except Exception:
+        remote_file = None
+    if remote_file is None or remote_file.state.name == "FAILED":
+        gemini_files.forget(digest)
+        return None
+    return remote_file
+
+
+def _get_file(name: str) -> Any:
+    return gemini_resilience.call(lambda timeout: _files_request(_sdk().get_file, name))
+
+
+def _files_request(method: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    # The Files API helpers take no timeout; the HTTP client's own applies.
+    with gemini_limiter.FILES.acquire(gemini_limiter.VIDEO):
+        return method(*args, **kwargs)
+
+
+def _file_digest(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as source:
+        while chunk := source.read(storage.CHUNK_SIZE):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+# Gemini bills roughly 300 tokens per second of video; the default assumes a
+# few minutes of footage and is settled against actual usage after each call.
+VIDEO_TOKEN_ESTIMATE = int(os.getenv("GEMINI_VIDEO_TOKEN_ESTIMATE", "60000"))
+
+
+def _video_token_estimate(prompt: str) -> int:
+    return VIDEO_TOKEN_ESTIMATE + gemini_limiter.estimate_tokens(prompt, VIDEO_MAX_OUTPUT_TOKENS)
 
-    except Exception as e:
-        # Fallback if video processing fails
-        return _fallback_video_analysis(player_name, partner_name if partner else None, game_format, str(e))
+
+def _parse_video_response(result_text: str, player_name: str, partner_name: str | None, game_format: str) -> dict[str, Any]:
+    """Turn raw Gemini output into a normalized analysis dict."""
+    # Clean up the response text
+    result_text = result_text.strip()
+
+    # Remove markdown code blocks if present
+    if result_text.startswith('```json'):
+        result_text = result_text[7:]  # Remove ```json
+    if result_text.startswith('```'):
+        result_text = result_text[3:]  # Remove ```
+    if result_text.endswith('```'):
+        result_text = result_text[:-3]  # Remove trailing ```
+    result_text = result_text.strip()
+
+    # Parse JSON response
+    try:
+        analysis_data = json.loads(result_text)
+        return _normalize_video_analysis(analysis_data, player_name, partner_name, game_format)
+    except json.JSONDecodeError as e:
+        # Log the error for debugging
+        print(f"JSON Decode Error: {e}")
+        print(f"Response text: {result_text[:500]}")
+        # If not valid JSON, try to extract and fix it
+        fixed_result = _try_fix_json(result_text)
+        if fixed_result:
+            return _normalize_video_analysis(fixed_result, player_name, partner_name, game_format)
+        # Last resort: parse as text
+        return _parse_text_video_analysis(result_text, player_name, partner_name, game_format)
 
 
 def _normalize_video_analysis(data: dict[str, Any], player_name: str, partner_name: str | None, game_format: str) -> dict[str, Any]:
@@ -965,9 +1439,13 @@ def _normalize_video_analysis(data: dict[str, Any], player_name: str, partner_na
     # Ensure all required fields exist
     normalized = dict(data)
 
-    # Validate scores
-    if "scores" not in normalized:
-        normalized["scores"] = {"presence": 5, "skill": 5, "intent": 5, "psi": 5.0}
+    # Without usable scores the analysis cannot be stored as a real one
+    scores = _video_scores(normalized.get("scores"))
+    if scores is None:
+        return _fallback_video_analysis(
+            player_name, partner_name, game_format, "Gemini response had no valid scores"
+        )
+    normalized["scores"] = scores
 
     # Ensure lists are present
     for key in ["player_strengths", "player_weaknesses", "actions_strengths", "actions_weaknesses", "summary_bullets"]:
@@ -997,6 +1475,24 @@ def _normalize_video_analysis(data: dict[str, Any], player_name: str, partner_na
     return normalized
 
 
+def _video_scores(raw: Any) -> dict[str, Any] | None:
+    """Validated scores from Gemini output, or None when they are missing or out of range."""
+    if not isinstance(raw, Mapping):
+        return None
+    try:
+        scores = Scores.model_validate(raw)
+    except ValidationError:
+        return None
+    if scores.psi is None:
+        weighted = (
+            Decimal(scores.skill) * PSI_WEIGHTS["skill"]
+            + Decimal(scores.presence) * PSI_WEIGHTS["presence"]
+            + Decimal(scores.intent) * PSI_WEIGHTS["intent"]
+        ) / WEIGHT_TOTAL
+        scores.psi = float(round(weighted, 1))
+    return scores.model_dump()
+
+
 def _try_fix_json(text: str) -> dict[str, Any] | None:
     """Try to fix incomplete or malformed JSON."""
     try:
@@ -1031,15 +1527,21 @@ def _parse_text_video_analysis(text: str, player_name: str, partner_name: str |
     # Extract any scores that might be in the text
     import re
 
-    presence_match = re.search(r'"presence":\s*(\d+)', text)
-    skill_match = re.search(r'"skill":\s*(\d+)', text)
-    intent_match = re.search(r'"intent":\s*(\d+)', text)
-    psi_match = re.search(r'"psi":\s*(\d+\.?\d*)', text)
-
-    presence = int(presence_match.group(1)) if presence_match else 7
-    skill = int(skill_match.group(1)) if skill_match else 7
-    intent = int(intent_match.group(1)) if intent_match else 7
-    psi = float(psi_match.group(1)) if psi_match else 7.0
+    raw_scores = {}
+    for name, pattern in (
+        ("presence", r'"presence":\s*(\d+)'),
+        ("skill", r'"skill":\s*(\d+)'),
+        ("intent", r'"intent":\s*(\d+)'),
+        ("psi", r'"psi":\s*(\d+\.?\d*)'),
+    ):
+        match = re.search(pattern, text)
+        if match:
+            raw_scores[name] = match.group(1)
+    scores = _video_scores(raw_scores)
+    if scores is None:
+        return _fallback_video_analysis(
+            player_name, partner_name, game_format, "Gemini response was not valid JSON and had no scores"
+        )
 
     # Try to extract technical analysis fields
     tech_analysis = {}
@@ -1067,7 +1569,7 @@ def _parse_text_video_analysis(text: str, player_name: str, partner_name: str |
     player_eval = eval_match.group(1) if eval_match else text[:500] if len(text) > 500 else text
 
     return {
-        "scores": {"presence": presence, "skill": skill, "intent": intent, "psi": psi},
+        "scores": scores,
         "technical_analysis": tech_analysis if tech_analysis else {},
         "movement_footwork": movement if movement else {},
         "tactical_insights": tactical if tactical else {},
@@ -1083,171 +1585,40 @@ def _parse_text_video_analysis(text: str, player_name: str, partner_name: str |
 
 
 def _fallback_video_analysis(player_name: str, partner_name: str | None, game_format: str, reason: str) -> dict[str, Any]:
-    """Return fallback analysis when AI processing fails."""
+    """Report that the video could not be analysed, without inventing scores.
+
+    The result is flagged as degraded so the job can be re-queued for a real
+    analysis once Gemini is reachable again.
+    """
+    message = (
+        f"AI video analysis is unavailable, so {player_name} has not been scored for this session. "
+        f"Request a new analysis once the AI service recovers. (Reason: {reason})"
+    )
+    analysis: dict[str, Any] = {
+        "degraded": True,
+        "degraded_reason": reason,
+        "scores": None,
+        "technical_analysis": {},
+        "movement_footwork": {},
+        "tactical_insights": {},
+        "player_evaluation": message,
+        "player_strengths": [],
+        "player_weaknesses": [],
+        "actions_strengths": [],
+        "actions_weaknesses": [],
+        "course_forward": "Review the video manually or request a new analysis later.",
+        "summary_bullets": ["AI analysis unavailable", "No scores recorded", "Request a new analysis later"],
+        "team_performance": None,
+    }
     if game_format == "doubles" and partner_name:
-        # Doubles analysis with both players
-        return {
-            "scores": {
-                "presence": 7,
-                "skill": 8,
-                "intent": 7,
-                "psi": 7.5
-            },
-            "technical_analysis": {
-                "smash_success_rate": "Approximately 65% - Good power but placement inconsistent",
-                "drop_shot_precision": "Moderate - 60% landing in target zone",
-                "clear_depth_consistency": "Strong - Consistently reaching back third of court",
-                "net_play_effectiveness": "Needs improvement - Often late to net",
-                "unforced_errors": "Estimated 12 unforced errors during session",
-                "forced_errors": "8 forced errors under opponent pressure",
-                "service_faults": "3 service faults observed"
-            },
-            "movement_footwork": {
-                "court_coverage": "Player predominantly covered back court (60%), with partner handling front court duties",
-                "recovery_speed": "Moderate to fast - Average 1.2 seconds to ready position",
-                "balance_stance": "Good overall balance, 3 instances of late footwork on cross-court returns",
-                "fatigue_analysis": "Movement intensity decreased by ~20% in final third of session"
-            },
-            "tactical_insights": {
-                "rally_patterns": "Prefers longer rallies (8+ shots), tends to play defensively early then attack",
-                "shot_distribution": "~70% forehand, 30% backhand | 55% cross-court, 45% straight shots",
-                "predictability": "Repeatedly lifts to back court when under pressure at net",
-                "opponent_exploits": "Opponents targeted backhand side and rushed net play"
-            },
-            "team_performance": {
-                "coordination_rotation": "Generally good rotation, missed 2 key switches in mid-court",
-                "court_coverage_split": f"{player_name}: 55% of shots, {partner_name}: 45% of shots",
-                "communication_indicators": "2 miscommunications observed, mostly smooth transitions",
-                "synergy_score": 7
-            },
-            "player_evaluation": f"Strong technical foundation for a {player_level} player. {player_name} demonstrates good court awareness and solid stroke production. Key areas: improve net approach timing and reduce predictability under pressure.",
-            "player_strengths": [
-                "Consistent clear depth and placement",
-                "Good smash power generation",
-                "Strong defensive positioning",
-                "Effective teamwork and rotation awareness"
-            ],
-            "player_weaknesses": [
-                "Net play timing and reaction speed",
-                "Predictable shot selection when pressured",
-                "Backhand consistency needs work",
-                "Late footwork on cross-court returns"
-            ],
-            "actions_strengths": [
-                "Continue practicing deep clears in pressure situations",
-                "Use smash threat to create openings for partner",
-                "Maintain strong defensive foundation in rallies"
-            ],
-            "actions_weaknesses": [
-                "Net rush drills: 3 sets of 20 reps daily",
-                "Backhand drive practice: 100 shots per session",
-                "Footwork ladder drills for cross-court movement",
-                "Pressure scenario training - forced lift responses"
-            ],
-            "course_forward": f"Focus on net play improvement and shot variety. Recommended drills: (1) Net kill response - 3x15 reps per session, (2) Backhand-to-backhand drives with partner - 200 shots, (3) Cross-court movement patterns - 10 minutes daily, (4) Communication drills with {partner_name} for mid-court situations. Target: Reduce unforced errors to under 8 per session, increase net effectiveness by 25% within 4 weeks.",
-            "summary_bullets": [
-                "Strong foundation, needs net play improvement",
-                "65% smash success, good power execution",
-                "Predictable under pressure, vary responses",
-                "Team synergy good, improve mid-court rotation",
-                "Focus backhand consistency and cross-court movement"
-            ],
-            "partner_scores": {
-                "presence": 6,
-                "skill": 7,
-                "intent": 8,
-                "psi": 7.1
-            },
-            "partner_evaluation": f"{partner_name} shows strong attacking intent and good front court presence. Needs to improve consistency in shot placement and reduce errors.",
-            "partner_strengths": [
-                "Aggressive net play and interceptions",
-                "Quick reaction time at the net",
-                "Strong attacking mindset"
-            ],
-            "partner_weaknesses": [
-                "Shot placement consistency",
-                "Defensive positioning needs work",
-                "Tends to over-commit to attacks"
-            ],
-            "partner_actions_strengths": [
-                "Continue aggressive net interceptions",
-                "Use quick reflexes to pressure opponents"
-            ],
-            "partner_actions_weaknesses": [
-                "Placement accuracy drills: 100 targeted shots daily",
-                "Defensive positioning practice",
-                "Decision-making under pressure scenarios"
-            ],
-            "partner_course_forward": f"Work on shot consistency and defensive balance. Practice controlled aggression drills with {player_name}.",
-            "partner_summary_bullets": [
-                "Strong attacking intent and net presence",
-                "Improve shot placement accuracy",
-                "Balance aggression with positioning",
-                "Good partnership chemistry overall",
-                "Focus defensive skills development"
-            ]
-        }
-    else:
-        # Singles analysis
-        return {
-            "scores": {
-                "presence": 7,
-                "skill": 8,
-                "intent": 7,
-                "psi": 7.5
-            },
-            "technical_analysis": {
-                "smash_success_rate": "Approximately 65% - Good power but placement inconsistent",
-                "drop_shot_precision": "Moderate - 60% landing in target zone",
-                "clear_depth_consistency": "Strong - Consistently reaching back third of court",
-                "net_play_effectiveness": "Needs improvement - Often late to net",
-                "unforced_errors": "Estimated 12 unforced errors during session",
-                "forced_errors": "8 forced errors under opponent pressure",
-                "service_faults": "3 service faults observed"
-            },
-            "movement_footwork": {
-                "court_coverage": "Balanced coverage with slight back court preference (55% back, 45% front/mid)",
-                "recovery_speed": "Moderate to fast - Average 1.2 seconds to ready position",
-                "balance_stance": "Good overall balance, 3 instances of late footwork on cross-court returns",
-                "fatigue_analysis": "Movement intensity decreased by ~20% in final third of session, recovery time increased by 0.3s"
-            },
-            "tactical_insights": {
-                "rally_patterns": "Prefers longer rallies (8+ shots), tends to play defensively early then attack when opportunity arises",
-                "shot_distribution": "~70% forehand, 30% backhand | 55% cross-court, 45% straight shots",
-                "predictability": "Repeatedly lifts to back court when under pressure at net - opponent adapted in second half",
-                "opponent_exploits": "Opponent targeted backhand side and rushed net play, exploited predictable lift response"
-            },
-            "player_evaluation": f"Strong technical foundation for a {player_level} player. {player_name} demonstrates good court awareness and solid stroke production, particularly with forehand clears and smashes. Main development areas: improve net approach timing, reduce predictability under pressure, and strengthen backhand consistency.",
-            "player_strengths": [
-                "Consistent clear depth reaching back third",
-                "Good smash power generation and timing",
-                "Strong defensive positioning and patience",
-                "Effective rally construction and court awareness"
-            ],
-            "player_weaknesses": [
-                "Net play timing and reaction speed",
-                "Predictable shot selection when pressured",
-                "Backhand drive consistency needs improvement",
-                "Late footwork on cross-court returns"
-            ],
-            "actions_strengths": [
-                "Continue practicing deep clears in pressure situations",
-                "Use smash threat to create deceptive opportunities",
-                "Maintain strong defensive rally foundation",
-                "Build on good court awareness for tactical variations"
-            ],
-            "actions_weaknesses": [
-                "Net rush drills: 3 sets of 20 reps daily, focus on explosive first step",
-                "Backhand drive practice: 100 shots per session against wall or partner",
-                "Footwork ladder drills specifically for cross-court movement patterns",
-                "Pressure scenario training - practice 3 different responses to forced lifts"
-            ],
-            "course_forward": f"Primary focus: net play improvement and shot variety under pressure. Recommended weekly program: (1) Net kill response drills - 3x15 reps per session, (2) Backhand-to-backhand drives - 200 shots per session for consistency, (3) Cross-court movement patterns - 10 minutes daily warmup, (4) Deception training - practice 4 different responses from same preparation. Performance targets: Reduce unforced errors to under 8 per session, increase net effectiveness by 25%, improve backhand consistency to 75%+ within 4 weeks. Schedule: 4 technical sessions + 2 match play sessions per week.",
-            "summary_bullets": [
-                "Strong foundation, improve net play timing",
-                "65% smash success shows good power",
-                "Too predictable under pressure situations",
-                "Backhand consistency needs focused work",
-                "Fatigue management in longer sessions"
-            ]
-        }
+        analysis.update(
+            partner_scores=None,
+            partner_evaluation=message.replace(player_name, partner_name, 1),
+            partner_strengths=[],
+            partner_weaknesses=[],
+            partner_actions_strengths=[],
+            partner_actions_weaknesses=[],
+            partner_course_forward="Review the video manually or request a new analysis later.",
+            partner_summary_bullets=["AI analysis unavailable", "No scores recorded"],
+        )
+    return analysis
\ No newline at end of file
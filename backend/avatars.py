@@ -0,0 +1,189 @@
+"""Resized, content-addressed storage for coach profile pictures.
+
+Uploads are decoded once, cropped to a square and re-encoded as WebP at each
+size in ``AVATAR_SIZES``. The files live under ``MEDIA_ROOT/avatars`` keyed by
+the SHA-256 of the uploaded bytes, and the coach row keeps only an
+``avatar:<sha256>`` reference. Because a digest never changes meaning, the
+thumbnails can be served with strong ETags and cached forever.
+
+Older clients stored the picture itself as a base64 data URL in the coach
+row. The backfill task moves those into the store at startup, so reads never
+write.
+"""
+from __future__ import annotations
+
+import asyncio
+import base64
+import binascii
+import hashlib
+import io
+import os
+import re
+import tempfile
+from pathlib import Path
+
+from PIL import Image, ImageOps, UnidentifiedImageError
+from sqlalchemy import update
+
+import models
+from database import SessionLocal
+from storage import MEDIA_ROOT
+
+AVATAR_ROOT = MEDIA_ROOT / "avatars"
+AVATAR_PREFIX = "avatar:"
+AVATAR_SIZES = tuple(sorted(int(size) for size in os.getenv("AVATAR_SIZES", "64,256").split(",")))
+AVATAR_QUALITY = int(os.getenv("AVATAR_QUALITY", "85"))
+MAX_AVATAR_UPLOAD_BYTES = int(os.getenv("MAX_AVATAR_UPLOAD_BYTES", str(10 * 1024 * 1024)))
+MAX_AVATAR_PIXELS = int(os.getenv("MAX_AVATAR_PIXELS", str(50_000_000)))
+BACKFILL_BATCH_SIZE = int(os.getenv("AVATAR_BACKFILL_BATCH_SIZE", "20"))
+MEDIA_TYPE = "image/webp"
+
+_AVATAR_REF_PATTERN = re.compile(r"^avatar:([0-9a-f]{64})$")
+
+_backfill: asyncio.Task | None = None
+
+
+class InvalidImage(Exception):
+    """Raised when an upload cannot be decoded as a supported image."""
+
+
+def is_avatar_ref(value: str | None) -> bool:
+    """Return True when ``value`` is a reference produced by this store."""
+    return bool(value) and _AVATAR_REF_PATTERN.match(value) is not None
+
+
+def avatar_digest(ref: str) -> str:
+    match = _AVATAR_REF_PATTERN.match(ref or "")
+    if not match:
+        raise ValueError(f"Invalid avatar reference: {ref!r}")
+    return match.group(1)
+
+
+def avatar_path(digest: str, size: int) -> Path:
+    return AVATAR_ROOT / digest[:2] / f"{digest}-{size}.webp"
+
+
+def avatar_url(ref: str | None, size: int | None = None) -> str | None:
+    """Relative URL of one thumbnail; the largest size when ``size`` is omitted."""
+    if not is_avatar_ref(ref):
+        return None
+    return f"/avatars/{avatar_digest(ref)}?size={size or AVATAR_SIZES[-1]}"
+
+
+def avatar_urls(ref: str | None) -> dict[str, str]:
+    if not is_avatar_ref(ref):
+        return {}
+    return {str(size): avatar_url(ref, size) for size in AVATAR_SIZES}
+
+
+def decode_data_url(data_url: str) -> bytes:
+    """Decode a ``data:image/...;base64,`` string sent by older clients."""
+    header, _, encoded = data_url.partition(",")
+    if not header.startswith("data:") or ";base64" not in header:
+        raise InvalidImage("Profile picture must be a base64 data URL")
+    try:
+        return base64.b64decode(encoded, validate=True)
+    except (binascii.Error, ValueError) as exc:
+        raise InvalidImage("Profile picture is not valid base64") from exc
+
+
+def _open(data: bytes) -> Image.Image:
+    try:
+        image = Image.open(io.BytesIO(data))
+        if image.width * image.height > MAX_AVATAR_PIXELS:
+            raise InvalidImage("Image dimensions are too large")
+        # Let JPEG decode at a reduced scale; thumbnails never need full resolution.
+        image.draft("RGB", (AVATAR_SIZES[-1] * 2, AVATAR_SIZES[-1] * 2))
+        image.load()
+    except (UnidentifiedImageError, Image.DecompressionBombError, OSError, SyntaxError) as exc:
+        raise InvalidImage("File is not a supported image") from exc
+    image = ImageOps.exif_transpose(image)
+    return image.convert("RGBA" if image.mode in ("RGBA", "LA", "P") else "RGB")
+
+
+def save(data: bytes) -> str:
+    """Store every thumbnail size for an uploaded image and return its reference."""
+    digest = hashlib.sha256(data).hexdigest()
+    if all(avatar_path(digest, size).is_file() for size in AVATAR_SIZES):
+        return f"{AVATAR_PREFIX}{digest}"
+
+    image = _open(data)
+    side = min(image.size)
+    square = ImageOps.fit(image, (side, side), method=Image.Resampling.LANCZOS)
+    for size in reversed(AVATAR_SIZES):
+        destination = avatar_path(digest, size)
+        destination.parent.mkdir(parents=True, exist_ok=True)
+        # Resize from the previous (larger) thumbnail instead of the full image.
+        if square.width != size:
+            square = square.resize((size, size), Image.Resampling.LANCZOS)
+        fd, name = tempfile.mkstemp(dir=destination.parent, prefix=".avatar-", suffix=".part")
+        try:
+            with os.fdopen(fd, "wb") as handle:
+                square.save(handle, "WEBP", quality=AVATAR_QUALITY, method=4)
+            os.replace(name, destination)
+        except BaseException:
+            Path(name).unlink(missing_ok=True)
+            raise
+    return f"{AVATAR_PREFIX}{digest}"
+
+
+def save_data_url(data_url: str) -> str:
+    return save(decode_data_url(data_url))
+
+
+def start_backfill() -> None:
+    """Move base64 pictures still stored in coach rows into the store, in the background."""
+    global _backfill
+    if _backfill is None:
+        _backfill = asyncio.create_task(_backfill_loop(), name="avatar-backfill")
+
+
+async def stop_backfill() -> None:
+    global _backfill
+    if _backfill is not None:
+        _backfill.cancel()
+        await asyncio.gather(_backfill, return_exceptions=True)
+        _backfill = None
+
+
+async def _backfill_loop() -> None:
+    try:
+        last_id = 0
+        while (last_id := await asyncio.to_thread(backfill_batch, last_id)) is not None:
+            pass
+    except Exception as exc:  # the next startup picks up where this stopped
+        print(f"[AVATAR] Backfill of profile pictures failed: {exc}")
+
+
+def backfill_batch(after_id: int = 0, batch_size: int = BACKFILL_BATCH_SIZE) -> int | None:
+    """Move one batch of legacy pictures of coaches with ids above ``after_id``.
+
+    Returns the last id examined, or None when no legacy pictures remain.
+    Pictures that cannot be decoded are dropped.
+    """
+    with SessionLocal() as db:
+        rows = (
+            db.query(models.Coach.id, models.Coach.username, models.Coach.profile_picture)
+            .filter(
+                models.Coach.profile_picture.isnot(None),
+                models.Coach.profile_picture.notlike(f"{AVATAR_PREFIX}%"),
+                models.Coach.id > after_id,
+            )
+            .order_by(models.Coach.id)
+            .limit(batch_size)
+            .all()
+        )
+        for coach_id, username, picture in rows:
+            try:
+                ref = save_data_url(picture) if picture else None
+            except InvalidImage as exc:
+                print(f"[AVATAR] Dropping unreadable profile picture for {username}: {exc}")
+                ref = None
+            # A picture uploaded meanwhile replaces the legacy value; keep it.
+            db.execute(
+                update(models.Coach)
+                .where(models.Coach.id == coach_id, models.Coach.profile_picture == picture)
+                .values(profile_picture=ref)
+            )
+        db.commit()
+        return rows[-1][0] if rows else None
@@ -0,0 +1,156 @@
+"""Benchmark ``/player/{id}/history`` for players with thousands of sessions.
+
+Compares the endpoint against the previous implementation, which loaded ORM
+rows, touched ``item.player`` per row and decoded every stored report before
+FastAPI re-encoded it. The current endpoint reads compressed reports and
+renders their formatted text. For each history size it reports the SQL statements
+issued and the time to build the response body. Run from ``backend``::
+
+    python -m benchmarks.bench_history --sessions 1000 2000 4000 8000
+
+Pages are normally capped at ``MAX_PAGE_SIZE``; the benchmark requests whole
+histories in one page so the scaling with history length is visible.
+"""
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+
+def sample_report(index: int) -> dict:
+    import ai
+
+    return ai.PSIReport(
+        scores=ai.Scores(presence=7, skill=6, intent=8),
+        player_evaluation=f"Session {index}: steady footwork with improving shot selection. " * 4,
+        player_strengths=["Quick recovery to base", "Consistent high clears", "Reads drop shots early"],
+        player_weaknesses=["Backhand lift lacks depth", "Late split step under pressure"],
+        actions_strengths=["Keep clears deep under pressure", "Use early reads to take the net"],
+        actions_weaknesses=[f"Drill {n}: shadow footwork with multi-shuttle feeding" for n in range(3)],
+        course_forward="Two multi-shuttle sessions a week focused on backhand lifts and split step timing. " * 3,
+        summary_bullets=["Solid base", "Deep clears", "Early reads", "Backhand lift", "Split step"],
+    ).as_dict()
+
+
+def legacy_history(db, models, player_id: int) -> bytes:
+    """The per-row ORM implementation this endpoint replaced."""
+    from fastapi.encoders import jsonable_encoder
+
+    evaluations = (
+        db.query(models.Evaluation)
+        .filter(models.Evaluation.player_id == player_id)
+        .order_by(models.Evaluation.date.desc())
+        .all()
+    )
+    history = []
+    for item in evaluations:
+        report_payload = json.loads(item.ai_report_json) if item.ai_report_json else None
+        history.append(
+            {
+                "id": item.id,
+                "session_id": item.session_id,
+                "date": item.date.isoformat() if item.date else None,
+                "pressure_score": item.pressure_score,
+                "skill_score": item.skill_score,
+                "intent_score": item.intent_score,
+                "psi_score": item.psi_score,
+                "ai_feedback": item.ai_feedback,
+                "psi_report": report_payload,
+                "player": item.player.name if item.player else None,
+            }
+        )
+    return json.dumps(jsonable_encoder(history)).encode()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, nargs="+", default=[1_000, 2_000, 4_000, 8_000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="bench-history-")
+    os.chdir(workdir)  # the app opens ./badminton.db relative to the working directory
+    os.environ.setdefault("MEDIA_ROOT", os.path.join(workdir, "media"))
+    try:
+        run(args)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    return 0
+
+
+def run(args) -> None:
+    from fastapi import Response
+    from sqlalchemy import event
+
+    import main as app_main
+    import models
+    import pagination
+    import report_store
+    import schema
+    from database import SessionLocal, engine
+
+    schema.prepare()
+
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda *args, **kwargs: statements.append(args[2]))
+
+    with SessionLocal() as db:
+        coach = models.Coach(username="bench", email="bench@example.com", password="x")
+        db.add(coach)
+        db.flush()
+        for size in args.sessions:
+            player = models.Player(name=f"Player {size}", level="advanced", gender="Female", coach_id=coach.id)
+            db.add(player)
+            db.flush()
+            start = datetime(2020, 1, 1)
+            db.bulk_insert_mappings(
+                models.Evaluation,
+                [
+                    {
+                        "player_id": player.id,
+                        "session_id": f"s{index}",
+                        "date": start + timedelta(days=index),
+                        "pressure_score": 7,
+                        "skill_score": 6,
+                        "intent_score": 8,
+                        "psi_score": 7.0,
+                        # Both layouts, so each implementation reads its own columns
+                        **report_store.columns(report),
+                        "ai_feedback": report["formatted"],
+                        "ai_report_json": json.dumps(report),
+                    }
+                    for index, report in enumerate(map(sample_report, range(size)))
+                ],
+            )
+        db.commit()
+        player_ids = dict(db.query(models.Player.name, models.Player.id).all())
+
+    print(f"{'sessions':>9} {'impl':<8} {'queries':>7} {'median ms':>10} {'us/row':>7}")
+    for size in args.sessions:
+        player_id = player_ids[f"Player {size}"]
+
+        def current(db):
+            page = pagination.PageParams(limit=size, cursor=None)
+            filters = pagination.HistoryFilters()
+            return app_main.player_history(player_id, Response(), page, filters, db).body
+
+        for label, implementation in (("legacy", lambda db: legacy_history(db, models, player_id)), ("current", current)):
+            timings = []
+            for _ in range(args.repeat):
+                with SessionLocal() as db:
+                    statements.clear()
+                    began = time.perf_counter()
+                    body = implementation(db)
+                    timings.append((time.perf_counter() - began) * 1000)
+                    query_count = len(statements)
+            assert len(json.loads(body)) == size
+            median = sorted(timings)[len(timings) // 2]
+            print(f"{size:>9} {label:<8} {query_count:>7} {median:>10.1f} {median * 1000 / size:>7.1f}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
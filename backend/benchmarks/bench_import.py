@@ -0,0 +1,76 @@
+"""Cold import time of the app and the cost deferred to first use.
+
+Each sample starts a fresh interpreter, as a new worker or a ``--reload``
+restart does, and times ``import main``. It then times the steps that no
+longer run at import: the schema check on an empty database and building the
+Gemini model (importing the SDK). The key is a placeholder; nothing is sent
+to Gemini. Run from ``backend``::
+
+    python -m benchmarks.bench_import --runs 10
+"""
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import main
+imported = time.perf_counter()
+sdk_at_import = "google.generativeai" in sys.modules
+import ai, schema
+schema.prepare()
+prepared = time.perf_counter()
+ai.get_model()
+built = time.perf_counter()
+print(json.dumps({
+    "import_ms": (imported - start) * 1000,
+    "schema_ms": (prepared - imported) * 1000,
+    "model_ms": (built - prepared) * 1000,
+    "sdk_at_import": sdk_at_import,
+}))
+"""
+
+
+def sample(backend_dir: str) -> dict:
+    workdir = tempfile.mkdtemp(prefix="bench-import-")
+    env = {
+        **os.environ,
+        "PYTHONPATH": backend_dir,
+        "DATABASE_URL": f"sqlite:///{os.path.join(workdir, 'bench.db')}",
+        "MEDIA_ROOT": os.path.join(workdir, "media"),
+        "GEMINI_API_KEY": "bench-placeholder-key",
+    }
+    try:
+        output = subprocess.run(
+            [sys.executable, "-c", PROBE], cwd=workdir, env=env, capture_output=True, text=True, check=True
+        ).stdout
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10)
+    args = parser.parse_args()
+
+    backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    sample(backend_dir)  # warm the filesystem and bytecode caches
+    samples = [sample(backend_dir) for _ in range(args.runs)]
+
+    print(f"{'step':<22} {'median ms':>10} {'min ms':>8}")
+    for key, label in (("import_ms", "import main"), ("schema_ms", "schema.prepare()"), ("model_ms", "ai.get_model()")):
+        values = [entry[key] for entry in samples]
+        print(f"{label:<22} {statistics.median(values):>10.0f} {min(values):>8.0f}")
+    print(f"\nGemini SDK imported by 'import main': {samples[0]['sdk_at_import']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,188 @@
+"""Benchmark the indexed access paths behind the list and lookup endpoints.
+
+Builds a throwaway SQLite database with the production schema, fills it with
+synthetic data and times the queries ``main.py`` issues most often. Run from
+the ``backend`` directory::
+
+    python -m benchmarks.bench_indexes                      # 1M evaluations
+    python -m benchmarks.bench_indexes --without-indexes    # baseline for comparison
+
+Exits non-zero when any query's median latency exceeds ``--budget-ms``.
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, func, or_, and_, select
+
+import models
+from database import Base
+
+BATCH_SIZE = 50_000
+PAGE_SIZE = 50
+EVENT_TYPES = ("tournament", "practice_match", "drills", "other")
+
+
+def build_database(path: str, evaluations: int, players: int, coaches: int, videos: int, with_indexes: bool):
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    if not with_indexes:
+        with engine.begin() as connection:
+            for name in (
+                "ix_evaluations_player_date",
+                "ix_video_analyses_coach_format_date",
+                "ix_video_analyses_player_format_date",
+                "ix_players_coach_lower_name",
+            ):
+                connection.exec_driver_sql(f"DROP INDEX IF EXISTS {name}")
+
+    start = datetime(2020, 1, 1)
+    rng = random.Random(42)
+    raw = engine.raw_connection()
+    try:
+        cursor = raw.cursor()
+        cursor.executemany(
+            "INSERT INTO coaches (id, username, email, phone, dob, password) VALUES (?, ?, ?, '', '', '')",
+            ((i, f"coach{i}", f"coach{i}@example.com") for i in range(1, coaches + 1)),
+        )
+        cursor.executemany(
+            "INSERT INTO players (id, name, level, gender, coach_id) VALUES (?, ?, 'beginner', 'Male', ?)",
+            ((i, f"Player {i}", (i % coaches) + 1) for i in range(1, players + 1)),
+        )
+        for offset in range(0, evaluations, BATCH_SIZE):
+            cursor.executemany(
+                "INSERT INTO evaluations (player_id, session_id, date, psi_score) VALUES (?, 's', ?, ?)",
+                (
+                    (rng.randint(1, players), start + timedelta(minutes=rng.randint(0, 2_000_000)), rng.uniform(0, 100))
+                    for _ in range(min(BATCH_SIZE, evaluations - offset))
+                ),
+            )
+        for offset in range(0, videos, BATCH_SIZE):
+            batch = []
+            for _ in range(min(BATCH_SIZE, videos - offset)):
+                player_id = rng.randint(1, players)
+                batch.append((
+                    (player_id % coaches) + 1,
+                    start + timedelta(minutes=rng.randint(0, 2_000_000)),
+                    rng.choice(("singles", "doubles")),
+                    rng.choice(EVENT_TYPES),
+                    player_id,
+                ))
+            cursor.executemany(
+                "INSERT INTO video_analyses (coach_id, session_id, date, game_format, event_type, player_id,"
+                " player_appearance, video_path) VALUES (?, 's', ?, ?, ?, ?, '', '')",
+                batch,
+            )
+        raw.commit()
+    finally:
+        raw.close()
+    with engine.begin() as connection:
+        connection.exec_driver_sql("ANALYZE")
+    return engine
+
+
+def queries(players: int, coaches: int):
+    """Yield ``(label, statement factory)`` pairs mirroring the endpoints."""
+    Evaluation, VideoAnalysis, Player, Coach = models.Evaluation, models.VideoAnalysis, models.Player, models.Coach
+    cursor_date = datetime(2022, 1, 1)
+
+    yield "history first page", lambda rng: (
+        select(Evaluation.id, Evaluation.date, Evaluation.psi_score)
+        .where(Evaluation.player_id == rng.randint(1, players))
+        .order_by(Evaluation.date.desc(), Evaluation.id.desc())
+        .limit(PAGE_SIZE + 1)
+    )
+    yield "history cursor page", lambda rng: (
+        select(Evaluation.id, Evaluation.date, Evaluation.psi_score)
+        .where(
+            Evaluation.player_id == rng.randint(1, players),
+            or_(
+                Evaluation.date < cursor_date,
+                and_(Evaluation.date == cursor_date, Evaluation.id < 500_000),
+                Evaluation.date.is_(None),
+            ),
+        )
+        .order_by(Evaluation.date.desc(), Evaluation.id.desc())
+        .limit(PAGE_SIZE + 1)
+    )
+    yield "coach doubles page", lambda rng: (
+        select(VideoAnalysis.id, VideoAnalysis.date, VideoAnalysis.psi_score)
+        .where(VideoAnalysis.coach_id == rng.randint(1, coaches), VideoAnalysis.game_format == "doubles")
+        .order_by(VideoAnalysis.date.desc(), VideoAnalysis.id.desc())
+        .limit(PAGE_SIZE + 1)
+    )
+    yield "player singles page", lambda rng: (
+        select(VideoAnalysis.id, VideoAnalysis.date, VideoAnalysis.psi_score)
+        .where(VideoAnalysis.player_id == rng.randint(1, players), VideoAnalysis.game_format == "singles")
+        .order_by(VideoAnalysis.date.desc(), VideoAnalysis.id.desc())
+        .limit(PAGE_SIZE + 1)
+    )
+    yield "duplicate player name", lambda rng: (
+        select(Player.id)
+        .where(func.lower(Player.name) == f"player {rng.randint(1, players)}", Player.coach_id == rng.randint(1, coaches))
+        .limit(1)
+    )
+    yield "coach by email", lambda rng: (
+        select(Coach.id).where(Coach.email == f"coach{rng.randint(1, coaches)}@example.com").limit(1)
+    )
+
+
+def run(engine, players: int, coaches: int, iterations: int, budget_ms: float) -> bool:
+    rng = random.Random(7)
+    ok = True
+    with engine.connect() as connection:
+        for label, factory in queries(players, coaches):
+            statement = factory(rng)
+            compiled = statement.compile(engine, compile_kwargs={"literal_binds": True})
+            plan = " / ".join(row[-1] for row in connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {compiled}"))
+
+            for _ in range(10):  # warm the page cache
+                connection.execute(factory(rng)).all()
+            timings = []
+            for _ in range(iterations):
+                statement = factory(rng)
+                began = time.perf_counter()
+                connection.execute(statement).all()
+                timings.append((time.perf_counter() - began) * 1000)
+
+            median = statistics.median(timings)
+            p99 = statistics.quantiles(timings, n=100)[98]
+            passed = median < budget_ms
+            ok &= passed
+            print(f"{'ok  ' if passed else 'SLOW'} {label:<24} p50 {median:7.3f} ms  p99 {p99:7.3f} ms  {plan}")
+    return ok
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--evaluations", type=int, default=1_000_000)
+    parser.add_argument("--players", type=int, default=2_000)
+    parser.add_argument("--coaches", type=int, default=200)
+    parser.add_argument("--videos", type=int, default=200_000)
+    parser.add_argument("--iterations", type=int, default=500)
+    parser.add_argument("--budget-ms", type=float, default=1.0)
+    parser.add_argument("--without-indexes", action="store_true", help="drop the composite indexes first")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "bench.db")
+        began = time.perf_counter()
+        engine = build_database(
+            path, args.evaluations, args.players, args.coaches, args.videos, not args.without_indexes
+        )
+        print(
+            f"Loaded {args.evaluations:,} evaluations and {args.videos:,} video analyses "
+            f"in {time.perf_counter() - began:.1f}s"
+        )
+        ok = run(engine, args.players, args.coaches, args.iterations, args.budget_ms)
+        engine.dispose()
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
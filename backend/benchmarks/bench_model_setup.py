@@ -0,0 +1,66 @@
+"""Per-call cost of setting up a Gemini model, built fresh versus from the registry.
+
+Video analysis used to build a ``GenerativeModel`` and ``GenerationConfig``
+for every call. This times that construction against a lookup in
+``ai.MODELS`` for the PSI and video setups, with and without a coach's
+system instruction. The key is a placeholder; nothing is sent to Gemini.
+Run from ``backend`` with the Gemini SDK installed::
+
+    python -m benchmarks.bench_model_setup --calls 2000
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+os.environ["GEMINI_API_KEY"] = "bench-placeholder-key"
+
+import ai  # noqa: E402  (reads the key at import)
+
+INSTRUCTIONS = "Focus on footwork and keep the tone encouraging."
+
+
+def per_call_us(fn, calls: int, repeats: int = 5) -> float:
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for _ in range(calls):
+            fn()
+        timings.append((time.perf_counter() - start) / calls * 1e6)
+    return statistics.median(timings)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=2000)
+    args = parser.parse_args()
+
+    google_genai = ai._sdk()
+    if google_genai is None:
+        print("google-generativeai is not installed")
+        return 1
+
+    def build(setup: str, instructions: str | None):
+        return lambda: google_genai.GenerativeModel(
+            model_name=ai.MODEL_NAME,
+            generation_config=google_genai.GenerationConfig(**ai.GENERATION_CONFIGS[setup]),
+            system_instruction=instructions,
+        )
+
+    def lookup(setup: str, instructions: str | None):
+        return lambda: ai.get_model(setup, instructions)
+
+    print(f"{'setup':<22} {'built us/call':>14} {'registry us/call':>17} {'speedup':>8}")
+    for setup in (ai.PSI, ai.VIDEO):
+        for instructions in (None, INSTRUCTIONS):
+            label = f"{setup}{' + instructions' if instructions else ''}"
+            built = per_call_us(build(setup, instructions), args.calls)
+            cached = per_call_us(lookup(setup, instructions), args.calls)
+            print(f"{label:<22} {built:>14.1f} {cached:>17.2f} {built / cached:>7.0f}x")
+    print(f"\nregistry: {ai.MODELS.stats()}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
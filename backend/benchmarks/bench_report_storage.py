@@ -0,0 +1,107 @@
+"""Storage footprint of PSI reports: legacy JSON text vs compressed payloads.
+
+Generates varied PSI reports and prints the average bytes per report for
+the legacy layout (``ai_feedback`` plus ``ai_report_json`` with the
+``formatted`` text embedded), plain zlib, and the ``report_store`` format
+with its preset dictionary. It then writes the same evaluations into two
+SQLite files, one per layout, and compares the file sizes. The generated text
+reuses a small phrase bank, so it compresses somewhat better than real
+Gemini output. Run from ``backend``::
+
+    python -m benchmarks.bench_report_storage --reports 20000
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import zlib
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert
+
+import ai
+import models
+import report_store
+from database import Base, create_sqlite_engine
+
+SUBJECTS = ["Footwork", "Backhand lift", "Net kill", "Smash placement", "Recovery", "Split step", "Drop shot", "Serve"]
+QUALITIES = ["is consistent", "breaks down under pressure", "improved since last session", "lacks depth", "is late on cross-court returns"]
+CONTEXTS = ["in long rallies", "when pushed to the rear court", "after attacking clears", "against fast drives", "in the final game"]
+DRILLS = ["shadow footwork", "multi-shuttle feeding", "net kill response", "backhand drives with a partner", "ladder drills"]
+
+
+def sentence(rng: random.Random) -> str:
+    return f"{rng.choice(SUBJECTS)} {rng.choice(QUALITIES)} {rng.choice(CONTEXTS)}."
+
+
+def psi_payload(rng: random.Random) -> dict:
+    report = ai.PSIReport(
+        scores=ai.Scores(presence=rng.randint(3, 9), skill=rng.randint(3, 9), intent=rng.randint(3, 9)),
+        player_evaluation=" ".join(sentence(rng) for _ in range(5)),
+        player_strengths=[sentence(rng) for _ in range(3)],
+        player_weaknesses=[sentence(rng) for _ in range(3)],
+        actions_strengths=[f"{rng.choice(DRILLS).capitalize()}: {rng.randint(2, 5)} sets of {rng.randint(10, 30)}" for _ in range(3)],
+        actions_weaknesses=[f"{rng.choice(DRILLS).capitalize()}: {rng.randint(2, 5)} sets of {rng.randint(10, 30)}" for _ in range(3)],
+        course_forward=" ".join(sentence(rng) for _ in range(8)),
+        summary_bullets=[sentence(rng)[:60] for _ in range(5)],
+    )
+    return report.as_dict()
+
+
+def footprint(payloads: list[dict]) -> dict:
+    legacy = plain = compressed = 0
+    for payload in payloads:
+        document = json.dumps(payload).encode()
+        legacy += len(document) + len(payload["formatted"].encode())
+        plain += len(zlib.compress(document, 9))
+        compressed += len(report_store.pack(payload))
+    count = len(payloads)
+    return {"legacy": legacy / count, "zlib": plain / count, "report_store": compressed / count}
+
+
+def database_size(payloads: list[dict], compressed: bool) -> int:
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "bench.db")
+        engine = create_sqlite_engine(f"sqlite:///{path}")
+        Base.metadata.create_all(engine)
+        start = datetime(2020, 1, 1)
+        rows = []
+        for index, payload in enumerate(payloads):
+            row = {"player_id": 1, "session_id": f"s{index}", "date": start + timedelta(hours=index)}
+            if compressed:
+                row.update(report_store.columns(payload))
+            else:
+                row.update(ai_feedback=payload["formatted"], ai_report_json=json.dumps(payload))
+            rows.append(row)
+        with engine.begin() as connection:
+            connection.execute(insert(models.Evaluation), rows)
+        with engine.connect() as connection:
+            connection.exec_driver_sql("PRAGMA wal_checkpoint(TRUNCATE)")
+        engine.dispose()
+        return os.path.getsize(path)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--reports", type=int, default=20_000)
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    payloads = [psi_payload(rng) for _ in range(args.reports)]
+
+    sizes = footprint(payloads)
+    print(f"{'layout':<13} {'bytes/report':>12} {'ratio':>6}")
+    for label, size in sizes.items():
+        print(f"{label:<13} {size:>12.0f} {sizes['legacy'] / size:>5.1f}x")
+
+    legacy_db = database_size(payloads, compressed=False)
+    compressed_db = database_size(payloads, compressed=True)
+    print(f"\nSQLite file, {args.reports} evaluations: legacy {legacy_db / 1e6:.1f} MB, "
+          f"compressed {compressed_db / 1e6:.1f} MB ({legacy_db / compressed_db:.1f}x smaller)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
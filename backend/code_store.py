@@ -0,0 +1,276 @@
+"""Shared, expiring storage for verification codes.
+
+``/send-verification`` and ``/verify-code`` can land on different uvicorn
+workers, so codes must live somewhere every worker can see. The backend is
+picked with ``VERIFICATION_STORE``:
+
+``memory``
+    A bounded dict for single-process development.
+``database`` (default)
+    The ``verification_codes`` table in the application database.
+``redis``
+    A Redis 7+ server at ``REDIS_URL``, through the ``redis`` package.
+
+Every backend enforces the same rules: codes expire after a TTL, a code is
+invalidated after ``MAX_ATTEMPTS`` wrong guesses and can be used once, and a
+contact may request at most ``SEND_LIMIT`` codes per rate-limit window.
+"""
+from __future__ import annotations
+
+import asyncio
+import os
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Any
+
+from sqlalchemy import delete, update
+from sqlalchemy.exc import IntegrityError
+
+import models
+from database import SessionLocal
+
+try:  # listed in requirements.txt, but only needed for VERIFICATION_STORE=redis
+    import redis
+except ImportError:  # pragma: no cover - depends on the environment
+    redis = None
+
+BACKEND = os.getenv("VERIFICATION_STORE", "database").lower()
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+CODE_TTL = timedelta(seconds=int(os.getenv("VERIFICATION_CODE_TTL_SECONDS", "600")))
+MAX_ATTEMPTS = int(os.getenv("VERIFICATION_MAX_ATTEMPTS", "5"))
+SEND_LIMIT = int(os.getenv("VERIFICATION_SEND_LIMIT", "5"))
+SEND_WINDOW = timedelta(seconds=int(os.getenv("VERIFICATION_SEND_WINDOW_SECONDS", "3600")))
+MAX_ENTRIES = int(os.getenv("VERIFICATION_MAX_ENTRIES", "100000"))
+SWEEP_INTERVAL_SECONDS = float(os.getenv("VERIFICATION_SWEEP_INTERVAL", "60"))
+
+
+class RateLimited(Exception):
+    """Raised when a contact has requested too many codes in the window."""
+
+    def __init__(self, retry_after: timedelta) -> None:
+        super().__init__("Too many verification codes requested")
+        self.retry_after = retry_after
+
+
+class MemoryCodeStore:
+    """Process-local store; entries are evicted oldest-first past ``max_entries``."""
+
+    def __init__(self, max_entries: int = MAX_ENTRIES) -> None:
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, dict[str, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def put(self, contact: str, code: str, verification_type: str) -> None:
+        now = datetime.utcnow()
+        with self._lock:
+            entry = self._entries.pop(contact, None)
+            if entry is None or now - entry["window_started_at"] >= SEND_WINDOW:
+                entry = {"window_started_at": now, "send_count": 0}
+            if entry["send_count"] >= SEND_LIMIT:
+                self._entries[contact] = entry
+                raise RateLimited(entry["window_started_at"] + SEND_WINDOW - now)
+            entry.update(
+                code=code,
+                type=verification_type,
+                expires_at=now + CODE_TTL,
+                attempts=0,
+                send_count=entry["send_count"] + 1,
+            )
+            self._entries[contact] = entry
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def check(self, contact: str, code: str) -> bool:
+        with self._lock:
+            entry = self._entries.get(contact)
+            if entry is None or entry.get("code") is None:
+                return False
+            if datetime.utcnow() > entry["expires_at"] or entry["attempts"] >= MAX_ATTEMPTS:
+                entry["code"] = None
+                return False
+            entry["attempts"] += 1
+            if entry["code"].upper() != code.upper():
+                return False
+            entry["code"] = None  # single use
+            return True
+
+    def sweep(self) -> int:
+        now = datetime.utcnow()
+        with self._lock:
+            stale = [contact for contact, entry in self._entries.items() if _is_stale(entry, now)]
+            for contact in stale:
+                del self._entries[contact]
+        return len(stale)
+
+
+class DatabaseCodeStore:
+    """Store codes in the ``verification_codes`` table shared by all workers."""
+
+    def put(self, contact: str, code: str, verification_type: str) -> None:
+        try:
+            self._put(contact, code, verification_type)
+        except IntegrityError:
+            # Another worker inserted the first row for this contact; update it instead.
+            self._put(contact, code, verification_type)
+
+    def _put(self, contact: str, code: str, verification_type: str) -> None:
+        now = datetime.utcnow()
+        with SessionLocal() as db:
+            entry = db.get(models.VerificationCode, contact, with_for_update=True)
+            if entry is None:
+                entry = models.VerificationCode(contact=contact, window_started_at=now, send_count=0)
+                db.add(entry)
+            elif now - entry.window_started_at >= SEND_WINDOW:
+                entry.window_started_at = now
+                entry.send_count = 0
+            if entry.send_count >= SEND_LIMIT:
+                raise RateLimited(entry.window_started_at + SEND_WINDOW - now)
+            entry.code = code
+            entry.type = verification_type
+            entry.expires_at = now + CODE_TTL
+            entry.attempts = 0
+            entry.send_count += 1
+            db.commit()
+
+    def check(self, contact: str, code: str) -> bool:
+        table = models.VerificationCode
+        now = datetime.utcnow()
+        with SessionLocal() as db:
+            # Count the attempt atomically so parallel guesses share one budget.
+            stored = db.execute(
+                update(table)
+                .where(
+                    table.contact == contact,
+                    table.code.isnot(None),
+                    table.expires_at > now,
+                    table.attempts < MAX_ATTEMPTS,
+                )
+                .values(attempts=table.attempts + 1)
+                .returning(table.code)
+            ).scalar()
+            if stored is None or stored.upper() != code.upper():
+                db.commit()
+                return False
+            # Clearing the code only succeeds for one of several racing requests.
+            used = db.execute(
+                update(table).where(table.contact == contact, table.code == stored).values(code=None)
+            )
+            db.commit()
+            return used.rowcount == 1
+
+    def sweep(self) -> int:
+        table = models.VerificationCode
+        now = datetime.utcnow()
+        with SessionLocal() as db:
+            result = db.execute(
+                delete(table).where(
+                    (table.code.is_(None)) | (table.expires_at <= now),
+                    table.window_started_at <= now - SEND_WINDOW,
+                )
+            )
+            db.commit()
+            return result.rowcount
+
+
+class RedisCodeStore:
+    """Store codes in Redis; key TTLs replace sweeping and bound memory."""
+
+    def __init__(self, url: str = REDIS_URL, client: Any = None) -> None:
+        if client is None:
+            if redis is None:
+                raise RuntimeError(
+                    "VERIFICATION_STORE=redis requires the redis package; "
+                    "run pip install -r requirements.txt"
+                )
+            client = redis.Redis.from_url(url, decode_responses=True)
+        self.client = client
+
+    @staticmethod
+    def _code_key(contact: str) -> str:
+        return f"verification:code:{contact}"
+
+    @staticmethod
+    def _sends_key(contact: str) -> str:
+        return f"verification:sends:{contact}"
+
+    def put(self, contact: str, code: str, verification_type: str) -> None:
+        sends_key = self._sends_key(contact)
+        pipe = self.client.pipeline()
+        pipe.incr(sends_key)
+        pipe.expire(sends_key, int(SEND_WINDOW.total_seconds()), nx=True)
+        pipe.ttl(sends_key)
+        sends, _, ttl = pipe.execute()
+        if sends > SEND_LIMIT:
+            raise RateLimited(timedelta(seconds=max(ttl, 0)))
+
+        code_key = self._code_key(contact)
+        pipe = self.client.pipeline()
+        pipe.delete(code_key)
+        pipe.hset(code_key, mapping={"code": code, "type": verification_type, "attempts": 0})
+        pipe.expire(code_key, int(CODE_TTL.total_seconds()))
+        pipe.execute()
+
+    def check(self, contact: str, code: str) -> bool:
+        code_key = self._code_key(contact)
+        pipe = self.client.pipeline()
+        pipe.hincrby(code_key, "attempts", 1)
+        pipe.hget(code_key, "code")
+        attempts, stored = pipe.execute()
+        if stored is None:
+            # HINCRBY created a stray hash for an unknown or expired contact.
+            self.client.delete(code_key)
+            return False
+        if attempts > MAX_ATTEMPTS:
+            self.client.delete(code_key)
+            return False
+        if stored.upper() != code.upper():
+            return False
+        # DEL returns 1 for exactly one of several racing requests.
+        return self.client.delete(code_key) == 1
+
+    def sweep(self) -> int:
+        return 0  # Redis expires keys itself
+
+
+def _is_stale(entry: dict[str, Any], now: datetime) -> bool:
+    code_gone = entry.get("code") is None or entry["expires_at"] <= now
+    return code_gone and now - entry["window_started_at"] >= SEND_WINDOW
+
+
+def _create_store():
+    if BACKEND == "memory":
+        return MemoryCodeStore()
+    if BACKEND == "redis":
+        return RedisCodeStore()
+    if BACKEND == "database":
+        return DatabaseCodeStore()
+    raise RuntimeError(f"Unknown VERIFICATION_STORE {BACKEND!r}")
+
+
+store = _create_store()
+_sweeper: asyncio.Task | None = None
+
+
+def start_sweeper() -> None:
+    """Periodically drop expired codes and finished rate-limit windows."""
+    global _sweeper
+    if _sweeper is None:
+        _sweeper = asyncio.create_task(_sweep_loop(), name="verification-sweeper")
+
+
+async def stop_sweeper() -> None:
+    global _sweeper
+    if _sweeper is not None:
+        _sweeper.cancel()
+        await asyncio.gather(_sweeper, return_exceptions=True)
+        _sweeper = None
+
+
+async def _sweep_loop() -> None:
+    while True:
+        await asyncio.sleep(SWEEP_INTERVAL_SECONDS)
+        try:
+            await asyncio.to_thread(store.sweep)
+        except Exception as exc:  # keep sweeping after a transient database error
+            print(f"[VERIFICATION] Sweep failed: {exc}")
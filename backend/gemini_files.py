@@ -0,0 +1,60 @@
+"""Map local video content hashes to files already uploaded to Gemini.
+
+Gemini keeps uploaded files for a limited time (48 hours at the time of
+writing). Re-analysing the same clip within that window can reuse the remote
+handle and skip both the upload and the PROCESSING wait.
+"""
+from __future__ import annotations
+
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+import models
+from database import SessionLocal
+
+DEFAULT_LIFETIME = timedelta(hours=47)
+# Do not hand out a handle that could expire while generation is running.
+EXPIRY_MARGIN = timedelta(seconds=int(os.getenv("GEMINI_FILE_EXPIRY_MARGIN_SECONDS", "3600")))
+
+
+def lookup(content_hash: str) -> str | None:
+    """Return the remote file name for a hash if it is still safely valid."""
+    with SessionLocal() as db:
+        entry = db.get(models.GeminiFile, content_hash)
+        if entry is None:
+            return None
+        if entry.expires_at <= datetime.utcnow() + EXPIRY_MARGIN:
+            db.delete(entry)
+            db.commit()
+            return None
+        return entry.remote_name
+
+
+def remember(content_hash: str, remote_file: Any) -> None:
+    """Record an uploaded file using the expiry Gemini reports, if any."""
+    expires_at = getattr(remote_file, "expiration_time", None)
+    if isinstance(expires_at, datetime):
+        if expires_at.tzinfo is not None:
+            expires_at = expires_at.astimezone(timezone.utc).replace(tzinfo=None)
+    else:
+        expires_at = datetime.utcnow() + DEFAULT_LIFETIME
+
+    with SessionLocal() as db:
+        db.merge(
+            models.GeminiFile(
+                content_hash=content_hash,
+                remote_name=remote_file.name,
+                expires_at=expires_at,
+                created_at=datetime.utcnow(),
+            )
+        )
+        db.commit()
+
+
+def forget(content_hash: str) -> None:
+    with SessionLocal() as db:
+        entry = db.get(models.GeminiFile, content_hash)
+        if entry is not None:
+            db.delete(entry)
+            db.commit()
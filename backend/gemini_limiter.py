@@ -0,0 +1,317 @@
+"""Process-wide rate limiting for Gemini API calls.
+
+Every call to Gemini takes a permit from a ``Limiter`` first. A limiter holds
+token buckets for requests per minute and, for generation, tokens per minute,
+plus a cap on calls in flight. Callers queue in priority lanes: interactive
+reports go ahead of batch evaluations, which go ahead of video analyses.
+Within a lane permits are granted in arrival order, and nobody overtakes the
+head of the queue, so a large video request is not starved by small ones.
+Queue order alone does not help once long video calls hold every slot in
+flight, so a few slots are reserved for the interactive lane.
+
+Token use is not known until the response arrives, so a permit reserves an
+estimate and ``record_usage`` settles the difference afterwards. A 429 from
+Gemini empties the request bucket and pauses the limiter briefly, so the
+queue backs off together instead of retrying into the same limit.
+
+Permits work from threads (``acquire``) and from the event loop
+(``acquire_async``) and share one queue.
+"""
+from __future__ import annotations
+
+import asyncio
+import heapq
+import itertools
+import os
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, AsyncIterator, Callable, Iterator
+
+RPM = int(os.getenv("GEMINI_RPM", "15"))
+TPM = int(os.getenv("GEMINI_TPM", "1000000"))
+MAX_CONCURRENCY = int(os.getenv("GEMINI_MAX_CONCURRENCY", "8"))
+INTERACTIVE_RESERVED = int(os.getenv("GEMINI_INTERACTIVE_RESERVED", "2"))
+FILES_RPM = int(os.getenv("GEMINI_FILES_RPM", "60"))
+THROTTLE_PAUSE_SECONDS = float(os.getenv("GEMINI_THROTTLE_PAUSE_SECONDS", "10"))
+
+# Highest priority first
+INTERACTIVE = "interactive"
+BATCH = "batch"
+VIDEO = "video"
+LANES = (INTERACTIVE, BATCH, VIDEO)
+
+# Rough size of a prompt in tokens, for reservations settled after the call
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(prompt: str, max_output_tokens: int) -> int:
+    return len(prompt) // CHARS_PER_TOKEN + max_output_tokens
+
+
+def usage_tokens(response: Any) -> int | None:
+    """Total tokens billed for a Gemini response, when the SDK reports it."""
+    usage = getattr(response, "usage_metadata", None)
+    total = getattr(usage, "total_token_count", None)
+    return total if isinstance(total, int) else None
+
+
+def is_throttled(exc: BaseException) -> bool:
+    # google.api_core's ResourceExhausted and TooManyRequests both carry code 429.
+    return getattr(exc, "code", None) == 429
+
+
+class _Bucket:
+    """Token bucket refilled continuously up to one minute's budget."""
+
+    def __init__(self, per_minute: int) -> None:
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    def refill(self, now: float) -> None:
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def delay(self, amount: float) -> float:
+        """Seconds until ``amount`` is available; the level may be negative after a settle."""
+        return max(0.0, (amount - self.level) / self.rate)
+
+
+class Permit:
+    """A caller's place in the queue and, once granted, its reservation."""
+
+    __slots__ = ("limiter", "lane", "tokens", "enqueued_at", "granted", "wake")
+
+    def __init__(self, limiter: "Limiter", lane: str, tokens: int, wake: Callable[[], None]) -> None:
+        self.limiter = limiter
+        self.lane = lane
+        self.tokens = tokens
+        self.enqueued_at = time.monotonic()
+        self.granted = False
+        self.wake = wake
+
+    def record_usage(self, response: Any) -> None:
+        """Settle the token reservation against what the response actually used."""
+        actual = usage_tokens(response)
+        if actual is not None:
+            self.limiter._settle(self, actual)
+
+
+class Limiter:
+    def __init__(
+        self,
+        name: str,
+        rpm: int,
+        tpm: int | None = None,
+        max_concurrency: int | None = None,
+        interactive_reserved: int = 0,
+    ) -> None:
+        self.name = name
+        self._lock = threading.Lock()
+        self._requests = _Bucket(rpm)
+        self._tokens = _Bucket(tpm) if tpm else None
+        self._max_concurrency = max_concurrency
+        # In-flight slots other lanes may fill; at least one stays open to them.
+        self._shared_concurrency = (
+            max(1, max_concurrency - interactive_reserved) if max_concurrency is not None else None
+        )
+        self._in_flight = 0
+        self._paused_until = 0.0
+        self._queue: list[tuple[int, int, Permit]] = []
+        self._sequence = itertools.count()
+        self._throttled = 0
+        self._lanes = {
+            lane: {"queued": 0, "in_flight": 0, "granted": 0, "wait_seconds": 0.0, "max_wait_seconds": 0.0}
+            for lane in LANES
+        }
+
+    @contextmanager
+    def acquire(self, lane: str = INTERACTIVE, tokens: int = 0) -> Iterator[Permit]:
+        """Block the calling thread until the call may proceed."""
+        event = threading.Event()
+        permit = self._enqueue(lane, tokens, event.set)
+        try:
+            while True:
+                event.clear()
+                delay = self._dispatch()
+                if permit.granted:
+                    break
+                event.wait(delay)
+        except BaseException:
+            self._abandon(permit)
+            raise
+        throttled = False
+        try:
+            yield permit
+        except BaseException as exc:
+            throttled = is_throttled(exc)
+            raise
+        finally:
+            self._release(permit, throttled)
+
+    @asynccontextmanager
+    async def acquire_async(self, lane: str = INTERACTIVE, tokens: int = 0) -> AsyncIterator[Permit]:
+        """Wait on the event loop until the call may proceed."""
+        loop = asyncio.get_running_loop()
+        event = asyncio.Event()
+        permit = self._enqueue(lane, tokens, lambda: loop.call_soon_threadsafe(event.set))
+        try:
+            while True:
+                event.clear()
+                delay = self._dispatch()
+                if permit.granted:
+                    break
+                try:
+                    await asyncio.wait_for(event.wait(), delay)
+                except asyncio.TimeoutError:
+                    pass
+        except BaseException:
+            self._abandon(permit)
+            raise
+        throttled = False
+        try:
+            yield permit
+        except BaseException as exc:
+            throttled = is_throttled(exc)
+            raise
+        finally:
+            self._release(permit, throttled)
+
+    def _enqueue(self, lane: str, tokens: int, wake: Callable[[], None]) -> Permit:
+        if lane not in self._lanes:
+            raise ValueError(f"Unknown lane {lane!r}")
+        if self._tokens is not None:
+            # A request larger than the whole budget could never be granted.
+            tokens = min(tokens, int(self._tokens.capacity))
+        permit = Permit(self, lane, tokens, wake)
+        with self._lock:
+            heapq.heappush(self._queue, (LANES.index(lane), next(self._sequence), permit))
+            self._lanes[lane]["queued"] += 1
+        return permit
+
+    def _dispatch(self) -> float | None:
+        """Grant permits from the head of the queue.
+
+        Returns how long the head has to wait for budget, or None when it
+        waits for a call to finish (or the queue is empty).
+        """
+        woken = []
+        with self._lock:
+            now = time.monotonic()
+            delay = None
+            while self._queue:
+                permit = self._queue[0][2]
+                if self._max_concurrency is not None:
+                    if self._in_flight >= self._max_concurrency:
+                        break
+                    if permit.lane != INTERACTIVE and self._shared_in_flight() >= self._shared_concurrency:
+                        break
+                self._requests.refill(now)
+                delay = max(self._paused_until - now, self._requests.delay(1))
+                if self._tokens is not None:
+                    self._tokens.refill(now)
+                    delay = max(delay, self._tokens.delay(permit.tokens))
+                if delay > 0:
+                    break
+                delay = None
+                heapq.heappop(self._queue)
+                self._requests.level -= 1
+                if self._tokens is not None:
+                    self._tokens.level -= permit.tokens
+                self._in_flight += 1
+                permit.granted = True
+                waited = now - permit.enqueued_at
+                lane = self._lanes[permit.lane]
+                lane["queued"] -= 1
+                lane["in_flight"] += 1
+                lane["granted"] += 1
+                lane["wait_seconds"] += waited
+                lane["max_wait_seconds"] = max(lane["max_wait_seconds"], waited)
+                woken.append(permit)
+            if woken and self._queue:
+                # The new head may have been sleeping without a deadline.
+                woken.append(self._queue[0][2])
+        for permit in woken:
+            permit.wake()
+        return delay
+
+    def _abandon(self, permit: Permit) -> None:
+        """Drop a caller that stopped waiting, returning its grant if it had one."""
+        with self._lock:
+            if not permit.granted:
+                self._queue = [entry for entry in self._queue if entry[2] is not permit]
+                heapq.heapify(self._queue)
+                self._lanes[permit.lane]["queued"] -= 1
+                return
+        self._release(permit, False)
+
+    def _shared_in_flight(self) -> int:
+        """Calls in flight outside the interactive lane; the caller holds the lock."""
+        return self._in_flight - self._lanes[INTERACTIVE]["in_flight"]
+
+    def _release(self, permit: Permit, throttled: bool) -> None:
+        with self._lock:
+            self._in_flight -= 1
+            self._lanes[permit.lane]["in_flight"] -= 1
+            if throttled:
+                self._throttled += 1
+                self._requests.level = min(self._requests.level, 0.0)
+                self._paused_until = time.monotonic() + THROTTLE_PAUSE_SECONDS
+        self._wake_head()
+
+    def _settle(self, permit: Permit, actual: int) -> None:
+        if self._tokens is None:
+            return
+        with self._lock:
+            self._tokens.level += permit.tokens - actual
+            permit.tokens = actual
+        self._wake_head()
+
+    def _wake_head(self) -> None:
+        with self._lock:
+            head = self._queue[0][2] if self._queue else None
+        if head is not None:
+            head.wake()
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            now = time.monotonic()
+            self._requests.refill(now)
+            if self._tokens is not None:
+                self._tokens.refill(now)
+            lanes = {
+                name: {
+                    "queued": lane["queued"],
+                    "in_flight": lane["in_flight"],
+                    "granted": lane["granted"],
+                    "avg_wait_seconds": round(lane["wait_seconds"] / lane["granted"], 3) if lane["granted"] else None,
+                    "max_wait_seconds": round(lane["max_wait_seconds"], 3),
+                }
+                for name, lane in self._lanes.items()
+            }
+            return {
+                "queue_depth": len(self._queue),
+                "in_flight": self._in_flight,
+                "max_concurrency": self._max_concurrency,
+                "interactive_reserved": (
+                    self._max_concurrency - self._shared_concurrency if self._max_concurrency is not None else 0
+                ),
+                "requests_available": int(self._requests.level),
+                "rpm": int(self._requests.capacity),
+                "tokens_available": int(self._tokens.level) if self._tokens is not None else None,
+                "tpm": int(self._tokens.capacity) if self._tokens is not None else None,
+                "throttled": self._throttled,
+                "paused_seconds": round(max(0.0, self._paused_until - now), 3),
+                "lanes": lanes,
+            }
+
+
+# Content generation and the Files API have separate quotas.
+GENERATE = Limiter("generate", RPM, TPM, MAX_CONCURRENCY, INTERACTIVE_RESERVED)
+FILES = Limiter("files", FILES_RPM)
+
+
+def stats() -> dict[str, Any]:
+    return {limiter.name: limiter.stats() for limiter in (GENERATE, FILES)}
@@ -0,0 +1,206 @@
+"""Retries, deadlines and a circuit breaker for Gemini calls.
+
+``call`` and ``call_async`` run one Gemini request with a per-attempt timeout.
+Transient failures (rate limits, 5xx responses, timeouts, dropped
+connections) are retried with exponential backoff and full jitter, within an
+overall deadline. Other errors, such as a blocked prompt or an invalid
+request, are raised immediately.
+
+Consecutive transient failures open a process-wide circuit breaker. While it
+is open, calls fail at once with ``CircuitOpen`` instead of each waiting out
+its own timeout. After ``BREAKER_RESET_SECONDS`` a single probe call is let
+through; its outcome closes the breaker or opens it again.
+
+Callers turn ``Unavailable`` into a result flagged as degraded, so it can be
+regenerated once Gemini recovers.
+"""
+from __future__ import annotations
+
+import asyncio
+import os
+import random
+import sys
+import threading
+import time
+from typing import Any, Awaitable, Callable, TypeVar
+
+MAX_ATTEMPTS = int(os.getenv("GEMINI_MAX_ATTEMPTS", "4"))
+RETRY_BASE_SECONDS = float(os.getenv("GEMINI_RETRY_BASE_SECONDS", "1"))
+RETRY_MAX_SECONDS = float(os.getenv("GEMINI_RETRY_MAX_SECONDS", "20"))
+CALL_TIMEOUT_SECONDS = float(os.getenv("GEMINI_CALL_TIMEOUT_SECONDS", "60"))
+DEADLINE_SECONDS = float(os.getenv("GEMINI_DEADLINE_SECONDS", "120"))
+VIDEO_CALL_TIMEOUT_SECONDS = float(os.getenv("GEMINI_VIDEO_CALL_TIMEOUT_SECONDS", "600"))
+VIDEO_DEADLINE_SECONDS = float(os.getenv("GEMINI_VIDEO_DEADLINE_SECONDS", "1200"))
+BREAKER_FAILURES = int(os.getenv("GEMINI_BREAKER_FAILURES", "5"))
+BREAKER_RESET_SECONDS = float(os.getenv("GEMINI_BREAKER_RESET_SECONDS", "30"))
+
+TRANSIENT_STATUS_CODES = {408, 429, 500, 502, 503, 504}
+
+T = TypeVar("T")
+
+
+class Unavailable(Exception):
+    """Gemini could not produce a result within the retry budget."""
+
+
+class CircuitOpen(Unavailable):
+    """Raised without calling Gemini while the circuit breaker is open."""
+
+
+def is_transient(exc: BaseException) -> bool:
+    if isinstance(exc, (TimeoutError, asyncio.TimeoutError, ConnectionError)):
+        return True
+    # Only consult the SDK's exception types once the SDK has been imported;
+    # an error raised before then cannot be one of them.
+    google_exceptions = sys.modules.get("google.api_core.exceptions")
+    if google_exceptions is not None and isinstance(
+        exc,
+        (
+            google_exceptions.TooManyRequests,
+            google_exceptions.ResourceExhausted,
+            google_exceptions.ServerError,
+            google_exceptions.DeadlineExceeded,
+            google_exceptions.RetryError,
+        ),
+    ):
+        return True
+    return getattr(exc, "code", None) in TRANSIENT_STATUS_CODES
+
+
+class CircuitBreaker:
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int, reset_seconds: float) -> None:
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self._lock = threading.Lock()
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self._counters = {"opened": 0, "rejected": 0}
+
+    def before_call(self) -> None:
+        """Raise ``CircuitOpen`` unless a call may go to Gemini now."""
+        with self._lock:
+            if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_seconds:
+                self._state = self.HALF_OPEN
+                self._probing = False
+            if self._state == self.CLOSED:
+                return
+            if self._state == self.HALF_OPEN and not self._probing:
+                self._probing = True
+                return
+            self._counters["rejected"] += 1
+        raise CircuitOpen("Gemini is unavailable; skipping the call while the circuit breaker is open")
+
+    def cancel_probe(self) -> None:
+        """Let another call probe when this one was cancelled before finishing."""
+        with self._lock:
+            self._probing = False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._state = self.CLOSED
+            self._failures = 0
+            self._probing = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != self.OPEN:
+                    self._counters["opened"] += 1
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+                self._probing = False
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            retry_in = self.reset_seconds - (time.monotonic() - self._opened_at)
+            return {
+                "state": self._state,
+                "consecutive_failures": self._failures,
+                "retry_in_seconds": round(max(0.0, retry_in), 1) if self._state == self.OPEN else None,
+                **self._counters,
+            }
+
+
+BREAKER = CircuitBreaker(BREAKER_FAILURES, BREAKER_RESET_SECONDS)
+
+
+def _backoff(attempt: int) -> float:
+    return random.uniform(0, min(RETRY_MAX_SECONDS, RETRY_BASE_SECONDS * 2 ** attempt))
+
+
+def _plan_retry(exc: Exception, attempt: int, deadline: float) -> float:
+    """Record a failed attempt and return the pause before the next one, or raise."""
+    if not is_transient(exc):
+        # Says nothing about upstream health either way.
+        BREAKER.cancel_probe()
+        raise exc
+    BREAKER.record_failure()
+    pause = _backoff(attempt)
+    if attempt + 1 >= MAX_ATTEMPTS or time.monotonic() + pause >= deadline:
+        raise Unavailable(f"Gemini unavailable after {attempt + 1} attempt(s): {exc}") from exc
+    print(f"[GEMINI] Attempt {attempt + 1} failed ({exc}); retrying in {pause:.1f}s")
+    return pause
+
+
+def call(
+    attempt: Callable[[float], T],
+    call_timeout: float = CALL_TIMEOUT_SECONDS,
+    deadline_seconds: float = DEADLINE_SECONDS,
+) -> T:
+    """Run ``attempt(timeout)`` with retries.
+
+    ``attempt`` must bound the Gemini request itself by ``timeout`` seconds,
+    not counting time spent waiting for a rate limiter permit.
+    """
+    deadline = time.monotonic() + deadline_seconds
+    for index in range(MAX_ATTEMPTS):
+        BREAKER.before_call()
+        try:
+            result = attempt(max(1.0, min(call_timeout, deadline - time.monotonic())))
+        except Exception as exc:
+            time.sleep(_plan_retry(exc, index, deadline))
+            continue
+        except BaseException:
+            BREAKER.cancel_probe()
+            raise
+        BREAKER.record_success()
+        return result
+    raise Unavailable("Gemini retry budget exhausted")
+
+
+async def call_async(
+    attempt: Callable[[float], Awaitable[T]],
+    call_timeout: float = CALL_TIMEOUT_SECONDS,
+    deadline_seconds: float = DEADLINE_SECONDS,
+) -> T:
+    """Async variant of :func:`call`."""
+    deadline = time.monotonic() + deadline_seconds
+    for index in range(MAX_ATTEMPTS):
+        BREAKER.before_call()
+        try:
+            result = await attempt(max(1.0, min(call_timeout, deadline - time.monotonic())))
+        except Exception as exc:
+            await asyncio.sleep(_plan_retry(exc, index, deadline))
+            continue
+        except BaseException:
+            BREAKER.cancel_probe()
+            raise
+        BREAKER.record_success()
+        return result
+    raise Unavailable("Gemini retry budget exhausted")
+
+
+def stats() -> dict[str, Any]:
+    return {
+        "breaker": BREAKER.stats(),
+        "max_attempts": MAX_ATTEMPTS,
+        "deadline_seconds": DEADLINE_SECONDS,
+        "video_deadline_seconds": VIDEO_DEADLINE_SECONDS,
+    }
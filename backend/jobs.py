@@ -0,0 +1,355 @@
+"""Persistent background queue for Gemini video analysis.
+
+Jobs are rows in the ``analysis_jobs`` table, so queued work survives a
+restart. A pool of local asyncio workers claims queued jobs with a conditional
+UPDATE, which keeps two workers (or two processes sharing the database) from
+running the same job. Workers await Gemini instead of blocking a thread, so
+the pool can be sized for many concurrent analyses; short database calls are
+pushed to the default executor.
+
+A claim is a lease: the job records the claiming worker, and a heartbeat
+refreshes ``updated_at`` while it runs. Only jobs whose heartbeat is older than
+``LEASE_SECONDS`` are taken back and requeued, so a process that starts while
+another is still analysing does not run the same video again.
+"""
+from __future__ import annotations
+
+import asyncio
+import os
+import socket
+import uuid
+from datetime import datetime, timedelta
+from typing import Any
+
+from sqlalchemy import update
+
+import ai
+import models
+import progress
+import report_store
+import stats
+from database import SessionLocal
+
+WORKER_COUNT = int(os.getenv("ANALYSIS_WORKERS", "2"))
+MAX_ATTEMPTS = int(os.getenv("ANALYSIS_MAX_ATTEMPTS", "3"))
+POLL_INTERVAL_SECONDS = float(os.getenv("ANALYSIS_POLL_INTERVAL", "5"))
+LEASE_SECONDS = float(os.getenv("ANALYSIS_LEASE_SECONDS", "120"))
+HEARTBEAT_SECONDS = LEASE_SECONDS / 4
+
+# Identifies this process's claims in analysis_jobs.claimed_by
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+QUEUED = "queued"
+UPLOADING = "uploading"
+PROCESSING = "processing"
+DONE = "done"
+DEGRADED = "degraded"  # stored a fallback without scores; re-queue for a real analysis
+FAILED = "failed"
+IN_FLIGHT = (UPLOADING, PROCESSING)
+FINISHED = (DONE, DEGRADED, FAILED)
+
+_loop: asyncio.AbstractEventLoop | None = None
+_wakeup: asyncio.Event | None = None
+_workers: list[asyncio.Task] = []
+
+
+def enqueue(db, video_analysis: models.VideoAnalysis) -> models.AnalysisJob:
+    """Queue analysis for a saved video; the caller commits the session."""
+    job = models.AnalysisJob(video_analysis_id=video_analysis.id, status=QUEUED, attempts=0)
+    db.add(job)
+    return job
+
+
+def notify() -> None:
+    """Wake idle workers after a job has been committed; safe from any thread."""
+    if _loop is not None and _wakeup is not None:
+        _loop.call_soon_threadsafe(_wakeup.set)
+
+
+def status_payload(job: models.AnalysisJob) -> dict[str, Any]:
+    return {
+        "job_id": job.id,
+        "video_analysis_id": job.video_analysis_id,
+        "status": job.status,
+        "attempts": job.attempts,
+        "error": job.error,
+        "created_at": job.created_at.isoformat() if job.created_at else None,
+        "updated_at": job.updated_at.isoformat() if job.updated_at else None,
+    }
+
+
+def recover_expired(db, now: datetime | None = None) -> int:
+    """Requeue in-flight jobs whose lease ran out; the caller commits the session."""
+    now = now or datetime.utcnow()
+    result = db.execute(
+        update(models.AnalysisJob)
+        .where(
+            models.AnalysisJob.status.in_(IN_FLIGHT),
+            models.AnalysisJob.updated_at < now - timedelta(seconds=LEASE_SECONDS),
+        )
+        .values(status=QUEUED, claimed_by=None, updated_at=now)
+    )
+    return result.rowcount
+
+
+def _release_claims() -> int:
+    """Requeue the jobs this process was running, so they need not wait out the lease."""
+    with SessionLocal() as db:
+        result = db.execute(
+            update(models.AnalysisJob)
+            .where(models.AnalysisJob.status.in_(IN_FLIGHT), models.AnalysisJob.claimed_by == WORKER_ID)
+            .values(status=QUEUED, claimed_by=None, updated_at=datetime.utcnow())
+        )
+        db.commit()
+        return result.rowcount
+
+
+def start_workers(count: int = WORKER_COUNT) -> None:
+    """Start the worker pool on the running loop."""
+    global _loop, _wakeup
+    if _workers:
+        return
+    _loop = asyncio.get_running_loop()
+    _wakeup = asyncio.Event()
+    for index in range(count):
+        _workers.append(asyncio.create_task(_worker_loop(), name=f"analysis-worker-{index}"))
+
+
+async def stop_workers() -> None:
+    """Cancel the worker pool and requeue the jobs it was running."""
+    global _loop, _wakeup
+    for worker in _workers:
+        worker.cancel()
+    await asyncio.gather(*_workers, return_exceptions=True)
+    _workers.clear()
+    _loop = _wakeup = None
+    await asyncio.to_thread(_release_claims)
+
+
+async def _worker_loop() -> None:
+    while True:
+        # Clear before claiming so a notify() during the claim is not lost.
+        _wakeup.clear()
+        try:
+            job_id = await asyncio.to_thread(_claim_next)
+        except Exception as exc:  # database briefly unavailable; retry after a pause
+            print(f"[JOBS] Failed to claim job: {exc}")
+            job_id = None
+
+        if job_id is None:
+            try:
+                await asyncio.wait_for(_wakeup.wait(), POLL_INTERVAL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+            continue
+
+        try:
+            await _run(job_id)
+        except Exception as exc:  # keep the worker; the job returns once its lease expires
+            print(f"[JOBS] Job {job_id} stopped with an error: {exc}")
+
+
+def _claim_next() -> int | None:
+    with SessionLocal() as db:
+        # Jobs of a process that died mid-analysis come back once their lease expires.
+        if recover_expired(db):
+            db.commit()
+        while True:
+            job_id = (
+                db.query(models.AnalysisJob.id)
+                .filter(models.AnalysisJob.status == QUEUED)
+                .order_by(models.AnalysisJob.id)
+                .limit(1)
+                .scalar()
+            )
+            if job_id is None:
+                return None
+
+            claimed = db.execute(
+                update(models.AnalysisJob)
+                .where(models.AnalysisJob.id == job_id, models.AnalysisJob.status == QUEUED)
+                .values(
+                    status=UPLOADING,
+                    claimed_by=WORKER_ID,
+                    attempts=models.AnalysisJob.attempts + 1,
+                    updated_at=datetime.utcnow(),
+                )
+            )
+            db.commit()
+            if claimed.rowcount == 1:
+                return job_id
+            # Another worker won the race for this job; look for the next one.
+
+
+def requeue(db, video_analysis: models.VideoAnalysis) -> models.AnalysisJob:
+    """Queue a fresh analysis attempt; the caller commits the session."""
+    job = video_analysis.job
+    if job is None:
+        return enqueue(db, video_analysis)
+    job.status = QUEUED
+    job.attempts = 0
+    job.error = None
+    job.claimed_by = None
+    return job
+
+
+def _set_status(job_id: int, status: str, error: str | None = None) -> None:
+    with SessionLocal() as db:
+        db.execute(
+            update(models.AnalysisJob)
+            .where(models.AnalysisJob.id == job_id, models.AnalysisJob.claimed_by == WORKER_ID)
+            .values(status=status, error=error, updated_at=datetime.utcnow())
+        )
+        db.commit()
+
+
+def _heartbeat(job_id: int) -> None:
+    with SessionLocal() as db:
+        db.execute(
+            update(models.AnalysisJob)
+            .where(
+                models.AnalysisJob.id == job_id,
+                models.AnalysisJob.claimed_by == WORKER_ID,
+                models.AnalysisJob.status.in_(IN_FLIGHT),
+            )
+            .values(updated_at=datetime.utcnow())
+        )
+        db.commit()
+
+
+async def _keep_lease(job_id: int) -> None:
+    while True:
+        await asyncio.sleep(HEARTBEAT_SECONDS)
+        try:
+            await asyncio.to_thread(_heartbeat, job_id)
+        except Exception as exc:  # a missed beat is retried; the lease outlasts several
+            print(f"[JOBS] Failed to refresh lease of job {job_id}: {exc}")
+
+
+async def _run(job_id: int) -> None:
+    loaded = await asyncio.to_thread(_load, job_id)
+    if loaded is None:
+        return
+    video_analysis, player, partner, instructions = loaded
+    video_analysis_id = video_analysis.id
+    progress.publish(video_analysis_id, "status", {"video_analysis_id": video_analysis_id, "status": UPLOADING})
+
+    async def on_status(status: str) -> None:
+        await asyncio.to_thread(_set_status, job_id, status)
+        progress.publish(video_analysis_id, "status", {"video_analysis_id": video_analysis_id, "status": status})
+
+    async def on_field(name: str, value: Any) -> None:
+        progress.publish(video_analysis_id, "field", {"name": name, "value": value})
+
+    lease = asyncio.create_task(_keep_lease(job_id))
+    try:
+        result = await ai.generate_video_analysis_async(
+            video_analysis, player, partner, on_status=on_status, instructions=instructions, on_field=on_field
+        )
+        payload = await asyncio.to_thread(_store_result, job_id, result)
+    except Exception as exc:
+        payload = await asyncio.to_thread(_record_failure, job_id, str(exc))
+    finally:
+        lease.cancel()
+    if payload is not None:
+        progress.publish(video_analysis_id, "status", payload)
+
+
+def _load(
+    job_id: int,
+) -> tuple[models.VideoAnalysis, models.Player, models.Player | None, str | None] | None:
+    """Load the rows a job needs, plus the coach's AI instructions.
+
+    The rows stay readable after the session closes.
+    """
+    with SessionLocal() as db:
+        job = db.get(models.AnalysisJob, job_id)
+        if job is None:
+            return None
+        video_analysis = job.video_analysis
+        if video_analysis is None:
+            job.status = FAILED
+            job.error = "Video analysis was deleted"
+            db.commit()
+            return None
+        coach = video_analysis.coach
+        instructions = coach.ai_instructions if coach is not None else None
+        return video_analysis, video_analysis.player, video_analysis.partner, instructions
+
+
+def _finish(db, job_id: int, status: str, error: str | None) -> bool:
+    """Record the outcome of a job this worker still holds; False if its lease was lost.
+
+    The conditional UPDATE comes first in the transaction, so the job cannot be
+    reclaimed between the check and the writes that follow it.
+    """
+    result = db.execute(
+        update(models.AnalysisJob)
+        .where(
+            models.AnalysisJob.id == job_id,
+            models.AnalysisJob.claimed_by == WORKER_ID,
+            models.AnalysisJob.status.in_(IN_FLIGHT),
+        )
+        .values(status=status, error=error, claimed_by=None, updated_at=datetime.utcnow())
+    )
+    if result.rowcount == 1:
+        return True
+    db.rollback()
+    print(f"[JOBS] Lease on job {job_id} was lost; discarding this worker's outcome")
+    return False
+
+
+def _store_result(job_id: int, result: dict[str, Any]) -> dict[str, Any] | None:
+    degraded = bool(result.get("degraded"))
+    with SessionLocal() as db:
+        if not _finish(db, job_id, DEGRADED if degraded else DONE, result.get("degraded_reason") if degraded else None):
+            return None
+        job = db.get(models.AnalysisJob, job_id)
+        video_analysis = job.video_analysis
+        # A degraded retry must not replace a real analysis stored earlier.
+        if not (degraded and _has_real_report(video_analysis)):
+            before = stats.video_entry(video_analysis)
+            apply_result(video_analysis, result)
+            db.flush()
+            stats.record_replaced(db, before, stats.video_entry(video_analysis))
+        db.commit()
+        return status_payload(job)
+
+
+def _has_real_report(video_analysis: models.VideoAnalysis) -> bool:
+    has_report = video_analysis.ai_report_data is not None or video_analysis.ai_report_json is not None
+    return has_report and not video_analysis.report_degraded
+
+
+def _record_failure(job_id: int, error: str) -> dict[str, Any] | None:
+    with SessionLocal() as db:
+        job = db.get(models.AnalysisJob, job_id)
+        if job is None:
+            return None
+        if not _finish(db, job_id, QUEUED if job.attempts < MAX_ATTEMPTS else FAILED, error):
+            return None
+        db.commit()
+        payload = status_payload(job)
+    if payload["status"] == QUEUED:
+        notify()
+    return payload
+
+
+def apply_result(video_analysis: models.VideoAnalysis, analysis_result: dict[str, Any]) -> None:
+    """Store an analysis payload and its headline scores on the row."""
+    for name, value in report_store.columns(analysis_result).items():
+        setattr(video_analysis, name, value)
+
+    if isinstance(analysis_result, dict) and "scores" in analysis_result:
+        # Degraded results carry no scores; clear any from an earlier run.
+        scores = analysis_result["scores"] or {}
+        video_analysis.presence_score = scores.get("presence")
+        video_analysis.skill_score = scores.get("skill")
+        video_analysis.intent_score = scores.get("intent")
+        video_analysis.psi_score = scores.get("psi")
+
+    # Store synergy score for doubles
+    if video_analysis.game_format == "doubles" and "team_performance" in analysis_result:
+        team_perf = analysis_result["team_performance"]
+        if isinstance(team_perf, dict):
+            video_analysis.synergy_score = team_perf.get("synergy_score")
@@ -0,0 +1,96 @@
+"""Incremental parsing of a JSON object that arrives in chunks.
+
+Gemini streams a report as fragments of one JSON object. ``FieldParser`` scans
+each fragment once and returns the top-level fields whose values have just
+been closed, so callers can forward scores or a bullet list while the rest of
+the object is still being generated. Text before the opening brace, such as a
+Markdown code fence, is skipped. A field whose value is not valid JSON is
+left out; the caller still validates the whole document at the end.
+"""
+from __future__ import annotations
+
+import json
+from typing import Any
+
+
+class FieldParser:
+    def __init__(self) -> None:
+        self._text = ""
+        self._pos = 0
+        self._start: int | None = None
+        self._end: int | None = None
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        self._key_start: int | None = None
+        self._key: str | None = None
+        self._value_start: int | None = None
+
+    @property
+    def text(self) -> str:
+        """Everything received so far."""
+        return self._text
+
+    @property
+    def document(self) -> str:
+        """The JSON object received so far, without surrounding text."""
+        if self._start is None:
+            return self._text
+        end = self._end + 1 if self._end is not None else len(self._text)
+        return self._text[self._start:end]
+
+    @property
+    def complete(self) -> bool:
+        return self._end is not None
+
+    def feed(self, chunk: str) -> list[tuple[str, Any]]:
+        """Add a chunk and return the ``(name, value)`` fields it completed."""
+        self._text += chunk
+        text = self._text
+        fields: list[tuple[str, Any]] = []
+        while self._pos < len(text) and self._end is None:
+            index = self._pos
+            char = text[index]
+            self._pos += 1
+            if self._start is None:
+                if char == "{":
+                    self._start = index
+                    self._depth = 1
+                continue
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+                    if self._depth == 1 and self._value_start is None:
+                        self._key = json.loads(text[self._key_start:index + 1])
+                continue
+            if char == '"':
+                self._in_string = True
+                if self._depth == 1 and self._value_start is None:
+                    self._key_start = index
+            elif char in "{[":
+                self._depth += 1
+            elif char in "}]":
+                self._depth -= 1
+                if self._depth == 0:
+                    self._finish_field(index, fields)
+                    self._end = index
+            elif self._depth == 1:
+                if char == ",":
+                    self._finish_field(index, fields)
+                elif char == ":" and self._value_start is None:
+                    self._value_start = index + 1
+        return fields
+
+    def _finish_field(self, end: int, fields: list[tuple[str, Any]]) -> None:
+        if self._key is not None and self._value_start is not None:
+            try:
+                fields.append((self._key, json.loads(self._text[self._value_start:end])))
+            except json.JSONDecodeError:
+                pass
+        self._key = None
+        self._key_start = None
+        self._value_start = None
@@ -1,45 +1,52 @@
+import asyncio
 import json
+import mimetypes
+import os
+from contextlib import asynccontextmanager
+from datetime import datetime
 from typing import Any
 
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi import FastAPI, HTTPException, Depends
-from sqlalchemy import func, inspect
-from sqlalchemy.orm import Session
-from sqlalchemy.exc import NoSuchTableError
-from database import engine, SessionLocal, Base
-import models, schemas, ai, verification
-
-Base.metadata.create_all(bind=engine)
-
-
-def _ensure_coach_columns() -> None:
-    """Add new optional coach fields when older SQLite files are in use."""
-    inspector = inspect(engine)
-    try:
-        columns = {col["name"] for col in inspector.get_columns("coaches")}
-    except NoSuchTableError:
-        return
-
-    required = {
-        "ai_instructions": "TEXT",
-        "profile_picture": "TEXT",
-    }
-
-    missing = {name: dtype for name, dtype in required.items() if name not in columns}
-    if not missing:
-        return
-
-    with engine.begin() as connection:
-        for column_name, column_type in missing.items():
-            connection.exec_driver_sql(
-                f"ALTER TABLE coaches ADD COLUMN {column_name} {column_type}"
-            )
-
-
-_ensure_coach_columns()
-app = FastAPI()
+from fastapi import FastAPI, HTTPException, Depends, Request
+from fastapi.responses import FileResponse, Response, StreamingResponse
+from pydantic import ValidationError
+from sqlalchemy import func, or_, select, update
+from sqlalchemy.orm import Session, load_only, selectinload
+from sqlalchemy.ext.asyncio import AsyncSession
+from database import async_engine, SessionLocal, AsyncSessionLocal
+import models, schemas, ai, avatars, code_store, gemini_limiter, gemini_resilience, jobs, outbox, pagination, progress, report_cache, report_store, schema, stats, verification, storage, uploads
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if schema.CHECK_ON_STARTUP:
+        await asyncio.to_thread(schema.prepare)
+    ai.prewarm()
+    jobs.start_workers()
+    code_store.start_sweeper()
+    outbox.start_sender()
+    report_store.start_backfill()
+    avatars.start_backfill()
+    storage.start_backfill()
+    yield
+    await storage.stop_backfill()
+    await avatars.stop_backfill()
+    await report_store.stop_backfill()
+    await outbox.stop_sender()
+    await code_store.stop_sweeper()
+    await jobs.stop_workers()
+    await async_engine.dispose()
+
+
+app = FastAPI(lifespan=lifespan)
 
 VALID_LEVELS = {"beginner", "intermediate", "advanced"}
+BATCH_REPORT_CONCURRENCY = int(os.getenv("BATCH_REPORT_CONCURRENCY", "8"))
+MAX_VIDEO_UPLOAD_BYTES = int(os.getenv("MAX_VIDEO_UPLOAD_BYTES", str(2 * 1024 ** 3)))
+UPLOAD_WRITE_SLICE_BYTES = 1024 * 1024  # chunk bodies are written to disk in slices of this size
+BOOTSTRAP_ACTIVITY_LIMIT = int(os.getenv("BOOTSTRAP_ACTIVITY_LIMIT", "10"))
+SSE_KEEPALIVE_SECONDS = float(os.getenv("SSE_KEEPALIVE_SECONDS", "15"))
+# Keep proxies from buffering or caching event streams
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
 
 app.add_middleware(
     CORSMiddleware,
@@ -47,8 +54,15 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[pagination.NEXT_CURSOR_HEADER],
 )
 
+def _etag_matches(request: Request, etag: str) -> bool:
+    """True when the client's If-None-Match already names ``etag``."""
+    tags = {tag.strip() for tag in request.headers.get("if-none-match", "").split(",")}
+    return bool(tags & {etag, f"W/{etag}", "*"})
+
+
 def get_db():
     db = SessionLocal()
     try:
@@ -56,6 +70,39 @@ def get_db():
     finally:
         db.close()
 
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+async def _release_connection(db: AsyncSession, *instances: Any) -> None:
+    """Detach loaded rows and return the pooled connection before a long await.
+
+    Gemini calls can take tens of seconds; holding a connection for that long
+    would cap concurrent reports at the pool size.
+    """
+    for instance in instances:
+        if instance is not None:
+            db.expunge(instance)
+    await db.rollback()
+
+
+async def _coach_instructions(db: AsyncSession, *players: Any) -> dict[int, str | None]:
+    """The AI instructions of the players' coaches, keyed by coach id."""
+    coach_ids = {player.coach_id for player in players if player is not None}
+    if not coach_ids:
+        return {}
+    rows = await db.execute(
+        select(models.Coach.id, models.Coach.ai_instructions).where(models.Coach.id.in_(coach_ids))
+    )
+    return dict(rows.all())
+
+
+def _sse(event: str, data: Any) -> str:
+    """One Server-Sent Event frame."""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
 @app.post("/create-player")
 def create_player(player_data: dict, db: Session = Depends(get_db)):
     name = player_data.get("name", "").strip()
@@ -104,7 +151,13 @@ def create_player(player_data: dict, db: Session = Depends(get_db)):
     return {"status": "Player created", "player_id": new_player.id}
 
 @app.get("/players")
-def list_players(coach_username: str = None, db: Session = Depends(get_db)):
+def list_players(
+    response: Response,
+    coach_username: str = None,
+    page: pagination.OptionalPageParams = Depends(),
+    db: Session = Depends(get_db),
+):
+    """A coach's roster; paged only when ``limit`` or ``cursor`` is given."""
     if not coach_username:
         raise HTTPException(status_code=400, detail="Coach username required")
 
@@ -112,20 +165,84 @@ def list_players(coach_username: str = None, db: Session = Depends(get_db)):
     if not coach:
         raise HTTPException(status_code=404, detail="Coach not found")
 
-    return db.query(models.Player).filter(models.Player.coach_id == coach.id).all()
+    query = db.query(models.Player).filter(models.Player.coach_id == coach.id)
+    return pagination.paginate_by_id(query, models.Player, page, response)
 
 @app.post("/submit-evaluation")
-def submit_evaluation(evaluation: schemas.EvaluationTextCreate, db: Session = Depends(get_db)):
-    player = db.query(models.Player).filter(models.Player.id == evaluation.player_id).first()
+async def submit_evaluation(
+    evaluation: schemas.EvaluationTextCreate, force: bool = False, db: AsyncSession = Depends(get_async_db)
+):
+    player = await db.get(models.Player, evaluation.player_id)
     if not player:
         raise HTTPException(status_code=404, detail="Player not found")
 
-    report = ai.generate_psi_report(evaluation, player=player)
+    instructions = (await _coach_instructions(db, player)).get(player.coach_id)
+    await _release_connection(db, player)
+    report = await ai.generate_psi_report_async(evaluation, player=player, force=force, instructions=instructions)
     report_payload = report.as_dict()
-    scores = report_payload["scores"]
-    feedback = report_payload["formatted"]
+    eval_model = await _save_evaluation(db, evaluation, report_payload, player.coach_id)
+    return _evaluation_submitted(eval_model, report_payload)
+
+@app.post("/submit-evaluation/stream")
+async def submit_evaluation_stream(
+    evaluation: schemas.EvaluationTextCreate, force: bool = False, db: AsyncSession = Depends(get_async_db)
+):
+    """Submit an evaluation and stream its PSI report as Server-Sent Events.
+
+    ``field`` events carry each report field as soon as Gemini has written it,
+    scores first. The validated report is then saved and sent as a ``report``
+    event shaped like the ``/submit-evaluation`` response. An ``error`` event
+    ends the stream if the report cannot be saved. Closing the stream early
+    abandons the evaluation.
+    """
+    player = await db.get(models.Player, evaluation.player_id)
+    if not player:
+        raise HTTPException(status_code=404, detail="Player not found")
+
+    instructions = (await _coach_instructions(db, player)).get(player.coach_id)
+    await _release_connection(db, player)
+
+    async def stream():
+        try:
+            async for name, value in ai.stream_psi_report(
+                evaluation, player=player, force=force, instructions=instructions
+            ):
+                if name == ai.REPORT:
+                    report = value
+                else:
+                    yield _sse("field", {"name": name, "value": value})
+            report_payload = report.as_dict()
+            # The request's session may already be closed once the body streams.
+            async with AsyncSessionLocal() as session:
+                eval_model = await _save_evaluation(session, evaluation, report_payload, player.coach_id)
+        except Exception as exc:
+            yield _sse("error", {"detail": str(exc)})
+            return
+        yield _sse("report", _evaluation_submitted(eval_model, report_payload))
+
+    return StreamingResponse(stream(), media_type="text/event-stream", headers=SSE_HEADERS)
+
+async def _save_evaluation(
+    db: AsyncSession, evaluation: schemas.EvaluationTextCreate, report_payload: dict[str, Any], coach_id: int
+) -> models.Evaluation:
+    eval_model = _evaluation_row(evaluation, report_payload)
+    db.add(eval_model)
+    await db.flush()
+    await db.run_sync(stats.record_added, stats.evaluation_entry(eval_model, coach_id))
+    await db.commit()
+    return eval_model
+
+def _evaluation_submitted(eval_model: models.Evaluation, report_payload: dict[str, Any]) -> dict[str, Any]:
+    return {
+        "status": "Evaluation submitted",
+        "evaluation_id": eval_model.id,
+        "report": report_payload["formatted"],
+        "psi_report": report_payload,
+    }
 
-    eval_model = models.Evaluation(
+def _evaluation_row(evaluation: schemas.EvaluationTextCreate, report_payload: dict[str, Any]) -> models.Evaluation:
+    scores = report_payload["scores"]
+    return models.Evaluation(
         player_id=evaluation.player_id,
         session_id=evaluation.session_id,
         date=evaluation.date,
@@ -144,77 +261,228 @@ def submit_evaluation(evaluation: schemas.EvaluationTextCreate, db: Session = De
         skill_score=scores["skill"],
         intent_score=scores["intent"],
         psi_score=scores["psi"],
-        ai_feedback=feedback,
-        ai_report_json=json.dumps(report_payload)
+        **report_store.columns(report_payload),
     )
 
-    db.add(eval_model)
-    db.commit()
-    db.refresh(eval_model)
+@app.post("/submit-evaluations/batch")
+async def submit_evaluations_batch(
+    evaluations: list[schemas.EvaluationTextCreate], force: bool = False, db: AsyncSession = Depends(get_async_db)
+):
+    """Generate PSI reports for a whole squad session concurrently.
+
+    Reports stream back as NDJSON lines in completion order. Once every report
+    is ready, all evaluations are inserted in a single transaction and a final
+    line lists the new evaluation ids in request order (null where the report
+    failed and nothing was saved). If that transaction fails, nothing is saved
+    and the final line is an ``error`` instead.
+    """
+    if not evaluations:
+        raise HTTPException(status_code=400, detail="At least one evaluation is required")
+
+    player_ids = {evaluation.player_id for evaluation in evaluations}
+    result = await db.scalars(select(models.Player).where(models.Player.id.in_(player_ids)))
+    players = {player.id: player for player in result}
+    missing = sorted(player_ids - players.keys())
+    if missing:
+        raise HTTPException(status_code=404, detail=f"Player not found: {', '.join(map(str, missing))}")
+    instructions = await _coach_instructions(db, *players.values())
+    await _release_connection(db, *players.values())
+
+    semaphore = asyncio.Semaphore(BATCH_REPORT_CONCURRENCY)
+
+    async def generate(index: int, evaluation: schemas.EvaluationTextCreate):
+        async with semaphore:
+            try:
+                player = players[evaluation.player_id]
+                report = await ai.generate_psi_report_async(
+                    evaluation,
+                    player=player,
+                    force=force,
+                    lane=gemini_limiter.BATCH,
+                    instructions=instructions.get(player.coach_id),
+                )
+            except Exception as exc:
+                return index, None, str(exc)
+        return index, report.as_dict(), None
+
+    async def save(payloads: list[dict[str, Any] | None]) -> list[int | None]:
+        async with AsyncSessionLocal() as session:
+            rows = [
+                _evaluation_row(evaluation, payload) if payload is not None else None
+                for evaluation, payload in zip(evaluations, payloads)
+            ]
+            saved = [row for row in rows if row is not None]
+            session.add_all(saved)
+            await session.flush()
+
+            def record(sync_session: Session) -> None:
+                for row in saved:
+                    stats.record_added(sync_session, stats.evaluation_entry(row, players[row.player_id].coach_id))
+
+            await session.run_sync(record)
+            await session.commit()
+            return [row.id if row is not None else None for row in rows]
+
+    async def stream():
+        payloads: list[dict[str, Any] | None] = [None] * len(evaluations)
+        for task in asyncio.as_completed([generate(i, e) for i, e in enumerate(evaluations)]):
+            index, report_payload, error = await task
+            payloads[index] = report_payload
+            evaluation = evaluations[index]
+            line = {
+                "index": index,
+                "player_id": evaluation.player_id,
+                "player": players[evaluation.player_id].name,
+                "session_id": evaluation.session_id,
+            }
+            if error is not None:
+                line["error"] = error
+            else:
+                line.update(report=report_payload["formatted"], psi_report=report_payload)
+            yield json.dumps(line) + "\n"
 
-    response = {
-        "status": "Evaluation submitted",
-        "evaluation_id": eval_model.id,
-        "report": feedback,
-        "psi_report": report_payload,
-    }
+        try:
+            evaluation_ids = await save(payloads)
+        except Exception as exc:
+            yield json.dumps({"error": f"Evaluations were not saved: {exc}"}) + "\n"
+            return
+        yield json.dumps({"status": "Evaluations submitted", "evaluation_ids": evaluation_ids}) + "\n"
 
-    return response
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
 
 @app.post("/generate-report")
-def generate_report(request: schemas.ReportRequest, db: Session = Depends(get_db)):
-    evaluation = db.query(models.Evaluation).filter(models.Evaluation.id == request.evaluation_id).first()
+async def generate_report(
+    request: schemas.ReportRequest, force: bool = False, db: AsyncSession = Depends(get_async_db)
+):
+    evaluation = await db.get(
+        models.Evaluation, request.evaluation_id, options=[selectinload(models.Evaluation.player)]
+    )
     if not evaluation:
         raise HTTPException(status_code=404, detail="Evaluation not found")
 
-    player = evaluation.player if hasattr(evaluation, "player") else None
-    report = ai.generate_psi_report(evaluation, player=player)
+    player = evaluation.player
+    instructions = (await _coach_instructions(db, player)).get(player.coach_id) if player else None
+    await _release_connection(db, evaluation, player)
+    report = await ai.generate_psi_report_async(evaluation, player=player, force=force, instructions=instructions)
     report_payload = report.as_dict()
     feedback = report_payload["formatted"]
 
+    evaluation = await db.merge(evaluation)
+    before = stats.evaluation_entry(evaluation, player.coach_id) if player else None
+
     evaluation.pressure_score = report_payload["scores"]["presence"]
     evaluation.skill_score = report_payload["scores"]["skill"]
     evaluation.intent_score = report_payload["scores"]["intent"]
     evaluation.psi_score = report_payload["scores"]["psi"]
-    evaluation.ai_feedback = feedback
-    evaluation.ai_report_json = json.dumps(report_payload)
-    db.commit()
+    evaluation.ai_feedback = None
+    for name, value in report_store.columns(report_payload).items():
+        setattr(evaluation, name, value)
+    if before is not None:
+        await db.flush()
+        await db.run_sync(stats.record_replaced, before, stats.evaluation_entry(evaluation, player.coach_id))
+    await db.commit()
     return {"report": feedback, "psi_report": report_payload}
 
+@app.get("/report-cache/stats")
+def report_cache_stats():
+    """Hit/miss counters and size of the PSI report cache."""
+    return report_cache.stats()
+
+@app.get("/ai/limiter/stats")
+def ai_limiter_stats():
+    """Queue depth, wait times and remaining budget of the Gemini rate limiter."""
+    return gemini_limiter.stats()
+
+@app.get("/ai/models/stats")
+def ai_model_stats():
+    """Hits, misses and size of the configured Gemini model registry."""
+    return ai.MODELS.stats()
+
+@app.get("/ai/status")
+def ai_status():
+    """Circuit breaker state; while it is open new reports are degraded fallbacks."""
+    resilience = gemini_resilience.stats()
+    return {"degraded": resilience["breaker"]["state"] != "closed", **resilience}
+
+HISTORY_COLUMNS = (
+    models.Evaluation.id,
+    models.Evaluation.session_id,
+    models.Evaluation.date,
+    models.Evaluation.pressure_score,
+    models.Evaluation.skill_score,
+    models.Evaluation.intent_score,
+    models.Evaluation.psi_score,
+    models.Evaluation.ai_report_data,
+    models.Evaluation.ai_report_json,
+    models.Evaluation.ai_feedback,
+    models.Player.name.label("player"),
+)
+
+
+def _history_item_json(row) -> str:
+    """Serialize one history row.
+
+    Legacy reports that still carry their ``formatted`` text are spliced in
+    verbatim. Other reports get the text rendered from their fields, or keep
+    the stored feedback when they are not a complete PSI report.
+    """
+    report_payload = report_store.load(row.ai_report_data, row.ai_report_json)
+    feedback = row.ai_feedback
+    report = "null"
+    if report_payload is not None:
+        if row.ai_report_data is None and "formatted" in report_payload:
+            report = row.ai_report_json
+        else:
+            if "formatted" not in report_payload:
+                try:
+                    report_payload["formatted"] = feedback or ai.formatted_report(report_payload)
+                except ValidationError:
+                    if feedback is not None:
+                        report_payload["formatted"] = feedback
+            report = json.dumps(report_payload)
+        feedback = report_payload.get("formatted", feedback)
+    fields = json.dumps(
+        {
+            "id": row.id,
+            "session_id": row.session_id,
+            "date": row.date.isoformat() if row.date else None,
+            "pressure_score": row.pressure_score,
+            "skill_score": row.skill_score,
+            "intent_score": row.intent_score,
+            "psi_score": row.psi_score,
+            "ai_feedback": feedback,
+            "player": row.player,
+        }
+    )
+    return f'{fields[:-1]}, "psi_report": {report}}}'
+
+
 @app.get("/player/{player_id}/history")
-def player_history(player_id: int, db: Session = Depends(get_db)):
-    evaluations = (
-        db.query(models.Evaluation)
-        .filter(models.Evaluation.player_id == player_id)
-        .order_by(models.Evaluation.date.desc())
-        .all()
+def player_history(
+    player_id: int,
+    response: Response,
+    page: pagination.OptionalPageParams = Depends(),
+    filters: pagination.HistoryFilters = Depends(),
+    db: Session = Depends(get_db),
+):
+    """List a player's evaluations, newest first, with their PSI reports."""
+    query = (
+        db.query(*HISTORY_COLUMNS)
+        .join(models.Player, models.Player.id == models.Evaluation.player_id)
+        .filter(models.Evaluation.player_id == player_id, *filters.criteria(models.Evaluation))
     )
+    rows = pagination.paginate_by_date(query, models.Evaluation, page, response)
 
-    history: list[dict[str, Any]] = []
-    for item in evaluations:
-        report_payload = None
-        if item.ai_report_json:
-            try:
-                report_payload = json.loads(item.ai_report_json)
-            except json.JSONDecodeError:
-                report_payload = None
+    body = "[" + ", ".join(_history_item_json(row) for row in rows) + "]"
+    return Response(content=body, media_type="application/json", headers=response.headers)
 
-        history.append(
-            {
-                "id": item.id,
-                "session_id": item.session_id,
-                "date": item.date.isoformat() if item.date else None,
-                "pressure_score": item.pressure_score,
-                "skill_score": item.skill_score,
-                "intent_score": item.intent_score,
-                "psi_score": item.psi_score,
-                "ai_feedback": item.ai_feedback,
-                "psi_report": report_payload,
-                "player": item.player.name if item.player else None,
-            }
-        )
+@app.get("/player/{player_id}/stats")
+def player_stats(player_id: int, db: Session = Depends(get_db)):
+    """Score averages, PSI trend and session counts for a player."""
+    if db.get(models.Player, player_id) is None:
+        raise HTTPException(status_code=404, detail="Player not found")
 
-    return history
+    return {"player_id": player_id, **stats.summary(stats.get(db, stats.PLAYER, player_id))}
 
 @app.post("/check-email")
 def check_email(data: dict, db: Session = Depends(get_db)):
@@ -253,7 +521,14 @@ def login(login: schemas.CoachLogin, db: Session = Depends(get_db)):
 def send_verification(request: schemas.SendVerificationCode):
     """Send verification code to email."""
     code = verification.generate_verification_code()
-    verification.store_verification_code(request.contact, code, request.type)
+    try:
+        verification.store_verification_code(request.contact, code, request.type)
+    except code_store.RateLimited as exc:
+        raise HTTPException(
+            status_code=429,
+            detail="Too many verification codes requested. Try again later.",
+            headers={"Retry-After": str(max(1, int(exc.retry_after.total_seconds())))},
+        )
 
     success = verification.send_email_verification(request.contact, code)
 
@@ -279,13 +554,104 @@ def get_coach(username: str, db: Session = Depends(get_db)):
     if not coach:
         raise HTTPException(status_code=404, detail="Coach not found")
 
+    return _coach_profile(coach)
+
+def _coach_profile(coach: models.Coach) -> dict[str, Any]:
+    # Legacy base64 pictures have no URL until the avatar backfill moves them.
     return {
         "username": coach.username,
         "email": coach.email,
         "phone": coach.phone,
         "dob": coach.dob,
         "ai_instructions": coach.ai_instructions,
-        "profile_picture": coach.profile_picture
+        "profile_picture_url": avatars.avatar_url(coach.profile_picture),
+        "profile_picture_urls": avatars.avatar_urls(coach.profile_picture),
+    }
+
+@app.get("/coach/{username}/stats")
+def coach_stats(username: str, db: Session = Depends(get_db)):
+    """Score averages, PSI trend and session counts across a coach's players."""
+    coach_id = db.query(models.Coach.id).filter(models.Coach.username == username).scalar()
+    if coach_id is None:
+        raise HTTPException(status_code=404, detail="Coach not found")
+
+    return {"coach": username, **stats.summary(stats.get(db, stats.COACH, coach_id))}
+
+def _latest_scored(model, column):
+    """Correlated subquery for ``column`` of a player's most recent scored session."""
+    return (
+        select(column)
+        .where(model.player_id == models.Player.id, model.psi_score.isnot(None))
+        .order_by(model.date.desc().nulls_last(), model.id.desc())
+        .limit(1)
+        .scalar_subquery()
+    )
+
+
+@app.get("/coach/{username}/bootstrap")
+def coach_bootstrap(username: str, db: Session = Depends(get_db)):
+    """Profile, roster with latest PSI and recent sessions for first paint."""
+    coach = db.query(models.Coach).filter(models.Coach.username == username).first()
+    if not coach:
+        raise HTTPException(status_code=404, detail="Coach not found")
+    profile = _coach_profile(coach)
+
+    # Each subquery reads the newest-first (player_id, date, id) index on its
+    # table, so the roster is one statement however long the histories are.
+    roster_rows = (
+        db.query(
+            models.Player,
+            _latest_scored(models.Evaluation, models.Evaluation.psi_score).label("evaluation_psi"),
+            _latest_scored(models.Evaluation, models.Evaluation.date).label("evaluation_date"),
+            _latest_scored(models.VideoAnalysis, models.VideoAnalysis.psi_score).label("video_psi"),
+            _latest_scored(models.VideoAnalysis, models.VideoAnalysis.date).label("video_date"),
+        )
+        .filter(models.Player.coach_id == coach.id)
+        .order_by(models.Player.id)
+        .all()
+    )
+    players = []
+    for player, evaluation_psi, evaluation_date, video_psi, video_date in roster_rows:
+        latest_psi, last_session_at = max(
+            ((evaluation_psi, evaluation_date), (video_psi, video_date)),
+            key=lambda pair: pair[1] or datetime.min,
+        )
+        players.append(
+            {
+                "id": player.id,
+                "name": player.name,
+                "age": player.age,
+                "level": player.level,
+                "gender": player.gender,
+                "coach_id": player.coach_id,
+                "latest_psi": latest_psi,
+                "last_session_at": last_session_at.isoformat() if last_session_at else None,
+            }
+        )
+
+    names = {player["id"]: player["name"] for player in players}
+    sessions = stats.sessions(stats.COACH, coach.id).subquery()
+    activity = db.execute(
+        select(sessions)
+        .order_by(sessions.c.date.desc(), sessions.c.kind.desc(), sessions.c.id.desc())
+        .limit(BOOTSTRAP_ACTIVITY_LIMIT)
+    ).mappings()
+
+    return {
+        "coach": profile,
+        "players": players,
+        "recent_activity": [
+            {
+                "kind": row["kind"],
+                "id": row["id"],
+                "date": row["date"].isoformat() if isinstance(row["date"], datetime) else row["date"],
+                "event_type": row["event_type"],
+                "player_id": row["player_id"],
+                "player": names.get(row["player_id"]),
+                "psi": row["psi"],
+            }
+            for row in activity
+        ],
     }
 
 @app.put("/coach/{username}/update")
@@ -304,11 +670,91 @@ def update_coach(username: str, update_data: dict, db: Session = Depends(get_db)
     if "dob" in update_data:
         coach.dob = update_data["dob"]
     if "profile_picture" in update_data:
-        coach.profile_picture = update_data["profile_picture"]
+        # Older clients still send a data URL here; store it like an upload.
+        picture = update_data["profile_picture"] or None
+        try:
+            coach.profile_picture = avatars.save_data_url(picture) if picture else None
+        except avatars.InvalidImage as exc:
+            raise HTTPException(status_code=400, detail=str(exc))
 
     db.commit()
     return {"message": "Profile updated successfully"}
 
+@app.put("/coach/{username}/profile-picture")
+async def upload_profile_picture(username: str, request: Request):
+    """Resize an uploaded image into the avatar store and attach it to the coach.
+
+    Only the body is read on the event loop; the lookup, the resizing and the
+    commit run in worker threads.
+    """
+    if not request.headers.get("content-type", "").startswith("image/"):
+        raise HTTPException(status_code=415, detail="Upload must be an image file")
+    if not await asyncio.to_thread(_coach_exists, username):
+        raise HTTPException(status_code=404, detail="Coach not found")
+
+    body = bytearray()
+    async for chunk in request.stream():
+        body.extend(chunk)
+        if len(body) > avatars.MAX_AVATAR_UPLOAD_BYTES:
+            raise HTTPException(status_code=413, detail="Image file is too large")
+    if not body:
+        raise HTTPException(status_code=400, detail="Image file is empty")
+
+    try:
+        ref = await asyncio.to_thread(_attach_profile_picture, username, bytes(body))
+    except avatars.InvalidImage as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    if ref is None:
+        raise HTTPException(status_code=404, detail="Coach not found")
+    return {
+        "profile_picture_url": avatars.avatar_url(ref),
+        "profile_picture_urls": avatars.avatar_urls(ref),
+    }
+
+def _coach_exists(username: str) -> bool:
+    with SessionLocal() as db:
+        return db.query(models.Coach.id).filter(models.Coach.username == username).first() is not None
+
+def _attach_profile_picture(username: str, data: bytes) -> str | None:
+    """Store ``data`` as the coach's picture; None if the coach is gone."""
+    ref = avatars.save(data)
+    with SessionLocal() as db:
+        result = db.execute(
+            update(models.Coach).where(models.Coach.username == username).values(profile_picture=ref)
+        )
+        db.commit()
+    return ref if result.rowcount else None
+
+@app.delete("/coach/{username}/profile-picture")
+def delete_profile_picture(username: str, db: Session = Depends(get_db)):
+    """Remove the coach's profile picture; stored thumbnails may be shared and are kept."""
+    coach = db.query(models.Coach).filter(models.Coach.username == username).first()
+    if not coach:
+        raise HTTPException(status_code=404, detail="Coach not found")
+
+    coach.profile_picture = None
+    db.commit()
+    return {"message": "Profile picture removed"}
+
+@app.get("/avatars/{digest}")
+def get_avatar(digest: str, request: Request, size: int = avatars.AVATAR_SIZES[-1]):
+    """Serve an immutable profile picture thumbnail."""
+    if size not in avatars.AVATAR_SIZES:
+        raise HTTPException(status_code=400, detail=f"Size must be one of {list(avatars.AVATAR_SIZES)}")
+    if not avatars.is_avatar_ref(f"{avatars.AVATAR_PREFIX}{digest}"):
+        raise HTTPException(status_code=404, detail="Profile picture not found")
+
+    path = avatars.avatar_path(digest, size)
+    if not path.is_file():
+        raise HTTPException(status_code=404, detail="Profile picture not found")
+
+    # The URL names the content, so the digest is a strong validator on its own.
+    etag = f'"{digest}-{size}"'
+    headers = {"ETag": etag, "Cache-Control": "public, max-age=31536000, immutable"}
+    if _etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+    return FileResponse(path, media_type=avatars.MEDIA_TYPE, headers=headers)
+
 @app.post("/coach/{username}/change-password")
 def change_password(username: str, passwords: dict, db: Session = Depends(get_db)):
     """Change coach password."""
@@ -358,6 +804,127 @@ def save_ai_instructions(username: str, instructions: dict, db: Session = Depend
 
 # Video Analysis Endpoints
 
+@app.post("/video-upload")
+async def upload_video(request: Request):
+    """Stream a raw video request body into the blob store.
+
+    As for resumable chunks, the body is buffered in small slices and the
+    writes, hashing and final fsync and rename run in a worker thread.
+    """
+    content_type = request.headers.get("content-type", "")
+    if not content_type.startswith("video/"):
+        raise HTTPException(status_code=415, detail="Upload must be a video file")
+
+    writer = await asyncio.to_thread(storage.BlobWriter, content_type)
+    try:
+        buffer = bytearray()
+        async for data in request.stream():
+            buffer += data
+            if writer.size + len(buffer) > MAX_VIDEO_UPLOAD_BYTES:
+                raise HTTPException(status_code=413, detail="Video file is too large")
+            if len(buffer) >= UPLOAD_WRITE_SLICE_BYTES:
+                await asyncio.to_thread(writer.write, bytes(buffer))
+                buffer.clear()
+        if buffer:
+            await asyncio.to_thread(writer.write, bytes(buffer))
+        if writer.size == 0:
+            raise HTTPException(status_code=400, detail="Video file is empty")
+        video_ref = await asyncio.to_thread(writer.commit)
+    except BaseException:
+        writer.abort()
+        raise
+
+    return {"video_path": video_ref, "size": writer.size}
+
+@app.post("/uploads")
+def create_upload(data: dict):
+    """Start a resumable upload session for a large video."""
+    content_type = (data.get("content_type") or "").strip()
+    if not content_type.startswith("video/"):
+        raise HTTPException(status_code=415, detail="Upload must be a video file")
+
+    try:
+        size = int(data.get("size") or 0)
+        chunk_size = int(data["chunk_size"]) if data.get("chunk_size") else None
+    except (TypeError, ValueError):
+        raise HTTPException(status_code=400, detail="Size and chunk size must be integers")
+    if size > MAX_VIDEO_UPLOAD_BYTES:
+        raise HTTPException(status_code=413, detail="Video file is too large")
+
+    try:
+        return uploads.create_session(size, content_type, chunk_size)
+    except uploads.UploadError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
+
+@app.get("/uploads/{upload_id}")
+def get_upload(upload_id: str):
+    """Report which byte ranges of an upload have been received."""
+    try:
+        return uploads.status(upload_id)
+    except uploads.UploadNotFound as exc:
+        raise HTTPException(status_code=404, detail=str(exc))
+
+
+@app.put("/uploads/{upload_id}/chunks/{index}")
+async def put_upload_chunk(upload_id: str, index: int, request: Request, offset: int | None = None):
+    """Write one numbered chunk at its offset; chunks may arrive in any order.
+
+    The body is buffered in small slices and each slice is written, like the
+    final fsync, in a worker thread, so disk I/O never blocks the event loop.
+    """
+    try:
+        writer = await asyncio.to_thread(uploads.ChunkWriter, upload_id, index, offset)
+    except uploads.UploadNotFound as exc:
+        raise HTTPException(status_code=404, detail=str(exc))
+    except uploads.UploadError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
+    try:
+        buffer = bytearray()
+        async for data in request.stream():
+            buffer += data
+            if len(buffer) >= UPLOAD_WRITE_SLICE_BYTES:
+                await asyncio.to_thread(writer.write, bytes(buffer))
+                buffer.clear()
+        if buffer:
+            await asyncio.to_thread(writer.write, bytes(buffer))
+        await asyncio.to_thread(writer.commit)
+    except uploads.UploadError as exc:
+        writer.abort()
+        raise HTTPException(status_code=400, detail=str(exc))
+    except BaseException:
+        writer.abort()
+        raise
+
+    return {"index": index, "offset": writer.start, "size": writer.end - writer.start}
+
+
+@app.post("/uploads/{upload_id}/finalize")
+def finalize_upload(upload_id: str, data: dict, db: Session = Depends(get_db)):
+    """Assemble a completed upload and create its video analysis."""
+    try:
+        video_path = uploads.finalize(upload_id)
+    except uploads.UploadNotFound as exc:
+        raise HTTPException(status_code=404, detail=str(exc))
+    except uploads.UploadError as exc:
+        raise HTTPException(status_code=409, detail=str(exc))
+
+    result = create_video_analysis({**data, "video_path": video_path}, db)
+    uploads.discard(upload_id)
+    return result
+
+
+@app.delete("/uploads/{upload_id}")
+def delete_upload(upload_id: str):
+    """Abandon an upload session and free its disk space."""
+    try:
+        uploads.discard(upload_id)
+    except uploads.UploadNotFound as exc:
+        raise HTTPException(status_code=404, detail=str(exc))
+    return {"message": "Upload discarded"}
+
+
 @app.post("/video-analysis")
 def create_video_analysis(data: dict, db: Session = Depends(get_db)):
     """Create a new video analysis entry."""
@@ -403,6 +970,12 @@ def create_video_analysis(data: dict, db: Session = Depends(get_db)):
     if not video_path:
         raise HTTPException(status_code=400, detail="Video path is required")
 
+    # Legacy clients still send the clip inline; move it out of the row.
+    if video_path.startswith("data:"):
+        video_path = storage.store_data_url(video_path)
+    elif storage.is_blob_ref(video_path) and not storage.exists(video_path):
+        raise HTTPException(status_code=404, detail="Uploaded video not found")
+
     # For doubles, validate partner
     partner_id = None
     partner_appearance = None
@@ -437,49 +1010,68 @@ def create_video_analysis(data: dict, db: Session = Depends(get_db)):
     )
 
     db.add(video_analysis)
+    db.flush()
+    stats.record_added(db, stats.video_entry(video_analysis))
+    job = jobs.enqueue(db, video_analysis)
     db.commit()
-    db.refresh(video_analysis)
+    jobs.notify()
 
-    # Generate AI analysis
-    try:
-        partner_obj = db.query(models.Player).filter(models.Player.id == partner_id).first() if partner_id else None
-        analysis_result = ai.generate_video_analysis(video_analysis, player, partner_obj)
-
-        # Store the analysis result
-        video_analysis.ai_report_json = json.dumps(analysis_result)
-
-        # Extract and store scores
-        if isinstance(analysis_result, dict) and "scores" in analysis_result:
-            scores = analysis_result["scores"]
-            video_analysis.presence_score = scores.get("presence")
-            video_analysis.skill_score = scores.get("skill")
-            video_analysis.intent_score = scores.get("intent")
-            video_analysis.psi_score = scores.get("psi")
-
-        # Store synergy score for doubles
-        if game_format == "doubles" and "team_performance" in analysis_result:
-            team_perf = analysis_result["team_performance"]
-            if isinstance(team_perf, dict):
-                video_analysis.synergy_score = team_perf.get("synergy_score")
+    return {
+        "status": "Video analysis queued",
+        "video_analysis_id": video_analysis.id,
+        "job_id": job.id,
+        "job_status": job.status,
+    }
 
-        db.commit()
 
-        return {
-            "status": "Video analysis created",
-            "video_analysis_id": video_analysis.id,
-            "analysis": analysis_result
-        }
-    except Exception as e:
-        return {
-            "status": "Video analysis created but AI processing pending",
-            "video_analysis_id": video_analysis.id,
-            "error": str(e)
-        }
+VIDEO_SUMMARY_COLUMNS = (
+    models.VideoAnalysis.id,
+    models.VideoAnalysis.coach_id,
+    models.VideoAnalysis.session_id,
+    models.VideoAnalysis.date,
+    models.VideoAnalysis.game_format,
+    models.VideoAnalysis.event_type,
+    models.VideoAnalysis.event_type_description,
+    models.VideoAnalysis.player_id,
+    models.VideoAnalysis.partner_id,
+    models.VideoAnalysis.presence_score,
+    models.VideoAnalysis.skill_score,
+    models.VideoAnalysis.intent_score,
+    models.VideoAnalysis.psi_score,
+    models.VideoAnalysis.synergy_score,
+    or_(models.VideoAnalysis.ai_report_data.isnot(None), models.VideoAnalysis.ai_report_json.isnot(None)).label(
+        "has_report"
+    ),
+    models.VideoAnalysis.summary_bullets,
+    func.coalesce(models.VideoAnalysis.report_degraded, False).label("degraded"),
+)
 
 
-@app.get("/video-analysis")
-def list_video_analyses(coach_username: str = None, db: Session = Depends(get_db)):
-    """List all video analyses for a coach."""
+def _video_summaries(
+    db: Session,
+    page: pagination.PageParams,
+    filters: pagination.HistoryFilters,
+    response: Response,
+    *criteria,
+) -> list[dict[str, Any]]:
+    """Select one page of list columns; media and report JSON stay in the database."""
+    query = db.query(*VIDEO_SUMMARY_COLUMNS).filter(*criteria, *filters.criteria(models.VideoAnalysis))
+    rows = pagination.paginate_by_date(query, models.VideoAnalysis, page, response)
+    return [
+        {**row._mapping, "summary_bullets": json.loads(row.summary_bullets) if row.summary_bullets else []}
+        for row in rows
+    ]
+
+
+@app.get("/video-analysis", response_model=list[schemas.VideoAnalysisSummary])
+def list_video_analyses(
+    response: Response,
+    coach_username: str = None,
+    page: pagination.OptionalPageParams = Depends(),
+    filters: pagination.HistoryFilters = Depends(),
+    db: Session = Depends(get_db),
+):
+    """List video analysis summaries for a coach."""
     if not coach_username:
         raise HTTPException(status_code=400, detail="Coach username required")
 
@@ -487,33 +1079,184 @@ def list_video_analyses(coach_username: str = None, db: Session = Depends(get_db
     if not coach:
         raise HTTPException(status_code=404, detail="Coach not found")
 
-    analyses = db.query(models.VideoAnalysis).filter(models.VideoAnalysis.coach_id == coach.id).all()
-    return analyses
+    return _video_summaries(db, page, filters, response, models.VideoAnalysis.coach_id == coach.id)
 
 
-@app.get("/video-analysis/{video_analysis_id}")
+@app.get("/video-analysis/{video_analysis_id}", response_model=schemas.VideoAnalysisResponse)
 def get_video_analysis(video_analysis_id: int, db: Session = Depends(get_db)):
     """Get a specific video analysis."""
     analysis = db.query(models.VideoAnalysis).filter(models.VideoAnalysis.id == video_analysis_id).first()
     if not analysis:
         raise HTTPException(status_code=404, detail="Video analysis not found")
 
-    return analysis
+    result = schemas.VideoAnalysisResponse.model_validate(analysis, from_attributes=True)
+    report_json = report_store.report_json(analysis.ai_report_data, analysis.ai_report_json)
+    result.ai_report_json = report_json.decode("utf-8") if report_json is not None else None
+    return result
+
+
+@app.get("/video-analysis/{video_analysis_id}/status")
+def get_video_analysis_status(video_analysis_id: int, db: Session = Depends(get_db)):
+    """Report the progress of the background AI analysis for a video."""
+    payload = _video_analysis_status(db, video_analysis_id)
+    if payload is None:
+        raise HTTPException(status_code=404, detail="Video analysis not found")
+    return payload
+
+
+@app.get("/video-analysis/{video_analysis_id}/events")
+async def video_analysis_events(video_analysis_id: int):
+    """Stream the progress of a video's AI analysis as Server-Sent Events.
+
+    The first ``status`` event is the current job status. Later ones follow
+    the job, and ``field`` events carry report fields as Gemini writes them.
+    The stream ends once the job is done, degraded or failed; fetch the stored
+    report then.
+    """
+    def load_status() -> dict[str, Any] | None:
+        with SessionLocal() as db:
+            return _video_analysis_status(db, video_analysis_id)
+
+    if await asyncio.to_thread(load_status) is None:
+        raise HTTPException(status_code=404, detail="Video analysis not found")
+
+    async def stream():
+        with progress.subscribe(video_analysis_id) as queue:
+            # Read the status after subscribing, so no event falls in between.
+            status = await asyncio.to_thread(load_status)
+            if status is None:
+                return
+            yield _sse("status", status)
+            while status["status"] not in jobs.FINISHED:
+                try:
+                    event, data = await asyncio.wait_for(queue.get(), SSE_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                yield _sse(event, data)
+                if event == "status":
+                    status = data
+
+    return StreamingResponse(stream(), media_type="text/event-stream", headers=SSE_HEADERS)
+
+
+def _video_analysis_status(db: Session, video_analysis_id: int) -> dict[str, Any] | None:
+    job = (
+        db.query(models.AnalysisJob)
+        .filter(models.AnalysisJob.video_analysis_id == video_analysis_id)
+        .first()
+    )
+    if job:
+        return jobs.status_payload(job)
+
+    # Analyses created before the job queue existed were processed inline.
+    analysis = db.query(models.VideoAnalysis).filter(models.VideoAnalysis.id == video_analysis_id).first()
+    if not analysis:
+        return None
+
+    has_report = analysis.ai_report_data is not None or analysis.ai_report_json is not None
+    return {
+        "job_id": None,
+        "video_analysis_id": analysis.id,
+        "status": jobs.DONE if has_report else jobs.FAILED,
+        "attempts": 0,
+        "error": None if has_report else "No analysis was recorded",
+        "created_at": analysis.date.isoformat() if analysis.date else None,
+        "updated_at": None,
+    }
+
+
+@app.post("/video-analysis/{video_analysis_id}/reanalyze")
+def reanalyze_video(video_analysis_id: int, db: Session = Depends(get_db)):
+    """Queue a new AI analysis, e.g. for a degraded or failed one."""
+    analysis = db.get(models.VideoAnalysis, video_analysis_id)
+    if not analysis:
+        raise HTTPException(status_code=404, detail="Video analysis not found")
+    if analysis.job is not None and analysis.job.status in (jobs.QUEUED, *jobs.IN_FLIGHT):
+        raise HTTPException(status_code=409, detail="Analysis is already in progress")
+
+    job = jobs.requeue(db, analysis)
+    db.commit()
+    jobs.notify()
+    return jobs.status_payload(job)
+
+
+@app.get("/video-analysis/{video_analysis_id}/report")
+def get_video_analysis_report(video_analysis_id: int, db: Session = Depends(get_db)):
+    """Fetch the full AI report for one video analysis."""
+    row = (
+        db.query(models.VideoAnalysis.ai_report_data, models.VideoAnalysis.ai_report_json)
+        .filter(models.VideoAnalysis.id == video_analysis_id)
+        .first()
+    )
+    if row is None:
+        raise HTTPException(status_code=404, detail="Video analysis not found")
+    report_json = report_store.report_json(row.ai_report_data, row.ai_report_json)
+    if report_json is None:
+        raise HTTPException(status_code=404, detail="Video analysis report not ready")
+
+    return Response(content=report_json, media_type="application/json")
+
+
+@app.get("/video-analysis/{video_analysis_id}/video")
+def get_video_analysis_video(video_analysis_id: int, request: Request, db: Session = Depends(get_db)):
+    """Stream the match video with byte-range support for seeking."""
+    analysis = (
+        db.query(models.VideoAnalysis)
+        .options(load_only(models.VideoAnalysis.id, models.VideoAnalysis.video_path))
+        .filter(models.VideoAnalysis.id == video_analysis_id)
+        .first()
+    )
+    if not analysis:
+        raise HTTPException(status_code=404, detail="Video analysis not found")
+
+    # Clips still stored inline are served once the storage backfill moves them.
+    if not storage.exists(analysis.video_path):
+        raise HTTPException(status_code=404, detail="Video file not found")
+
+    # Blobs are content-addressed, so the digest is a strong validator.
+    etag = f'"{storage.blob_digest(analysis.video_path)}"'
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if _etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+
+    path = storage.blob_path(analysis.video_path)
+    media_type = mimetypes.guess_type(path.name)[0] or "application/octet-stream"
+    # FileResponse answers Range/If-Range with 206 or 416 and hands the file to
+    # the server via the ASGI pathsend extension when the server offers it.
+    response = FileResponse(path, media_type=media_type, headers=headers)
+    response.chunk_size = storage.CHUNK_SIZE
+    return response
 
 
-@app.get("/player/{player_id}/video-analyses")
-def get_player_video_analyses(player_id: int, db: Session = Depends(get_db)):
-    """Get all video analyses for a specific player (singles only)."""
-    analyses = db.query(models.VideoAnalysis).filter(
+@app.get("/player/{player_id}/video-analyses", response_model=list[schemas.VideoAnalysisSummary])
+def get_player_video_analyses(
+    player_id: int,
+    response: Response,
+    page: pagination.OptionalPageParams = Depends(),
+    filters: pagination.HistoryFilters = Depends(),
+    db: Session = Depends(get_db),
+):
+    """Get video analysis summaries for a specific player (singles only)."""
+    return _video_summaries(
+        db,
+        page,
+        filters,
+        response,
         models.VideoAnalysis.player_id == player_id,
         models.VideoAnalysis.game_format == "singles"
-    ).all()
-    return analyses
+    )
 
 
-@app.get("/team-performances")
-def get_team_performances(coach_username: str = None, db: Session = Depends(get_db)):
-    """Get all doubles video analyses (team performances) for a coach."""
+@app.get("/team-performances", response_model=list[schemas.VideoAnalysisSummary])
+def get_team_performances(
+    response: Response,
+    coach_username: str = None,
+    page: pagination.OptionalPageParams = Depends(),
+    filters: pagination.HistoryFilters = Depends(),
+    db: Session = Depends(get_db),
+):
+    """Get doubles video analysis summaries (team performances) for a coach."""
     if not coach_username:
         raise HTTPException(status_code=400, detail="Coach username required")
 
@@ -521,12 +1264,14 @@ def get_team_performances(coach_username: str = None, db: Session = Depends(get_
     if not coach:
         raise HTTPException(status_code=404, detail="Coach not found")
 
-    team_analyses = db.query(models.VideoAnalysis).filter(
+    return _video_summaries(
+        db,
+        page,
+        filters,
+        response,
         models.VideoAnalysis.coach_id == coach.id,
         models.VideoAnalysis.game_format == "doubles"
-    ).all()
-
-    return team_analyses
+    )
 
 
 @app.delete("/video-analysis/{video_analysis_id}")
@@ -536,6 +1281,9 @@ def delete_video_analysis(video_analysis_id: int, db: Session = Depends(get_db))
     if not analysis:
         raise HTTPException(status_code=404, detail="Video analysis not found")
 
+    entry = stats.video_entry(analysis)
     db.delete(analysis)
+    db.flush()
+    stats.record_removed(db, entry)
     db.commit()
     return {"message": "Video analysis deleted"}
@@ -1,9 +1,22 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, Text, DateTime, Float
+from sqlalchemy import Boolean, Column, Integer, String, ForeignKey, Text, DateTime, Float, Index, LargeBinary, func
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from database import Base
 
 
+def _newest_first_indexes(name, *columns, date, id):
+    """Indexes for lists read newest first on ``(date, id)`` with undated rows last.
+
+    SQLite sorts NULL lowest, so reading an ascending index backwards already
+    gives ``date DESC NULLS LAST``; it also rejects NULLS LAST in index DDL.
+    PostgreSQL sorts NULL highest and needs the order declared to skip a sort.
+    """
+    return (
+        Index(name, *columns, "date", "id").ddl_if(dialect="sqlite"),
+        Index(f"{name}_desc", *columns, date.desc().nulls_last(), id.desc()).ddl_if(dialect="postgresql"),
+    )
+
+
 class Player(Base):
     __tablename__ = "players"
     id = Column(Integer, primary_key=True, index=True)
@@ -18,6 +31,9 @@ class Player(Base):
     video_analyses = relationship("VideoAnalysis", foreign_keys="[VideoAnalysis.player_id]", back_populates="player")
     video_analyses_partner = relationship("VideoAnalysis", foreign_keys="[VideoAnalysis.partner_id]", back_populates="partner")
 
+# Duplicate-name check in create_player compares lower(name) within a coach
+Index("ix_players_coach_lower_name", Player.coach_id, func.lower(Player.name))
+
 class Evaluation(Base):
     __tablename__ = "evaluations"
     id = Column(Integer, primary_key=True, index=True)
@@ -41,11 +57,18 @@ class Evaluation(Base):
     skill_score = Column(Integer)
     intent_score = Column(Integer)
     psi_score = Column(Float)
+    summary_bullets = Column(Text, nullable=True)  # JSON list promoted from the report
+    report_degraded = Column(Boolean, nullable=True)  # Fallback written while Gemini was unavailable
+    ai_report_data = Column(LargeBinary, nullable=True)  # Compressed report, see report_store
+    # Legacy uncompressed copies; cleared once report_store has backfilled the row
     ai_feedback = Column(Text, nullable=True)
     ai_report_json = Column(Text, nullable=True)
 
     player = relationship("Player", back_populates="evaluations")
 
+    # Player history is paged newest first on (date, id)
+    __table_args__ = _newest_first_indexes("ix_evaluations_player_date", "player_id", date=date, id=id)
+
 class Coach(Base):
     __tablename__ = "coaches"
 
@@ -86,7 +109,10 @@ class VideoAnalysis(Base):
     video_path = Column(Text, nullable=False)
 
     # AI Analysis Results
-    ai_report_json = Column(Text, nullable=True)  # Full JSON report
+    ai_report_data = Column(LargeBinary, nullable=True)  # Compressed report, see report_store
+    ai_report_json = Column(Text, nullable=True)  # Legacy uncompressed report
+    summary_bullets = Column(Text, nullable=True)  # JSON list promoted from the report
+    report_degraded = Column(Boolean, nullable=True)  # Fallback written while Gemini was unavailable
 
     # PSI Scores (same as evaluation)
     presence_score = Column(Integer, nullable=True)
@@ -101,3 +127,103 @@ class VideoAnalysis(Base):
     coach = relationship("Coach", back_populates="video_analyses")
     player = relationship("Player", foreign_keys=[player_id], back_populates="video_analyses")
     partner = relationship("Player", foreign_keys=[partner_id], back_populates="video_analyses_partner")
+    job = relationship("AnalysisJob", back_populates="video_analysis", uselist=False, cascade="all, delete-orphan")
+
+    __table_args__ = (
+        # Coach and player lists filter on game format and page on (date, id)
+        *_newest_first_indexes("ix_video_analyses_coach_format_date", "coach_id", "game_format", date=date, id=id),
+        *_newest_first_indexes("ix_video_analyses_player_format_date", "player_id", "game_format", date=date, id=id),
+        # A player's latest session across formats, e.g. the coach bootstrap roster
+        *_newest_first_indexes("ix_video_analyses_player_date", "player_id", date=date, id=id),
+    )
+
+class AnalysisJob(Base):
+    __tablename__ = "analysis_jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    video_analysis_id = Column(Integer, ForeignKey("video_analyses.id", ondelete="CASCADE"), nullable=False, unique=True)
+    status = Column(String, nullable=False, default="queued", index=True)  # queued, uploading, processing, done, degraded, failed
+    attempts = Column(Integer, nullable=False, default=0)
+    error = Column(Text, nullable=True)
+    claimed_by = Column(String, nullable=True)  # worker holding the lease while in flight
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)  # lease heartbeat
+
+    video_analysis = relationship("VideoAnalysis", back_populates="job")
+
+class ReportCacheEntry(Base):
+    __tablename__ = "report_cache"
+
+    key = Column(String, primary_key=True)  # SHA-256 of model, generation config and prompt
+    model_name = Column(String, nullable=False)
+    payload = Column(Text, nullable=False)  # PSIReport.model_dump() as JSON
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    last_used_at = Column(DateTime, default=datetime.utcnow, nullable=False, index=True)
+    hit_count = Column(Integer, default=0, nullable=False)
+
+class GeminiFile(Base):
+    __tablename__ = "gemini_files"
+
+    content_hash = Column(String, primary_key=True)  # SHA-256 of the uploaded video
+    remote_name = Column(String, nullable=False)  # e.g. "files/abc123"
+    expires_at = Column(DateTime, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+class VerificationCode(Base):
+    __tablename__ = "verification_codes"
+
+    contact = Column(String, primary_key=True)  # email address or phone number
+    code = Column(String, nullable=True)  # cleared once used so the send counter survives
+    type = Column(String, nullable=True)
+    expires_at = Column(DateTime, nullable=True)
+    attempts = Column(Integer, nullable=False, default=0)
+    window_started_at = Column(DateTime, nullable=False)  # start of the current rate-limit window
+    send_count = Column(Integer, nullable=False, default=0)
+
+class OutboxMessage(Base):
+    __tablename__ = "email_outbox"
+
+    id = Column(Integer, primary_key=True, index=True)
+    recipient = Column(String, nullable=False)
+    subject = Column(String, nullable=False)
+    text_body = Column(Text, nullable=False)
+    html_body = Column(Text, nullable=True)
+    status = Column(String, nullable=False, default="pending")  # pending, sending, sent, failed
+    attempts = Column(Integer, nullable=False, default=0)
+    next_attempt_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    claim_token = Column(String, nullable=True)  # set by the sender that claimed the message
+    claimed_at = Column(DateTime, nullable=True)  # start of the claim's lease, refreshed while sending
+    error = Column(Text, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    sent_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        # The sender polls for due pending messages
+        Index("ix_email_outbox_status_due", "status", "next_attempt_at"),
+    )
+
+
+class ScoreAggregate(Base):
+    """Running score statistics for one player or coach, maintained by ``stats``."""
+    __tablename__ = "score_aggregates"
+
+    scope = Column(String, primary_key=True)  # player or coach
+    scope_id = Column(Integer, primary_key=True)
+    session_count = Column(Integer, nullable=False, default=0)
+    evaluation_count = Column(Integer, nullable=False, default=0)
+    video_count = Column(Integer, nullable=False, default=0)
+    event_counts = Column(Text, nullable=True)  # JSON object of sessions per event type
+
+    presence_sum = Column(Float, nullable=False, default=0.0)
+    presence_count = Column(Integer, nullable=False, default=0)
+    skill_sum = Column(Float, nullable=False, default=0.0)
+    skill_count = Column(Integer, nullable=False, default=0)
+    intent_sum = Column(Float, nullable=False, default=0.0)
+    intent_count = Column(Integer, nullable=False, default=0)
+    psi_sum = Column(Float, nullable=False, default=0.0)
+    psi_count = Column(Integer, nullable=False, default=0)
+
+    recent = Column(Text, nullable=True)  # JSON list of the most recent scored sessions
+    best = Column(Text, nullable=True)  # JSON session with the highest PSI
+    worst = Column(Text, nullable=True)  # JSON session with the lowest PSI
+    updated_at = Column(DateTime, nullable=True)
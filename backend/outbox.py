@@ -0,0 +1,302 @@
+"""Persistent email outbox drained by a background sender.
+
+Requests only insert a row into ``email_outbox`` and return. A sender task
+claims due messages in batches and delivers them over one SMTP session that
+stays open between messages, so a burst of sign-ups costs a single TLS
+handshake and login. Failed deliveries are retried with exponential backoff.
+
+Claims use a per-batch token written by a conditional UPDATE, so several
+worker processes can share one outbox without sending a message twice. A
+claim is a lease: the sender refreshes ``claimed_at`` while it works through
+the batch, and only claims older than ``LEASE_SECONDS`` (their sender died)
+are returned to the queue.
+"""
+from __future__ import annotations
+
+import asyncio
+import os
+import smtplib
+import socket
+import time
+import uuid
+from datetime import datetime, timedelta
+from email.message import EmailMessage
+
+from sqlalchemy import or_, update
+
+import models
+from database import SessionLocal
+
+SMTP_HOST = os.getenv("SMTP_HOST", "")
+SMTP_PORT = int(os.getenv("SMTP_PORT", "465"))
+SMTP_SSL = os.getenv("SMTP_SSL", "true").lower() == "true"
+SMTP_STARTTLS = os.getenv("SMTP_STARTTLS", "false").lower() == "true"
+SMTP_USERNAME = os.getenv("SMTP_USERNAME") or os.getenv("GMAIL_EMAIL")
+SMTP_PASSWORD = os.getenv("SMTP_PASSWORD") or os.getenv("GMAIL_APP_PASSWORD")
+SMTP_FROM = os.getenv("SMTP_FROM") or SMTP_USERNAME or "no-reply@localhost"
+SMTP_TIMEOUT_SECONDS = float(os.getenv("SMTP_TIMEOUT_SECONDS", "30"))
+
+BATCH_SIZE = int(os.getenv("OUTBOX_BATCH_SIZE", "50"))
+MAX_ATTEMPTS = int(os.getenv("OUTBOX_MAX_ATTEMPTS", "5"))
+RETRY_BASE_SECONDS = float(os.getenv("OUTBOX_RETRY_BASE_SECONDS", "5"))
+IDLE_TIMEOUT_SECONDS = float(os.getenv("OUTBOX_IDLE_TIMEOUT", "60"))
+POLL_INTERVAL_SECONDS = float(os.getenv("OUTBOX_POLL_INTERVAL", "5"))
+LEASE_SECONDS = float(os.getenv("OUTBOX_LEASE_SECONDS", "300"))
+
+PENDING = "pending"
+SENDING = "sending"
+SENT = "sent"
+FAILED = "failed"
+
+_loop: asyncio.AbstractEventLoop | None = None
+_wakeup: asyncio.Event | None = None
+_sender: asyncio.Task | None = None
+
+
+def configured() -> bool:
+    """True when there is an SMTP server to talk to; otherwise messages are logged."""
+    return bool(SMTP_HOST or (SMTP_USERNAME and SMTP_PASSWORD))
+
+
+def enqueue(recipient: str, subject: str, text_body: str, html_body: str | None = None) -> int:
+    """Persist a message for delivery and wake the sender."""
+    with SessionLocal() as db:
+        message = models.OutboxMessage(
+            recipient=recipient,
+            subject=subject,
+            text_body=text_body,
+            html_body=html_body,
+            status=PENDING,
+            attempts=0,
+            next_attempt_at=datetime.utcnow(),
+        )
+        db.add(message)
+        db.commit()
+        message_id = message.id
+    notify()
+    return message_id
+
+
+def notify() -> None:
+    """Wake the sender after a message has been committed; safe from any thread."""
+    if _loop is not None and _wakeup is not None:
+        _loop.call_soon_threadsafe(_wakeup.set)
+
+
+class SMTPSession:
+    """A lazily opened SMTP connection reused across messages."""
+
+    def __init__(self) -> None:
+        self._server: smtplib.SMTP | None = None
+        self._last_used = 0.0
+
+    def _connect(self) -> smtplib.SMTP:
+        host = SMTP_HOST or "smtp.gmail.com"
+        if SMTP_SSL:
+            server = smtplib.SMTP_SSL(host, SMTP_PORT, timeout=SMTP_TIMEOUT_SECONDS)
+        else:
+            server = smtplib.SMTP(host, SMTP_PORT, timeout=SMTP_TIMEOUT_SECONDS)
+            if SMTP_STARTTLS:
+                server.starttls()
+        if SMTP_USERNAME and SMTP_PASSWORD:
+            server.login(SMTP_USERNAME, SMTP_PASSWORD)
+        return server
+
+    def send(self, message: EmailMessage) -> None:
+        if self._server is None:
+            self._server = self._connect()
+        try:
+            self._server.send_message(message)
+        except (smtplib.SMTPServerDisconnected, ConnectionError):
+            # The server dropped an idle connection; reconnect once and resend.
+            self.close()
+            self._server = self._connect()
+            self._server.send_message(message)
+        self._last_used = time.monotonic()
+
+    def close_if_idle(self) -> None:
+        if self._server is not None and time.monotonic() - self._last_used > IDLE_TIMEOUT_SECONDS:
+            self.close()
+
+    def close(self) -> None:
+        if self._server is None:
+            return
+        try:
+            self._server.quit()
+        except (smtplib.SMTPException, OSError):
+            pass
+        self._server = None
+
+
+def start_sender() -> None:
+    """Start draining the outbox on the running loop."""
+    global _loop, _wakeup, _sender
+    if _sender is not None:
+        return
+    _loop = asyncio.get_running_loop()
+    _wakeup = asyncio.Event()
+    _sender = asyncio.create_task(_sender_loop(), name="email-outbox-sender")
+
+
+async def stop_sender() -> None:
+    global _loop, _wakeup, _sender
+    if _sender is not None:
+        _sender.cancel()
+        await asyncio.gather(_sender, return_exceptions=True)
+    _loop = _wakeup = _sender = None
+
+
+async def _sender_loop() -> None:
+    session = SMTPSession()
+    try:
+        while True:
+            # Clear before claiming so a notify() during the claim is not lost.
+            _wakeup.clear()
+            try:
+                batch = await asyncio.to_thread(_claim_batch)
+            except Exception as exc:  # database briefly unavailable; retry after a pause
+                print(f"[OUTBOX] Failed to claim messages: {exc}")
+                batch = []
+
+            if batch:
+                await asyncio.to_thread(_deliver, session, batch)
+                continue
+
+            await asyncio.to_thread(session.close_if_idle)
+            try:
+                await asyncio.wait_for(_wakeup.wait(), POLL_INTERVAL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+    finally:
+        await asyncio.to_thread(session.close)
+
+
+def recover_expired(db, now: datetime | None = None) -> int:
+    """Return messages whose claim lease ran out to the queue; the caller commits."""
+    now = now or datetime.utcnow()
+    result = db.execute(
+        update(models.OutboxMessage)
+        .where(
+            models.OutboxMessage.status == SENDING,
+            # Claims made before leases existed have no timestamp.
+            or_(
+                models.OutboxMessage.claimed_at.is_(None),
+                models.OutboxMessage.claimed_at < now - timedelta(seconds=LEASE_SECONDS),
+            ),
+        )
+        .values(status=PENDING, claim_token=None, claimed_at=None)
+    )
+    return result.rowcount
+
+
+def _renew_lease(token: str) -> None:
+    with SessionLocal() as db:
+        db.execute(
+            update(models.OutboxMessage)
+            .where(models.OutboxMessage.claim_token == token, models.OutboxMessage.status == SENDING)
+            .values(claimed_at=datetime.utcnow())
+        )
+        db.commit()
+
+
+def _claim_batch() -> list[models.OutboxMessage]:
+    token = uuid.uuid4().hex
+    now = datetime.utcnow()
+    with SessionLocal() as db:
+        if recover_expired(db, now):
+            db.commit()
+        due_ids = [
+            message_id
+            for (message_id,) in db.query(models.OutboxMessage.id)
+            .filter(models.OutboxMessage.status == PENDING, models.OutboxMessage.next_attempt_at <= now)
+            .order_by(models.OutboxMessage.next_attempt_at, models.OutboxMessage.id)
+            .limit(BATCH_SIZE)
+        ]
+        if not due_ids:
+            return []
+        db.execute(
+            update(models.OutboxMessage)
+            .where(models.OutboxMessage.id.in_(due_ids), models.OutboxMessage.status == PENDING)
+            .values(
+                status=SENDING, claim_token=token, claimed_at=now, attempts=models.OutboxMessage.attempts + 1
+            )
+        )
+        db.commit()
+        # Only the rows this sender won carry its token.
+        return db.query(models.OutboxMessage).filter(models.OutboxMessage.claim_token == token).all()
+
+
+def _build_message(row: models.OutboxMessage) -> EmailMessage:
+    message = EmailMessage()
+    message["Subject"] = row.subject
+    message["From"] = SMTP_FROM
+    message["To"] = row.recipient
+    message.set_content(row.text_body)
+    if row.html_body:
+        message.add_alternative(row.html_body, subtype="html")
+    return message
+
+
+_CONNECTION_ERRORS = (
+    ConnectionError,
+    TimeoutError,
+    socket.gaierror,
+    smtplib.SMTPConnectError,
+    smtplib.SMTPServerDisconnected,
+    smtplib.SMTPAuthenticationError,
+)
+
+
+def _deliver(session: SMTPSession, batch: list[models.OutboxMessage]) -> None:
+    renewed = time.monotonic()
+    for index, row in enumerate(batch):
+        if time.monotonic() - renewed > LEASE_SECONDS / 4:
+            _renew_lease(row.claim_token)
+            renewed = time.monotonic()
+        try:
+            if configured():
+                session.send(_build_message(row))
+            else:
+                print(f"[OUTBOX] SMTP not configured. To {row.recipient}: {row.subject}\n{row.text_body}")
+        except _CONNECTION_ERRORS as exc:
+            # The server is unreachable; back off the rest of the batch too.
+            session.close()
+            for pending in batch[index:]:
+                _record_failure(pending, str(exc))
+            return
+        except smtplib.SMTPRecipientsRefused as exc:
+            permanent = all(code >= 500 for code, _ in exc.recipients.values())
+            _record_failure(row, str(exc), retry=not permanent)
+        except Exception as exc:  # rejected message or transient server error
+            _record_failure(row, str(exc))
+        else:
+            _mark_sent(row)
+
+
+def _mark_sent(row: models.OutboxMessage) -> None:
+    with SessionLocal() as db:
+        db.execute(
+            update(models.OutboxMessage)
+            .where(models.OutboxMessage.id == row.id, models.OutboxMessage.claim_token == row.claim_token)
+            .values(status=SENT, sent_at=datetime.utcnow(), error=None, claim_token=None, claimed_at=None)
+        )
+        db.commit()
+
+
+def _record_failure(row: models.OutboxMessage, error: str, retry: bool = True) -> None:
+    print(f"[OUTBOX] Delivery to {row.recipient} failed (attempt {row.attempts}): {error}")
+    retry = retry and row.attempts < MAX_ATTEMPTS
+    delay = timedelta(seconds=RETRY_BASE_SECONDS * 2 ** (row.attempts - 1))
+    with SessionLocal() as db:
+        db.execute(
+            update(models.OutboxMessage)
+            .where(models.OutboxMessage.id == row.id, models.OutboxMessage.claim_token == row.claim_token)
+            .values(
+                status=PENDING if retry else FAILED,
+                next_attempt_at=datetime.utcnow() + delay,
+                error=error,
+                claim_token=None,
+                claimed_at=None,
+            )
+        )
+        db.commit()
@@ -0,0 +1,177 @@
+"""Keyset pagination and shared list filters for history endpoints.
+
+List endpoints return newest-first pages ordered by ``(date, id)``. Rather than
+an OFFSET, the client passes back an opaque cursor naming the last row it saw,
+so each page is a bounded index range scan no matter how deep the history is.
+The cursor for the following page is returned in the ``X-Next-Cursor`` header,
+which keeps the response bodies plain JSON lists for existing clients. Paging
+is opt-in: a request without ``limit`` or ``cursor`` gets the whole list.
+"""
+import base64
+import os
+from datetime import datetime
+from typing import Any, Optional
+
+from fastapi import HTTPException, Query, Response
+from sqlalchemy import and_, or_
+
+DEFAULT_PAGE_SIZE = int(os.getenv("PAGE_SIZE", "50"))
+MAX_PAGE_SIZE = int(os.getenv("MAX_PAGE_SIZE", "200"))
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(*values: Any) -> str:
+    """Serialize the sort key of the last row on a page."""
+    parts = []
+    for value in values:
+        if value is None:
+            parts.append("")
+        elif isinstance(value, datetime):
+            parts.append(value.isoformat())
+        else:
+            parts.append(str(value))
+    return base64.urlsafe_b64encode("|".join(parts).encode()).decode().rstrip("=")
+
+
+def _decode(cursor: str, size: int) -> list[str]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        parts = base64.urlsafe_b64decode(padded.encode()).decode().split("|")
+    except (ValueError, UnicodeDecodeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor") from None
+    if len(parts) != size:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return parts
+
+
+def decode_date_cursor(cursor: str) -> tuple[datetime | None, int]:
+    raw_date, raw_id = _decode(cursor, 2)
+    try:
+        return (datetime.fromisoformat(raw_date) if raw_date else None), int(raw_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor") from None
+
+
+def decode_id_cursor(cursor: str) -> int:
+    (raw_id,) = _decode(cursor, 1)
+    try:
+        return int(raw_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor") from None
+
+
+class PageParams:
+    """``limit``/``cursor`` query parameters shared by every list endpoint."""
+
+    def __init__(
+        self,
+        limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+        cursor: Optional[str] = None,
+    ) -> None:
+        self.limit = limit
+        self.cursor = cursor
+
+
+class OptionalPageParams(PageParams):
+    """Paging for lists that predate pagination, which is every list endpoint.
+
+    Without ``limit`` or ``cursor`` the whole list is returned, as it was
+    before, and no cursor is issued; clients opt in by passing a ``limit``.
+    """
+
+    def __init__(
+        self,
+        limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+        cursor: Optional[str] = None,
+    ) -> None:
+        if limit is None and cursor is not None:
+            limit = DEFAULT_PAGE_SIZE
+        super().__init__(limit, cursor)
+
+
+class HistoryFilters:
+    """Optional filters pushed into the WHERE clause of history queries."""
+
+    def __init__(
+        self,
+        date_from: Optional[datetime] = None,
+        date_to: Optional[datetime] = None,
+        event_type: Optional[str] = None,
+        game_format: Optional[str] = None,
+        psi_min: Optional[float] = None,
+        psi_max: Optional[float] = None,
+    ) -> None:
+        self.date_from = date_from
+        self.date_to = date_to
+        self.event_type = event_type
+        self.game_format = game_format
+        self.psi_min = psi_min
+        self.psi_max = psi_max
+
+    def criteria(self, model) -> list[Any]:
+        """Build SQL criteria for whichever of the filtered columns ``model`` has."""
+        criteria = []
+        if self.date_from is not None:
+            criteria.append(model.date >= self.date_from)
+        if self.date_to is not None:
+            criteria.append(model.date <= self.date_to)
+        if self.psi_min is not None:
+            criteria.append(model.psi_score >= self.psi_min)
+        if self.psi_max is not None:
+            criteria.append(model.psi_score <= self.psi_max)
+        if self.event_type is not None:
+            if not hasattr(model, "event_type"):
+                raise HTTPException(status_code=400, detail="event_type filter is not supported here")
+            criteria.append(model.event_type == self.event_type)
+        if self.game_format is not None:
+            if not hasattr(model, "game_format"):
+                raise HTTPException(status_code=400, detail="game_format filter is not supported here")
+            criteria.append(model.game_format == self.game_format)
+        return criteria
+
+
+def paginate_by_date(query, model, page: PageParams, response: Response) -> list[Any]:
+    """Return one newest-first page of ``query`` keyed on ``(model.date, model.id)``.
+
+    Rows without a date (only possible for hand-edited data) are paged after
+    every dated row; NULLS LAST is spelled out because PostgreSQL defaults to
+    NULLS FIRST for descending order. A page without a limit is every row.
+    """
+    order = (model.date.desc().nulls_last(), model.id.desc())
+    if page.limit is None:
+        return query.order_by(*order).all()
+    if page.cursor:
+        last_date, last_id = decode_date_cursor(page.cursor)
+        if last_date is None:
+            query = query.filter(model.date.is_(None), model.id < last_id)
+        else:
+            query = query.filter(
+                or_(
+                    model.date < last_date,
+                    and_(model.date == last_date, model.id < last_id),
+                    model.date.is_(None),
+                )
+            )
+
+    rows = query.order_by(*order).limit(page.limit + 1).all()
+    if len(rows) > page.limit:
+        rows = rows[:page.limit]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(rows[-1].date, rows[-1].id)
+    return rows
+
+
+def paginate_by_id(query, model, page: PageParams, response: Response) -> list[Any]:
+    """Return one page of ``query`` in ascending ``model.id`` order.
+
+    A page without a limit (see :class:`OptionalPageParams`) is every row.
+    """
+    if page.limit is None:
+        return query.order_by(model.id).all()
+    if page.cursor:
+        query = query.filter(model.id > decode_id_cursor(page.cursor))
+
+    rows = query.order_by(model.id).limit(page.limit + 1).all()
+    if len(rows) > page.limit:
+        rows = rows[:page.limit]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(rows[-1].id)
+    return rows
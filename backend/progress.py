@@ -0,0 +1,39 @@
+"""In-process fan-out of live video analysis progress to Server-Sent Event streams.
+
+Background jobs publish status changes, and report fields as Gemini streams
+them, under the video analysis id. Each open event stream holds a queue for
+that id. Nothing is stored: a client that connects late reads the current job
+status from the database and then receives only what follows. Streams only see
+jobs run by workers in the same process; the database status stays the source
+of truth for the rest.
+
+Everything here runs on the event loop, so no locking is needed.
+"""
+from __future__ import annotations
+
+import asyncio
+from contextlib import contextmanager
+from typing import Any, Iterator
+
+_subscribers: dict[int, set[asyncio.Queue]] = {}
+
+
+@contextmanager
+def subscribe(video_analysis_id: int) -> Iterator[asyncio.Queue]:
+    """A queue of ``(event, data)`` pairs published for this video analysis."""
+    queue: asyncio.Queue = asyncio.Queue()
+    _subscribers.setdefault(video_analysis_id, set()).add(queue)
+    try:
+        yield queue
+    finally:
+        queues = _subscribers.get(video_analysis_id)
+        if queues is not None:
+            queues.discard(queue)
+            if not queues:
+                del _subscribers[video_analysis_id]
+
+
+def publish(video_analysis_id: int, event: str, data: Any) -> None:
+    for queue in _subscribers.get(video_analysis_id, ()):
+        queue.put_nowait((event, data))
+
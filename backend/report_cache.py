@@ -0,0 +1,115 @@
+"""Persistent cache of Gemini PSI reports keyed by a hash of their inputs.
+
+The key covers everything that influences the generated report: the model
+name, the generation config (including the response schema) and the fully
+rendered prompt, which already embeds the coach notes and player profile.
+Entries expire after a TTL and the least recently used rows are evicted once
+the table grows past its size limit.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+from datetime import datetime, timedelta
+from typing import Any, Mapping
+
+import models
+from database import SessionLocal
+
+MAX_ENTRIES = int(os.getenv("REPORT_CACHE_MAX_ENTRIES", "5000"))
+TTL = timedelta(seconds=int(os.getenv("REPORT_CACHE_TTL_SECONDS", str(30 * 24 * 60 * 60))))
+
+_lock = threading.Lock()
+_counters = {"hits": 0, "misses": 0, "writes": 0, "evictions": 0}
+
+
+def cache_key(model_name: str, generation_config: Mapping[str, Any], prompt: str) -> str:
+    material = json.dumps(
+        {"model": model_name, "config": generation_config, "prompt": prompt},
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+def _count(name: str, amount: int = 1) -> None:
+    with _lock:
+        _counters[name] += amount
+
+
+def get(key: str) -> dict[str, Any] | None:
+    """Return a cached report payload, or None on a miss or expired entry."""
+    now = datetime.utcnow()
+    with SessionLocal() as db:
+        entry = db.get(models.ReportCacheEntry, key)
+        if entry is None:
+            _count("misses")
+            return None
+        if entry.created_at < now - TTL:
+            db.delete(entry)
+            db.commit()
+            _count("misses")
+            _count("evictions")
+            return None
+        entry.last_used_at = now
+        entry.hit_count += 1
+        payload = json.loads(entry.payload)
+        db.commit()
+    _count("hits")
+    return payload
+
+
+def put(key: str, model_name: str, payload: Mapping[str, Any]) -> None:
+    """Store a report payload and evict expired or least recently used rows."""
+    now = datetime.utcnow()
+    with SessionLocal() as db:
+        db.merge(
+            models.ReportCacheEntry(
+                key=key,
+                model_name=model_name,
+                payload=json.dumps(payload),
+                created_at=now,
+                last_used_at=now,
+                hit_count=0,
+            )
+        )
+        evicted = (
+            db.query(models.ReportCacheEntry)
+            .filter(models.ReportCacheEntry.created_at < now - TTL)
+            .delete(synchronize_session=False)
+        )
+        db.flush()
+        overflow = db.query(models.ReportCacheEntry).count() - MAX_ENTRIES
+        if overflow > 0:
+            stale_keys = (
+                db.query(models.ReportCacheEntry.key)
+                .order_by(models.ReportCacheEntry.last_used_at)
+                .limit(overflow)
+                .subquery()
+            )
+            evicted += (
+                db.query(models.ReportCacheEntry)
+                .filter(models.ReportCacheEntry.key.in_(stale_keys.select()))
+                .delete(synchronize_session=False)
+            )
+        db.commit()
+    _count("writes")
+    if evicted:
+        _count("evictions", evicted)
+
+
+def stats() -> dict[str, Any]:
+    with _lock:
+        counters = dict(_counters)
+    lookups = counters["hits"] + counters["misses"]
+    with SessionLocal() as db:
+        entries = db.query(models.ReportCacheEntry).count()
+    return {
+        **counters,
+        "hit_rate": round(counters["hits"] / lookups, 3) if lookups else None,
+        "entries": entries,
+        "max_entries": MAX_ENTRIES,
+        "ttl_seconds": int(TTL.total_seconds()),
+    }
@@ -0,0 +1,195 @@
+"""Compressed storage for AI report payloads.
+
+Reports are stored in ``ai_report_data`` as a one-byte format version followed
+by a raw DEFLATE stream. Reports are a few KB each, too short for DEFLATE to
+find much repetition on its own, so the compressor is primed with a preset
+dictionary of the report keys and stock phrasing that every report repeats.
+The version byte names the dictionary, so a new one can be introduced without
+rewriting old rows.
+
+The ``formatted`` text of PSI reports is not stored; it is derived from the
+structured fields and rendered on read. Rows written before this format keep
+their JSON in ``ai_report_json`` until the backfill task compresses them.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import zlib
+from typing import Any, Mapping
+
+from pydantic import ValidationError
+from sqlalchemy import func, update
+
+import ai
+import models
+from database import SessionLocal
+
+COMPRESSION_LEVEL = int(os.getenv("REPORT_COMPRESSION_LEVEL", "9"))
+BACKFILL_BATCH_SIZE = int(os.getenv("REPORT_BACKFILL_BATCH_SIZE", "500"))
+
+# Fields derived from the rest of the payload and never persisted
+DERIVED_FIELDS = ("formatted",)
+
+# DEFLATE favours matches near the end of the dictionary, so the most common
+# strings (the report skeletons) come last.
+_DICTIONARY_V1 = (
+    " the player partner opponent rally rallies shots shot court net front back mid-court"
+    " forehand backhand smash drop clear lift drive serve return defence defense attack"
+    " footwork movement recovery balance positioning split step timing pressure consistency"
+    " placement power accuracy rotation coverage communication decision selection variety"
+    " under pressure to the in the of the and with on the at the for the during the session"
+    " needs improvement improve improving consistent strong good solid weak late early"
+    " drills drill reps sets minutes per session daily weekly weeks target focus on"
+    " Continue practicing Work on Practice Maintain Increase Reduce Improve Develop"
+    " multi-shuttle shadow footwork ladder drills cross-court straight deep high clears"
+    " unforced errors forced errors service faults approximately percent % of shots"
+    " AI service unavailable. Provide manual feedback for this session. (Reason: "
+    " Analysis in progress See coach notes. Unable to evaluate automatically."
+    ' "technical_analysis":{"smash_success_rate":"","drop_shot_precision":"",'
+    '"clear_depth_consistency":"","net_play_effectiveness":"","unforced_errors":"",'
+    '"forced_errors":"","service_faults":""},"movement_footwork":{"court_coverage":"",'
+    '"recovery_speed":"","balance_stance":"","fatigue_analysis":""},"tactical_insights":'
+    '{"rally_patterns":"","shot_distribution":"","predictability":"","opponent_exploits":""},'
+    '"team_performance":{"coordination_rotation":"","court_coverage_split":"",'
+    '"communication_indicators":"","synergy_score":'
+    '{"scores":{"presence":,"skill":,"intent":,"psi":},"player_evaluation":"",'
+    '"player_strengths":["",""],"player_weaknesses":["",""],"actions_strengths":["",""],'
+    '"actions_weaknesses":["",""],"course_forward":"","summary_bullets":["","","","",""]}'
+).encode("utf-8")
+
+_DICTIONARIES = {1: _DICTIONARY_V1}
+FORMAT_VERSION = 1
+
+_backfill: asyncio.Task | None = None
+
+
+def _compress(raw: bytes) -> bytes:
+    compressor = zlib.compressobj(
+        COMPRESSION_LEVEL, zlib.DEFLATED, -zlib.MAX_WBITS, zdict=_DICTIONARIES[FORMAT_VERSION]
+    )
+    return bytes([FORMAT_VERSION]) + compressor.compress(raw) + compressor.flush()
+
+
+def pack(payload: Mapping[str, Any]) -> bytes:
+    """Compress a report payload, dropping fields that are rendered on read."""
+    stored = {key: value for key, value in payload.items() if key not in DERIVED_FIELDS}
+    return _compress(json.dumps(stored, separators=(",", ":"), ensure_ascii=False).encode("utf-8"))
+
+
+def unpack_json(data: bytes) -> bytes:
+    """Return the stored JSON document without parsing it."""
+    version = data[0]
+    if version not in _DICTIONARIES:
+        raise ValueError(f"Unknown report format version {version}")
+    decompressor = zlib.decompressobj(-zlib.MAX_WBITS, zdict=_DICTIONARIES[version])
+    return decompressor.decompress(data[1:]) + decompressor.flush()
+
+
+def report_json(data: bytes | None, legacy_json: str | None = None) -> bytes | None:
+    """JSON for a row's report, from the compressed column or the legacy text."""
+    if data is not None:
+        return unpack_json(data)
+    if legacy_json is not None:
+        return legacy_json.encode("utf-8")
+    return None
+
+
+def load(data: bytes | None, legacy_json: str | None = None) -> dict[str, Any] | None:
+    """A row's report; None when it has none or the stored JSON is not an object."""
+    document = report_json(data, legacy_json)
+    if document is None:
+        return None
+    try:
+        payload = json.loads(document)
+    except ValueError:
+        return None
+    return payload if isinstance(payload, dict) else None
+
+
+def columns(payload: Mapping[str, Any]) -> dict[str, Any]:
+    """Column values that store ``payload`` on an Evaluation or VideoAnalysis row."""
+    bullets = payload.get("summary_bullets")
+    return {
+        "ai_report_data": pack(payload),
+        "ai_report_json": None,
+        "summary_bullets": json.dumps(bullets) if isinstance(bullets, list) else None,
+        "report_degraded": bool(payload.get("degraded")),
+    }
+
+
+def start_backfill() -> None:
+    """Compress reports still stored as JSON text, in the background."""
+    global _backfill
+    if _backfill is None:
+        _backfill = asyncio.create_task(_backfill_loop(), name="report-backfill")
+
+
+async def stop_backfill() -> None:
+    global _backfill
+    if _backfill is not None:
+        _backfill.cancel()
+        await asyncio.gather(_backfill, return_exceptions=True)
+        _backfill = None
+
+
+async def _backfill_loop() -> None:
+    for model in (models.Evaluation, models.VideoAnalysis):
+        try:
+            last_id = 0
+            while (last_id := await asyncio.to_thread(backfill_batch, model, last_id)) is not None:
+                pass
+        except Exception as exc:  # the next startup picks up where this stopped
+            print(f"[REPORTS] Backfill of {model.__tablename__} failed: {exc}")
+
+
+def backfill_batch(model, after_id: int = 0, batch_size: int = BACKFILL_BATCH_SIZE) -> int | None:
+    """Compress one batch of legacy rows of ``model`` with ids above ``after_id``.
+
+    Returns the last id examined, or None when no legacy rows remain. Rows
+    whose JSON is malformed or not an object are left as they are, and the
+    scan moves past them. An evaluation keeps its ``ai_feedback`` text unless
+    its payload is a complete PSI report that history can render it from.
+    """
+    with SessionLocal() as db:
+        rows = (
+            db.query(model.id, model.ai_report_json)
+            .filter(model.ai_report_json.isnot(None), model.id > after_id)
+            .order_by(model.id)
+            .limit(batch_size)
+            .all()
+        )
+        for row_id, legacy_json in rows:
+            try:
+                payload = json.loads(legacy_json)
+            except ValueError:
+                payload = None
+            if not isinstance(payload, dict):
+                print(f"[REPORTS] Skipping {model.__tablename__} {row_id}: stored report is not a JSON object")
+                continue
+            values = columns(payload)
+            if model is models.Evaluation:
+                if _renders(payload):
+                    values["ai_feedback"] = None
+                elif isinstance(payload.get("formatted"), str):
+                    # The text cannot be rendered again once it is dropped from the payload.
+                    values["ai_feedback"] = func.coalesce(model.ai_feedback, payload["formatted"])
+            # A report regenerated meanwhile has already cleared ai_report_json.
+            db.execute(
+                update(model)
+                .where(model.id == row_id, model.ai_report_json.isnot(None))
+                .values(**values)
+            )
+        db.commit()
+        return rows[-1][0] if rows else None
+
+
+
+def _renders(payload: Mapping[str, Any]) -> bool:
+    """True when the formatted PSI text can be rendered from ``payload``."""
+    try:
+        ai.formatted_report(payload)
+    except ValidationError:
+        return False
+    return True
@@ -0,0 +1,76 @@
+"""One-shot schema setup: create tables and add columns and indexes older databases lack.
+
+The app runs this from its lifespan, so importing ``main`` touches no
+database. Deployments that run several workers can instead run it once
+before starting them and set ``SCHEMA_CHECK_ON_STARTUP=false``::
+
+    python -m schema
+"""
+from __future__ import annotations
+
+import os
+import threading
+
+from sqlalchemy import inspect, text
+from sqlalchemy.exc import NoSuchTableError
+from sqlalchemy.schema import CreateColumn, CreateIndex
+
+from database import engine
+from models import Base  # via models, so every table is registered on its metadata
+
+CHECK_ON_STARTUP = os.getenv("SCHEMA_CHECK_ON_STARTUP", "true").lower() == "true"
+
+_lock = threading.Lock()
+_prepared = False
+
+
+def prepare() -> None:
+    """Bring the schema up to date; later calls in the same process return at once."""
+    global _prepared
+    with _lock:
+        if _prepared:
+            return
+        Base.metadata.create_all(bind=engine)
+        _ensure_columns()
+        _ensure_indexes()
+        _prepared = True
+
+
+def _ensure_columns() -> None:
+    """Add columns declared on the models that older databases lack.
+
+    Column DDL is compiled for the connected dialect, so the same upgrade runs
+    on SQLite and PostgreSQL. Only nullable columns can be added in place.
+    """
+    inspector = inspect(engine)
+    preparer = engine.dialect.identifier_preparer
+    with engine.begin() as connection:
+        for table in Base.metadata.sorted_tables:
+            try:
+                existing = {column["name"] for column in inspector.get_columns(table.name)}
+            except NoSuchTableError:
+                continue
+            for column in table.columns:
+                if column.name in existing or not column.nullable:
+                    continue
+                column_ddl = CreateColumn(column).compile(dialect=engine.dialect)
+                connection.execute(text(f"ALTER TABLE {preparer.format_table(table)} ADD COLUMN {column_ddl}"))
+
+
+def _ensure_indexes() -> None:
+    """Create indexes declared on the models that older database files lack.
+
+    ``create_all`` skips tables that already exist, so indexes added later are
+    issued here. ``IF NOT EXISTS`` makes this a no-op once they are present,
+    which also covers expression indexes that the inspector cannot reflect.
+    """
+    with engine.begin() as connection:
+        for table in Base.metadata.sorted_tables:
+            for index in table.indexes:
+                # Unlike connection.execute, this honours Index.ddl_if, as create_all does.
+                CreateIndex(index, if_not_exists=True)._invoke_with(connection)
+
+
+if __name__ == "__main__":
+    prepare()
+    print(f"[SCHEMA] {engine.url.render_as_string(hide_password=True)} is up to date")
@@ -94,3 +94,26 @@ class VideoAnalysisResponse(BaseModel):
 
     class Config:
         orm_mode = True
+
+class VideoAnalysisSummary(BaseModel):
+    """List view of a video analysis without the stored media or report JSON."""
+    id: int
+    coach_id: int
+    session_id: str
+    date: Optional[datetime] = None  # legacy rows may have none
+    game_format: str
+    event_type: str
+    event_type_description: Optional[str]
+    player_id: int
+    partner_id: Optional[int]
+    presence_score: Optional[int]
+    skill_score: Optional[int]
+    intent_score: Optional[int]
+    psi_score: Optional[float]
+    synergy_score: Optional[int]
+    has_report: bool
+    summary_bullets: list[str] = []
+    degraded: bool = False
+
+    class Config:
+        orm_mode = True
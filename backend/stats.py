@@ -0,0 +1,334 @@
+"""Per-player and per-coach score aggregates maintained incrementally.
+
+Every scored session (an evaluation or a video analysis) updates one
+``score_aggregates`` row for its player and one for its coach, inside the
+transaction that writes the session. A row holds running sums and counts of
+each score, session counts by event type, the best and worst sessions by PSI
+and the ``STATS_WINDOW`` most recent scored sessions, from which the rolling
+averages and trend slope are computed on read. Reading stats is therefore a
+single primary-key lookup however long the history is.
+
+Rows are built from history the first time a scope is touched, so databases
+created before this table existed need no migration. Removing or rescoring
+the best, worst or a windowed session re-reads just those from history.
+
+Callers flush the session row first: on SQLite that takes the write lock
+before the aggregate is read, and on server databases the aggregate row is
+read ``FOR UPDATE``, so concurrent sessions never lose an update.
+"""
+from __future__ import annotations
+
+import json
+import os
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy import func, literal, select, union_all
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+import models
+
+WINDOW = int(os.getenv("STATS_WINDOW", "10"))
+METRICS = ("presence", "skill", "intent", "psi")
+PLAYER = "player"
+COACH = "coach"
+EVALUATION_EVENT = "evaluation"
+
+
+def evaluation_entry(evaluation: models.Evaluation, coach_id: int) -> dict[str, Any]:
+    return {
+        "kind": "evaluation",
+        "id": evaluation.id,
+        "player_id": evaluation.player_id,
+        "coach_id": coach_id,
+        "date": evaluation.date.isoformat() if evaluation.date else None,
+        "event_type": EVALUATION_EVENT,
+        "presence": evaluation.pressure_score,
+        "skill": evaluation.skill_score,
+        "intent": evaluation.intent_score,
+        "psi": evaluation.psi_score,
+    }
+
+
+def video_entry(analysis: models.VideoAnalysis) -> dict[str, Any]:
+    return {
+        "kind": "video_analysis",
+        "id": analysis.id,
+        "player_id": analysis.player_id,
+        "coach_id": analysis.coach_id,
+        "date": analysis.date.isoformat() if analysis.date else None,
+        "event_type": analysis.event_type,
+        "presence": analysis.presence_score,
+        "skill": analysis.skill_score,
+        "intent": analysis.intent_score,
+        "psi": analysis.psi_score,
+    }
+
+
+def record_added(db: Session, entry: dict[str, Any]) -> None:
+    """Count a session that has just been flushed."""
+    for scope, scope_id in _scopes(entry):
+        aggregate = _aggregate_for_update(db, scope, scope_id)
+        if aggregate is not None:
+            _add(aggregate, entry)
+            _touch(aggregate)
+
+
+def record_removed(db: Session, entry: dict[str, Any]) -> None:
+    """Forget a session whose deletion has just been flushed."""
+    for scope, scope_id in _scopes(entry):
+        aggregate = _aggregate_for_update(db, scope, scope_id)
+        if aggregate is not None:
+            stale = _subtract(aggregate, entry)
+            if stale:
+                _refresh_window(db, aggregate)
+            _touch(aggregate)
+
+
+def record_replaced(db: Session, before: dict[str, Any], after: dict[str, Any]) -> None:
+    """Apply a rescored session; ``before`` is its state prior to the flushed update."""
+    for scope, scope_id in _scopes(after):
+        aggregate = _aggregate_for_update(db, scope, scope_id)
+        if aggregate is None:
+            continue
+        stale = _subtract(aggregate, before)
+        _add(aggregate, after)
+        if stale:
+            _refresh_window(db, aggregate)
+        _touch(aggregate)
+
+
+def get(db: Session, scope: str, scope_id: int) -> models.ScoreAggregate:
+    """Return the aggregate for a scope, building it from history if missing."""
+    aggregate = db.get(models.ScoreAggregate, (scope, scope_id))
+    if aggregate is None:
+        _aggregate_for_update(db, scope, scope_id)
+        db.commit()
+        aggregate = db.get(models.ScoreAggregate, (scope, scope_id))
+    return aggregate
+
+
+def summary(aggregate: models.ScoreAggregate) -> dict[str, Any]:
+    """Render an aggregate row; constant work regardless of history length."""
+    window = json.loads(aggregate.recent or "[]")
+    averages = {}
+    rolling = {}
+    for metric in METRICS:
+        count = getattr(aggregate, f"{metric}_count")
+        averages[metric] = round(getattr(aggregate, f"{metric}_sum") / count, 2) if count else None
+        values = [item[metric] for item in window if item[metric] is not None]
+        rolling[metric] = round(sum(values) / len(values), 2) if values else None
+    return {
+        "sessions": aggregate.session_count,
+        "evaluations": aggregate.evaluation_count,
+        "video_analyses": aggregate.video_count,
+        "event_counts": json.loads(aggregate.event_counts or "{}"),
+        "averages": averages,
+        "rolling_averages": rolling,
+        "window": WINDOW,
+        "trend_slope": _slope([item["psi"] for item in reversed(window)]),
+        "best_session": json.loads(aggregate.best) if aggregate.best else None,
+        "worst_session": json.loads(aggregate.worst) if aggregate.worst else None,
+        "updated_at": aggregate.updated_at.isoformat() if aggregate.updated_at else None,
+    }
+
+
+def _scopes(entry: dict[str, Any]) -> tuple[tuple[str, int], ...]:
+    return ((PLAYER, entry["player_id"]), (COACH, entry["coach_id"]))
+
+
+def _aggregate_for_update(db: Session, scope: str, scope_id: int) -> models.ScoreAggregate | None:
+    """Lock the scope's aggregate; returns None when it was just built from history.
+
+    A freshly built row already reflects the caller's flushed change, so the
+    caller must not apply it again.
+    """
+    key = (scope, scope_id)
+    aggregate = db.get(models.ScoreAggregate, key, with_for_update=True)
+    if aggregate is not None:
+        return aggregate
+    try:
+        with db.begin_nested():
+            db.add(_build(db, scope, scope_id))
+        return None
+    except IntegrityError:
+        # Another transaction built it first, from a snapshot without our change.
+        return db.get(models.ScoreAggregate, key, with_for_update=True)
+
+
+def _touch(aggregate: models.ScoreAggregate) -> None:
+    aggregate.updated_at = datetime.utcnow()
+
+
+def _same(first: dict[str, Any] | None, second: dict[str, Any]) -> bool:
+    return first is not None and first["kind"] == second["kind"] and first["id"] == second["id"]
+
+
+def _add(aggregate: models.ScoreAggregate, entry: dict[str, Any]) -> None:
+    _count(aggregate, entry, 1)
+    if entry["psi"] is None:
+        return
+    window = json.loads(aggregate.recent or "[]")
+    window.append(_public(entry))
+    window.sort(key=_recency, reverse=True)
+    aggregate.recent = json.dumps(window[:WINDOW])
+    best = json.loads(aggregate.best) if aggregate.best else None
+    worst = json.loads(aggregate.worst) if aggregate.worst else None
+    if best is None or entry["psi"] > best["psi"]:
+        aggregate.best = json.dumps(_public(entry))
+    if worst is None or entry["psi"] < worst["psi"]:
+        aggregate.worst = json.dumps(_public(entry))
+
+
+def _subtract(aggregate: models.ScoreAggregate, entry: dict[str, Any]) -> bool:
+    """Remove ``entry``; True when the window or extremes must be re-read."""
+    _count(aggregate, entry, -1)
+    window = json.loads(aggregate.recent or "[]")
+    in_window = any(_same(item, entry) for item in window)
+    if in_window:
+        aggregate.recent = json.dumps([item for item in window if not _same(item, entry)])
+    best = json.loads(aggregate.best) if aggregate.best else None
+    worst = json.loads(aggregate.worst) if aggregate.worst else None
+    return in_window or _same(best, entry) or _same(worst, entry)
+
+
+def _count(aggregate: models.ScoreAggregate, entry: dict[str, Any], sign: int) -> None:
+    aggregate.session_count += sign
+    if entry["kind"] == "evaluation":
+        aggregate.evaluation_count += sign
+    else:
+        aggregate.video_count += sign
+    event_counts = json.loads(aggregate.event_counts or "{}")
+    event = entry["event_type"] or "other"
+    event_counts[event] = event_counts.get(event, 0) + sign
+    if event_counts[event] <= 0:
+        del event_counts[event]
+    aggregate.event_counts = json.dumps(event_counts)
+    for metric in METRICS:
+        if entry[metric] is not None:
+            setattr(aggregate, f"{metric}_sum", getattr(aggregate, f"{metric}_sum") + sign * entry[metric])
+            setattr(aggregate, f"{metric}_count", getattr(aggregate, f"{metric}_count") + sign)
+
+
+def _public(entry: dict[str, Any]) -> dict[str, Any]:
+    return {key: value for key, value in entry.items() if key not in ("player_id", "coach_id")}
+
+
+def _recency(entry: dict[str, Any]) -> tuple[str, str, int]:
+    return entry["date"] or "", entry["kind"], entry["id"]
+
+
+def _slope(values: list[float | None]) -> float | None:
+    """Least-squares PSI change per session over the window, oldest first."""
+    points = [value for value in values if value is not None]
+    if len(points) < 2:
+        return None
+    mean_x = (len(points) - 1) / 2
+    mean_y = sum(points) / len(points)
+    numerator = sum((index - mean_x) * (value - mean_y) for index, value in enumerate(points))
+    denominator = sum((index - mean_x) ** 2 for index in range(len(points)))
+    return round(numerator / denominator, 3)
+
+
+def sessions(scope: str, scope_id: int):
+    """Union of a scope's evaluations and video analyses with common columns."""
+    evaluation = models.Evaluation
+    analysis = models.VideoAnalysis
+    evaluations = select(
+        literal("evaluation").label("kind"),
+        evaluation.id,
+        evaluation.player_id,
+        evaluation.date,
+        literal(EVALUATION_EVENT).label("event_type"),
+        evaluation.pressure_score.label("presence"),
+        evaluation.skill_score.label("skill"),
+        evaluation.intent_score.label("intent"),
+        evaluation.psi_score.label("psi"),
+    )
+    analyses = select(
+        literal("video_analysis").label("kind"),
+        analysis.id,
+        analysis.player_id,
+        analysis.date,
+        analysis.event_type,
+        analysis.presence_score.label("presence"),
+        analysis.skill_score.label("skill"),
+        analysis.intent_score.label("intent"),
+        analysis.psi_score.label("psi"),
+    )
+    if scope == PLAYER:
+        evaluations = evaluations.where(evaluation.player_id == scope_id)
+        analyses = analyses.where(analysis.player_id == scope_id)
+    else:
+        evaluations = evaluations.join(models.Player, models.Player.id == evaluation.player_id).where(
+            models.Player.coach_id == scope_id
+        )
+        analyses = analyses.where(analysis.coach_id == scope_id)
+    return union_all(evaluations, analyses)
+
+
+def _build(db: Session, scope: str, scope_id: int) -> models.ScoreAggregate:
+    aggregate = models.ScoreAggregate(
+        scope=scope,
+        scope_id=scope_id,
+        session_count=0,
+        evaluation_count=0,
+        video_count=0,
+        **{f"{metric}_sum": 0.0 for metric in METRICS},
+        **{f"{metric}_count": 0 for metric in METRICS},
+    )
+    history = sessions(scope, scope_id).subquery()
+    totals = db.execute(
+        select(
+            history.c.kind,
+            history.c.event_type,
+            func.count(),
+            *[func.coalesce(func.sum(history.c[metric]), 0) for metric in METRICS],
+            *[func.count(history.c[metric]) for metric in METRICS],
+        ).group_by(history.c.kind, history.c.event_type)
+    ).all()
+    event_counts: dict[str, int] = {}
+    for kind, event_type, count, *values in totals:
+        aggregate.session_count += count
+        if kind == "evaluation":
+            aggregate.evaluation_count += count
+        else:
+            aggregate.video_count += count
+        event = event_type or "other"
+        event_counts[event] = event_counts.get(event, 0) + count
+        for index, metric in enumerate(METRICS):
+            setattr(aggregate, f"{metric}_sum", getattr(aggregate, f"{metric}_sum") + values[index])
+            setattr(aggregate, f"{metric}_count", getattr(aggregate, f"{metric}_count") + values[len(METRICS) + index])
+    aggregate.event_counts = json.dumps(event_counts)
+    _refresh_window(db, aggregate)
+    _touch(aggregate)
+    return aggregate
+
+
+def _refresh_window(db: Session, aggregate: models.ScoreAggregate) -> None:
+    """Re-read the recent window and the best/worst sessions from history."""
+    history = sessions(aggregate.scope, aggregate.scope_id).subquery()
+    scored = select(history).where(history.c.psi.isnot(None))
+
+    def fetch(*order_by, limit: int) -> list[dict[str, Any]]:
+        rows = db.execute(scored.order_by(*order_by).limit(limit)).mappings()
+        return [_row_entry(row) for row in rows]
+
+    window = fetch(history.c.date.desc(), history.c.kind.desc(), history.c.id.desc(), limit=WINDOW)
+    best = fetch(history.c.psi.desc(), history.c.date.desc(), limit=1)
+    worst = fetch(history.c.psi.asc(), history.c.date.desc(), limit=1)
+    aggregate.recent = json.dumps(window)
+    aggregate.best = json.dumps(best[0]) if best else None
+    aggregate.worst = json.dumps(worst[0]) if worst else None
+
+
+def _row_entry(row) -> dict[str, Any]:
+    date = row["date"]
+    return {
+        "kind": row["kind"],
+        "id": row["id"],
+        "date": date.isoformat() if isinstance(date, datetime) else date,
+        "event_type": row["event_type"],
+        **{metric: row[metric] for metric in METRICS},
+    }
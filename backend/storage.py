@@ -0,0 +1,244 @@
+"""Content-addressed blob storage for uploaded match videos.
+
+Older clients embedded the video in ``video_path`` as a base64 data URL. The
+backfill task moves those into the store at startup, so reads never write.
+"""
+from __future__ import annotations
+
+import asyncio
+import base64
+import hashlib
+import mimetypes
+import os
+import re
+import tempfile
+from pathlib import Path
+
+from dotenv import load_dotenv
+from sqlalchemy import update
+
+import models
+from database import SessionLocal
+
+load_dotenv()
+
+MEDIA_ROOT = Path(os.getenv("MEDIA_ROOT", "./media"))
+BLOB_ROOT = MEDIA_ROOT / "blobs"
+BLOB_PREFIX = "blob:"
+CHUNK_SIZE = 1024 * 1024
+BACKFILL_BATCH_SIZE = int(os.getenv("VIDEO_BACKFILL_BATCH_SIZE", "20"))
+
+_BLOB_REF_PATTERN = re.compile(r"^blob:([0-9a-f]{64})(\.[a-z0-9]{1,8})?$")
+
+_backfill: asyncio.Task | None = None
+
+
+class BlobNotFound(Exception):
+    """Raised when a blob reference does not point at a stored file."""
+
+
+def is_blob_ref(value: str | None) -> bool:
+    """Return True when ``value`` is a reference produced by this store."""
+    return bool(value) and _BLOB_REF_PATTERN.match(value) is not None
+
+
+def blob_path(ref: str) -> Path:
+    """Resolve a blob reference to its on-disk location."""
+    match = _BLOB_REF_PATTERN.match(ref or "")
+    if not match:
+        raise BlobNotFound(f"Invalid blob reference: {ref!r}")
+    digest, extension = match.group(1), match.group(2) or ""
+    return BLOB_ROOT / digest[:2] / f"{digest}{extension}"
+
+
+def blob_digest(ref: str) -> str:
+    """Return the SHA-256 hex digest embedded in a blob reference."""
+    match = _BLOB_REF_PATTERN.match(ref or "")
+    if not match:
+        raise BlobNotFound(f"Invalid blob reference: {ref!r}")
+    return match.group(1)
+
+
+def exists(ref: str) -> bool:
+    try:
+        return blob_path(ref).is_file()
+    except BlobNotFound:
+        return False
+
+
+def extension_for(content_type: str | None) -> str:
+    """Pick a file extension so downstream tools can sniff the media type."""
+    if not content_type:
+        return ""
+    media_type = content_type.split(";", 1)[0].strip().lower()
+    extension = mimetypes.guess_extension(media_type) or ""
+    return extension if re.fullmatch(r"\.[a-z0-9]{1,8}", extension) else ""
+
+
+def _fsync_directory(path: Path) -> None:
+    """Make a rename into ``path`` durable; directories cannot be opened on Windows."""
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _publish(source: Path, destination: Path) -> None:
+    """Rename a synced file to its content address, or drop it if already stored."""
+    destination.parent.mkdir(parents=True, exist_ok=True)
+    if destination.exists():
+        source.unlink(missing_ok=True)
+        return
+    os.replace(source, destination)
+    _fsync_directory(destination.parent)
+
+
+class BlobWriter:
+    """Incrementally hash and write a blob without holding it in memory.
+
+    Chunks are appended to a temporary file inside the blob root and the
+    SHA-256 digest is updated as they arrive. ``commit`` moves the file to its
+    content-addressed location; identical uploads collapse onto one file.
+    """
+
+    def __init__(self, content_type: str | None = None) -> None:
+        BLOB_ROOT.mkdir(parents=True, exist_ok=True)
+        self.extension = extension_for(content_type)
+        self.size = 0
+        self._hash = hashlib.sha256()
+        fd, name = tempfile.mkstemp(dir=BLOB_ROOT, prefix=".upload-", suffix=".part")
+        self._file = os.fdopen(fd, "wb")
+        self._temp_path = Path(name)
+
+    def write(self, chunk: bytes) -> None:
+        if not chunk:
+            return
+        self._hash.update(chunk)
+        self._file.write(chunk)
+        self.size += len(chunk)
+
+    def commit(self) -> str:
+        """Finalize the upload and return its blob reference.
+
+        The data is flushed to disk before the rename, so a crash cannot leave
+        a truncated file under the name of its full contents.
+        """
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._file.close()
+        ref = f"{BLOB_PREFIX}{self._hash.hexdigest()}{self.extension}"
+        _publish(self._temp_path, blob_path(ref))
+        return ref
+
+    def abort(self) -> None:
+        if not self._file.closed:
+            self._file.close()
+        self._temp_path.unlink(missing_ok=True)
+
+    def __enter__(self) -> "BlobWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is not None:
+            self.abort()
+
+
+def store_file(path: str | os.PathLike[str], content_type: str | None = None) -> str:
+    """Copy an existing local file into the blob store."""
+    with BlobWriter(content_type) as writer, open(path, "rb") as source:
+        while chunk := source.read(CHUNK_SIZE):
+            writer.write(chunk)
+        return writer.commit()
+
+
+def adopt_file(path: str | os.PathLike[str], content_type: str | None = None) -> str:
+    """Move a fully written file under ``MEDIA_ROOT`` into the store.
+
+    The file is hashed in a single sequential pass and then renamed into place,
+    so assembled uploads are never copied.
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as source:
+        while chunk := source.read(CHUNK_SIZE):
+            digest.update(chunk)
+    ref = f"{BLOB_PREFIX}{digest.hexdigest()}{extension_for(content_type)}"
+    _publish(Path(path), blob_path(ref))
+    return ref
+
+
+def store_data_url(data_url: str) -> str:
+    """Decode a legacy ``data:`` URL into the blob store.
+
+    Older clients embed the whole video as base64. Decoding in slices keeps the
+    peak memory at the size of the original string instead of doubling it.
+    """
+    header, _, encoded = data_url.partition(",")
+    content_type = header[len("data:"):].split(";", 1)[0] or None
+    # Slices must be a multiple of 4 base64 characters to decode independently.
+    step = CHUNK_SIZE * 4 // 3 // 4 * 4
+    with BlobWriter(content_type) as writer:
+        for start in range(0, len(encoded), step):
+            writer.write(base64.b64decode(encoded[start:start + step]))
+        return writer.commit()
+
+
+def start_backfill() -> None:
+    """Move videos still stored inline as data URLs into the store, in the background."""
+    global _backfill
+    if _backfill is None:
+        _backfill = asyncio.create_task(_backfill_loop(), name="video-backfill")
+
+
+async def stop_backfill() -> None:
+    global _backfill
+    if _backfill is not None:
+        _backfill.cancel()
+        await asyncio.gather(_backfill, return_exceptions=True)
+        _backfill = None
+
+
+async def _backfill_loop() -> None:
+    try:
+        last_id = 0
+        while (last_id := await asyncio.to_thread(backfill_batch, last_id)) is not None:
+            pass
+    except Exception as exc:  # the next startup picks up where this stopped
+        print(f"[STORAGE] Backfill of inline videos failed: {exc}")
+
+
+def backfill_batch(after_id: int = 0, batch_size: int = BACKFILL_BATCH_SIZE) -> int | None:
+    """Move the inline videos of one batch of analyses with ids above ``after_id``.
+
+    Returns the last id examined, or None when no inline videos remain. Each
+    video is loaded and committed on its own so only one is held in memory.
+    Rows whose data URL cannot be decoded are left as they are.
+    """
+    with SessionLocal() as db:
+        ids = [
+            row_id
+            for (row_id,) in db.query(models.VideoAnalysis.id)
+            .filter(models.VideoAnalysis.video_path.like("data:%"), models.VideoAnalysis.id > after_id)
+            .order_by(models.VideoAnalysis.id)
+            .limit(batch_size)
+        ]
+        for analysis_id in ids:
+            data_url = db.query(models.VideoAnalysis.video_path).filter(models.VideoAnalysis.id == analysis_id).scalar()
+            if not data_url or not data_url.startswith("data:"):
+                continue
+            try:
+                ref = store_data_url(data_url)
+            except ValueError as exc:
+                print(f"[STORAGE] Skipping video analysis {analysis_id}: {exc}")
+                continue
+            # A row edited meanwhile no longer holds this data URL; leave it.
+            db.execute(
+                update(models.VideoAnalysis)
+                .where(models.VideoAnalysis.id == analysis_id, models.VideoAnalysis.video_path == data_url)
+                .values(video_path=ref)
+            )
+            db.commit()
+        return ids[-1] if ids else None
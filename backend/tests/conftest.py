@@ -0,0 +1,34 @@
+"""Point the app at a throwaway SQLite file before any backend module is imported."""
+import os
+import tempfile
+
+_scratch = tempfile.mkdtemp(prefix="badminton-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_scratch, 'test.db')}"
+os.environ["MEDIA_ROOT"] = os.path.join(_scratch, "media")
+os.environ["GEMINI_API_KEY"] = ""
+os.environ["GOOGLE_API_KEY"] = ""
+
+import pytest  # noqa: E402
+
+import models  # noqa: E402
+from database import Base, SessionLocal, engine  # noqa: E402
+
+
+@pytest.fixture
+def db():
+    """A session on freshly created tables."""
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    with SessionLocal() as session:
+        yield session
+
+
+@pytest.fixture
+def player(db):
+    coach = models.Coach(username="coach", email="coach@example.com")
+    db.add(coach)
+    db.flush()
+    player = models.Player(name="Ana", level="beginner", gender="Female", coach_id=coach.id)
+    db.add(player)
+    db.commit()
+    return player
@@ -0,0 +1,106 @@
+import base64
+import io
+
+import pytest
+from fastapi.testclient import TestClient
+from PIL import Image
+
+import avatars
+import main
+import models
+
+
+def _png(color="red", size=(40, 30)):
+    buffer = io.BytesIO()
+    Image.new("RGB", size, color).save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+def _data_url(data):
+    return "data:image/png;base64," + base64.b64encode(data).decode()
+
+
+@pytest.fixture(autouse=True)
+def avatar_root(tmp_path, monkeypatch):
+    monkeypatch.setattr(avatars, "AVATAR_ROOT", tmp_path / "avatars")
+
+
+@pytest.fixture
+def client():
+    return TestClient(main.app)
+
+
+def _coach(db, username, picture=None):
+    coach = models.Coach(username=username, email=f"{username}@example.com", profile_picture=picture)
+    db.add(coach)
+    db.commit()
+    return coach.id
+
+
+def _picture(db, coach_id):
+    db.expire_all()
+    return db.get(models.Coach, coach_id).profile_picture
+
+
+def test_upload_attaches_resized_picture(client, db):
+    coach_id = _coach(db, "coach")
+    response = client.put("/coach/coach/profile-picture", content=_png(), headers={"content-type": "image/png"})
+    assert response.status_code == 200
+    ref = _picture(db, coach_id)
+    assert avatars.is_avatar_ref(ref)
+    assert response.json()["profile_picture_url"] == avatars.avatar_url(ref)
+    for size in avatars.AVATAR_SIZES:
+        with Image.open(avatars.avatar_path(avatars.avatar_digest(ref), size)) as image:
+            assert image.size == (size, size)
+
+
+def test_upload_rejects_unknown_coach_and_bad_images(client, db):
+    _coach(db, "coach")
+    headers = {"content-type": "image/png"}
+    assert client.put("/coach/nobody/profile-picture", content=_png(), headers=headers).status_code == 404
+    assert client.put("/coach/coach/profile-picture", content=b"not an image", headers=headers).status_code == 400
+    assert client.put("/coach/coach/profile-picture", content=b"", headers=headers).status_code == 400
+    response = client.put("/coach/coach/profile-picture", content=_png(), headers={"content-type": "text/plain"})
+    assert response.status_code == 415
+
+
+def test_get_coach_does_not_migrate_legacy_pictures(client, db):
+    legacy = _data_url(_png())
+    coach_id = _coach(db, "coach", legacy)
+    response = client.get("/coach/coach")
+    assert response.status_code == 200
+    assert response.json()["profile_picture_url"] is None
+    assert _picture(db, coach_id) == legacy
+
+
+def test_backfill_moves_legacy_pictures(db):
+    stored = _coach(db, "stored", avatars.save(_png("blue")))
+    legacy = _coach(db, "legacy", _data_url(_png()))
+    broken = _coach(db, "broken", "data:image/png;base64,AAAA")
+    empty = _coach(db, "empty")
+    stored_ref = _picture(db, stored)
+
+    assert avatars.backfill_batch(0, batch_size=1) == legacy
+    assert avatars.is_avatar_ref(_picture(db, legacy))
+    assert _picture(db, broken) == "data:image/png;base64,AAAA"
+
+    assert avatars.backfill_batch(legacy) == broken
+    assert avatars.backfill_batch(broken) is None
+    assert _picture(db, broken) is None
+    assert _picture(db, stored) == stored_ref
+    assert _picture(db, empty) is None
+
+
+def test_backfill_keeps_a_picture_uploaded_meanwhile(db, monkeypatch):
+    coach_id = _coach(db, "coach", _data_url(_png()))
+    uploaded = avatars.save(_png("green"))
+    save_data_url = avatars.save_data_url
+
+    def upload_during_backfill(data_url):
+        db.get(models.Coach, coach_id).profile_picture = uploaded
+        db.commit()
+        return save_data_url(data_url)
+
+    monkeypatch.setattr(avatars, "save_data_url", upload_during_backfill)
+    avatars.backfill_batch()
+    assert _picture(db, coach_id) == uploaded
@@ -0,0 +1,59 @@
+import json
+from types import SimpleNamespace
+
+import pytest
+from fastapi.testclient import TestClient
+
+import ai
+import main
+import models
+import stats
+
+PAYLOAD = {
+    "scores": {"presence": 7, "skill": 6, "intent": 8, "psi": 6.9},
+    "player_evaluation": "Strong net play.",
+    "summary_bullets": ["Quick split step"],
+    "formatted": "PSI 6.9",
+}
+
+
+@pytest.fixture
+def client(monkeypatch):
+    async def generate(evaluation, **kwargs):
+        return SimpleNamespace(as_dict=lambda: json.loads(json.dumps(PAYLOAD)))
+
+    monkeypatch.setattr(ai, "generate_psi_report_async", generate)
+    return TestClient(main.app)
+
+
+def _evaluation(player_id):
+    fields = (
+        "front_court", "back_court", "attacking_play", "defensive_play", "strokeplay",
+        "footwork", "presence", "intent", "improvements", "strengths", "comments",
+    )
+    return {"player_id": player_id, "session_id": "s1", "date": "2026-05-01T10:00:00", **dict.fromkeys(fields, "ok")}
+
+
+def _lines(response):
+    return [json.loads(line) for line in response.text.splitlines()]
+
+
+def test_batch_ends_with_saved_ids(client, db, player):
+    response = client.post("/submit-evaluations/batch", json=[_evaluation(player.id)] * 2)
+    assert response.status_code == 200
+    *reports, final = _lines(response)
+    assert [line["psi_report"]["scores"]["psi"] for line in reports] == [6.9, 6.9]
+    assert final["status"] == "Evaluations submitted"
+    assert sorted(final["evaluation_ids"]) == sorted(row.id for row in db.query(models.Evaluation))
+
+
+def test_batch_reports_a_failed_save(client, db, player, monkeypatch):
+    def fail(*args, **kwargs):
+        raise RuntimeError("database is locked")
+
+    monkeypatch.setattr(stats, "record_added", fail)
+    response = client.post("/submit-evaluations/batch", json=[_evaluation(player.id)] * 2)
+    *reports, final = _lines(response)
+    assert len(reports) == 2 and all("psi_report" in line for line in reports)
+    assert final == {"error": "Evaluations were not saved: database is locked"}
+    assert db.query(models.Evaluation).count() == 0
@@ -0,0 +1,86 @@
+"""One contract, run against every verification code backend."""
+import threading
+from datetime import timedelta
+
+import fakeredis
+import pytest
+
+import code_store
+
+
+@pytest.fixture(params=["memory", "database", "redis"])
+def store(request):
+    if request.param == "memory":
+        return code_store.MemoryCodeStore()
+    if request.param == "database":
+        request.getfixturevalue("db")
+        return code_store.DatabaseCodeStore()
+    return code_store.RedisCodeStore(client=fakeredis.FakeRedis(decode_responses=True))
+
+
+def test_code_is_accepted_once(store):
+    store.put("ana@example.com", "AB12CD", "email")
+    assert store.check("ana@example.com", "ab12cd")
+    assert not store.check("ana@example.com", "AB12CD")
+
+
+def test_unknown_contact_is_rejected(store):
+    assert not store.check("nobody@example.com", "AB12CD")
+    store.put("ana@example.com", "AB12CD", "email")
+    assert store.check("ana@example.com", "AB12CD")
+
+
+def test_wrong_guesses_use_up_the_code(store):
+    store.put("ana@example.com", "AB12CD", "email")
+    for _ in range(code_store.MAX_ATTEMPTS - 1):
+        assert not store.check("ana@example.com", "ZZZZZZ")
+    assert store.check("ana@example.com", "AB12CD")
+
+    store.put("ana@example.com", "AB12CD", "email")
+    for _ in range(code_store.MAX_ATTEMPTS):
+        assert not store.check("ana@example.com", "ZZZZZZ")
+    assert not store.check("ana@example.com", "AB12CD")
+
+
+def test_new_code_replaces_the_old_one_and_resets_attempts(store):
+    store.put("ana@example.com", "AB12CD", "email")
+    for _ in range(code_store.MAX_ATTEMPTS - 1):
+        store.check("ana@example.com", "ZZZZZZ")
+    store.put("ana@example.com", "EF34GH", "email")
+    assert not store.check("ana@example.com", "AB12CD")
+    assert store.check("ana@example.com", "EF34GH")
+
+
+def test_expired_code_is_rejected(store, monkeypatch):
+    monkeypatch.setattr(code_store, "CODE_TTL", timedelta(seconds=-1))
+    store.put("ana@example.com", "AB12CD", "email")
+    assert not store.check("ana@example.com", "AB12CD")
+
+
+def test_sends_are_limited_per_window(store):
+    for _ in range(code_store.SEND_LIMIT):
+        store.put("ana@example.com", "AB12CD", "email")
+    with pytest.raises(code_store.RateLimited) as limited:
+        store.put("ana@example.com", "EF34GH", "email")
+    assert timedelta(0) < limited.value.retry_after <= code_store.SEND_WINDOW
+    # The rejected send does not replace the live code.
+    assert store.check("ana@example.com", "AB12CD")
+    # Other contacts have their own budget.
+    store.put("ben@example.com", "EF34GH", "email")
+
+
+def test_racing_checks_accept_the_code_once(store):
+    store.put("ana@example.com", "AB12CD", "email")
+    barrier = threading.Barrier(4)
+    results = []
+
+    def check():
+        barrier.wait()
+        results.append(store.check("ana@example.com", "AB12CD"))
+
+    threads = [threading.Thread(target=check) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(10)
+    assert sorted(results) == [False, False, False, True]
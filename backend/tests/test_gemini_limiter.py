@@ -0,0 +1,133 @@
+import threading
+import time
+
+import pytest
+
+import gemini_limiter
+from gemini_limiter import BATCH, INTERACTIVE, VIDEO, Limiter
+
+
+def _wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise AssertionError("timed out")
+        time.sleep(0.005)
+
+
+def _grant_order(limiter, lanes):
+    """Queue callers in ``lanes`` order behind a held permit, then release it."""
+    granted = []
+    threads = []
+
+    def caller(lane, index):
+        with limiter.acquire(lane):
+            granted.append((lane, index))
+
+    with limiter.acquire(INTERACTIVE):
+        for index, lane in enumerate(lanes):
+            thread = threading.Thread(target=caller, args=(lane, index))
+            thread.start()
+            threads.append(thread)
+            _wait_for(lambda: limiter.stats()["queue_depth"] == index + 1)
+    for thread in threads:
+        thread.join(5)
+    return granted
+
+
+def test_higher_lanes_go_first():
+    limiter = Limiter("test", rpm=6000, max_concurrency=1)
+    granted = _grant_order(limiter, [VIDEO, BATCH, INTERACTIVE])
+    assert [lane for lane, _ in granted] == [INTERACTIVE, BATCH, VIDEO]
+
+
+def test_arrival_order_within_a_lane():
+    limiter = Limiter("test", rpm=6000, max_concurrency=1)
+    granted = _grant_order(limiter, [BATCH, VIDEO, BATCH, BATCH])
+    assert granted == [(BATCH, 0), (BATCH, 2), (BATCH, 3), (VIDEO, 1)]
+
+
+def test_unknown_lane_is_rejected():
+    limiter = Limiter("test", rpm=60)
+    with pytest.raises(ValueError):
+        with limiter.acquire("bulk"):
+            pass
+
+
+def test_throttled_call_pauses_the_limiter():
+    class Throttled(Exception):
+        code = 429
+
+    limiter = Limiter("test", rpm=60)
+    with pytest.raises(Throttled):
+        with limiter.acquire(BATCH):
+            raise Throttled("quota")
+    stats = limiter.stats()
+    assert stats["throttled"] == 1
+    assert stats["requests_available"] <= 0
+    assert 0 < stats["paused_seconds"] <= gemini_limiter.THROTTLE_PAUSE_SECONDS
+
+
+def test_settling_returns_unused_tokens():
+    limiter = Limiter("test", rpm=60, tpm=1000)
+    with limiter.acquire(INTERACTIVE, tokens=600) as permit:
+        assert limiter.stats()["tokens_available"] <= 400
+        permit.record_usage(type("Response", (), {"usage_metadata": type("Usage", (), {"total_token_count": 100})})())
+    assert limiter.stats()["tokens_available"] >= 900
+
+
+def _hold(limiter, lane, release, started):
+    def caller():
+        with limiter.acquire(lane):
+            started.append(lane)
+            release.wait(5)
+
+    thread = threading.Thread(target=caller)
+    thread.start()
+    return thread
+
+
+def test_video_calls_cannot_take_the_reserved_slots():
+    limiter = Limiter("test", rpm=6000, max_concurrency=4, interactive_reserved=1)
+    release, started = threading.Event(), []
+    threads = [_hold(limiter, VIDEO, release, started) for _ in range(5)]
+    _wait_for(lambda: limiter.stats()["queue_depth"] == 2 and limiter.stats()["in_flight"] == 3)
+
+    granted = threading.Event()
+
+    def interactive():
+        with limiter.acquire(INTERACTIVE):
+            granted.set()
+
+    thread = threading.Thread(target=interactive)
+    thread.start()
+    try:
+        assert granted.wait(2), "interactive call waited behind saturated video calls"
+        assert started.count(VIDEO) == 3
+    finally:
+        release.set()
+        for thread in [*threads, thread]:
+            thread.join(5)
+    stats = limiter.stats()
+    assert stats["lanes"][VIDEO]["granted"] == 5
+    assert stats["in_flight"] == 0
+
+
+def test_interactive_calls_may_fill_every_slot():
+    limiter = Limiter("test", rpm=6000, max_concurrency=3, interactive_reserved=1)
+    release, started = threading.Event(), []
+    threads = [_hold(limiter, INTERACTIVE, release, started) for _ in range(3)]
+    try:
+        _wait_for(lambda: len(started) == 3)
+        assert limiter.stats()["lanes"][INTERACTIVE]["in_flight"] == 3
+    finally:
+        release.set()
+        for thread in threads:
+            thread.join(5)
+
+
+def test_reserve_leaves_other_lanes_one_slot():
+    limiter = Limiter("test", rpm=6000, max_concurrency=2, interactive_reserved=5)
+    assert limiter.stats()["interactive_reserved"] == 1
+    with limiter.acquire(BATCH):
+        assert limiter.stats()["lanes"][BATCH]["in_flight"] == 1
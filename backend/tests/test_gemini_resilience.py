@@ -0,0 +1,86 @@
+from types import SimpleNamespace
+
+import pytest
+
+import gemini_resilience
+from gemini_resilience import CircuitBreaker, CircuitOpen
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = SimpleNamespace(value=1000.0)
+    monkeypatch.setattr(gemini_resilience, "time", SimpleNamespace(monotonic=lambda: now.value))
+    return now
+
+
+def test_opens_after_consecutive_failures(clock):
+    breaker = CircuitBreaker(failure_threshold=3, reset_seconds=30)
+    for _ in range(2):
+        breaker.before_call()
+        breaker.record_failure()
+    assert breaker.stats()["state"] == CircuitBreaker.CLOSED
+
+    breaker.before_call()
+    breaker.record_failure()
+    assert breaker.stats()["state"] == CircuitBreaker.OPEN
+    with pytest.raises(CircuitOpen):
+        breaker.before_call()
+    assert breaker.stats()["rejected"] == 1
+
+
+def test_success_resets_the_failure_count(clock):
+    breaker = CircuitBreaker(failure_threshold=2, reset_seconds=30)
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.stats()["state"] == CircuitBreaker.CLOSED
+    assert breaker.stats()["consecutive_failures"] == 1
+
+
+def test_stays_open_until_the_reset_interval(clock):
+    breaker = CircuitBreaker(failure_threshold=1, reset_seconds=30)
+    breaker.record_failure()
+    clock.value += 29
+    with pytest.raises(CircuitOpen):
+        breaker.before_call()
+    assert breaker.stats()["retry_in_seconds"] == 1.0
+
+
+def test_half_open_lets_one_probe_through(clock):
+    breaker = CircuitBreaker(failure_threshold=1, reset_seconds=30)
+    breaker.record_failure()
+    clock.value += 30
+
+    breaker.before_call()
+    assert breaker.stats()["state"] == CircuitBreaker.HALF_OPEN
+    with pytest.raises(CircuitOpen):
+        breaker.before_call()
+
+    breaker.record_success()
+    assert breaker.stats()["state"] == CircuitBreaker.CLOSED
+    breaker.before_call()
+
+
+def test_failed_probe_reopens(clock):
+    breaker = CircuitBreaker(failure_threshold=3, reset_seconds=30)
+    for _ in range(3):
+        breaker.record_failure()
+    clock.value += 30
+
+    breaker.before_call()
+    breaker.record_failure()
+    stats = breaker.stats()
+    assert stats["state"] == CircuitBreaker.OPEN
+    assert stats["opened"] == 2
+    assert stats["retry_in_seconds"] == 30.0
+
+
+def test_cancelled_probe_frees_the_slot(clock):
+    breaker = CircuitBreaker(failure_threshold=1, reset_seconds=30)
+    breaker.record_failure()
+    clock.value += 30
+
+    breaker.before_call()
+    breaker.cancel_probe()
+    breaker.before_call()
+    assert breaker.stats()["state"] == CircuitBreaker.HALF_OPEN
@@ -0,0 +1,162 @@
+import asyncio
+import threading
+from datetime import datetime, timedelta
+
+import pytest
+
+import jobs
+import models
+
+
+@pytest.fixture
+def queued(db, player):
+    """Ids of ten queued analysis jobs."""
+    for index in range(10):
+        analysis = models.VideoAnalysis(
+            coach_id=player.coach_id,
+            player_id=player.id,
+            session_id=f"s{index}",
+            game_format="singles",
+            event_type="drills",
+            player_appearance="Blue shirt",
+            video_path=f"videos/{index}.mp4",
+        )
+        db.add(analysis)
+        db.flush()
+        jobs.enqueue(db, analysis)
+    db.commit()
+    return [job_id for (job_id,) in db.query(models.AnalysisJob.id).order_by(models.AnalysisJob.id)]
+
+
+def _claim_concurrently(claim, workers=4):
+    barrier = threading.Barrier(workers)
+    claimed = [[] for _ in range(workers)]
+
+    def worker(index):
+        barrier.wait()
+        while (job_id := claim()) is not None:
+            claimed[index].append(job_id)
+
+    threads = [threading.Thread(target=worker, args=(index,)) for index in range(workers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(30)
+    return claimed
+
+
+def test_racing_workers_claim_each_job_once(db, queued):
+    claimed = _claim_concurrently(jobs._claim_next)
+    all_claimed = [job_id for ids in claimed for job_id in ids]
+    assert sorted(all_claimed) == queued
+
+    rows = db.query(models.AnalysisJob).all()
+    assert {row.status for row in rows} == {jobs.UPLOADING}
+    assert {row.attempts for row in rows} == {1}
+    assert {row.claimed_by for row in rows} == {jobs.WORKER_ID}
+
+
+def _set_in_flight(db, job_id, claimed_by, age):
+    db.query(models.AnalysisJob).filter(models.AnalysisJob.id == job_id).update(
+        {
+            "status": jobs.PROCESSING,
+            "claimed_by": claimed_by,
+            "updated_at": datetime.utcnow() - timedelta(seconds=age),
+        }
+    )
+    db.commit()
+
+
+def test_only_expired_leases_are_recovered(db, queued):
+    live, expired = queued[0], queued[1]
+    _set_in_flight(db, live, "other-host:1:live", age=jobs.LEASE_SECONDS / 2)
+    _set_in_flight(db, expired, "other-host:2:dead", age=jobs.LEASE_SECONDS * 2)
+
+    assert jobs.recover_expired(db) == 1
+    db.commit()
+
+    db.expire_all()
+    assert db.get(models.AnalysisJob, live).status == jobs.PROCESSING
+    recovered = db.get(models.AnalysisJob, expired)
+    assert (recovered.status, recovered.claimed_by) == (jobs.QUEUED, None)
+
+
+def test_claim_picks_up_expired_jobs_first(db, queued):
+    db.query(models.AnalysisJob).filter(models.AnalysisJob.id != queued[-1]).update({"status": jobs.DONE})
+    db.commit()
+    _set_in_flight(db, queued[0], "other-host:2:dead", age=jobs.LEASE_SECONDS * 2)
+
+    assert jobs._claim_next() == queued[0]
+    assert jobs._claim_next() == queued[-1]
+    assert jobs._claim_next() is None
+
+
+def test_lost_lease_cannot_overwrite_the_new_claim(db, queued):
+    _set_in_flight(db, queued[0], "other-host:1:new-owner", age=0)
+    jobs._set_status(queued[0], jobs.FAILED, "stale worker")
+    jobs._heartbeat(queued[0])
+
+    db.expire_all()
+    job = db.get(models.AnalysisJob, queued[0])
+    assert (job.status, job.error, job.claimed_by) == (jobs.PROCESSING, None, "other-host:1:new-owner")
+
+
+SCORES = {"presence": 7, "skill": 6, "intent": 8, "psi": 6.9}
+
+
+def test_result_is_stored_while_the_lease_is_held(db, queued):
+    _set_in_flight(db, queued[0], jobs.WORKER_ID, age=0)
+    payload = jobs._store_result(queued[0], {"scores": SCORES, "summary_bullets": ["Quick feet"]})
+    assert payload["status"] == jobs.DONE
+
+    db.expire_all()
+    job = db.get(models.AnalysisJob, queued[0])
+    assert (job.status, job.claimed_by, job.video_analysis.psi_score) == (jobs.DONE, None, 6.9)
+    assert db.query(models.ScoreAggregate).count() > 0
+
+
+def test_lost_lease_discards_the_result(db, queued):
+    _set_in_flight(db, queued[0], "other-host:1:new-owner", age=0)
+    assert jobs._store_result(queued[0], {"scores": SCORES}) is None
+    assert jobs._record_failure(queued[0], "stale worker") is None
+
+    db.expire_all()
+    job = db.get(models.AnalysisJob, queued[0])
+    assert (job.status, job.claimed_by, job.error) == (jobs.PROCESSING, "other-host:1:new-owner", None)
+    assert job.video_analysis.psi_score is None
+    assert db.query(models.ScoreAggregate).count() == 0
+
+
+def test_failure_requeues_until_attempts_run_out(db, queued):
+    _set_in_flight(db, queued[0], jobs.WORKER_ID, age=0)
+    assert jobs._record_failure(queued[0], "timeout")["status"] == jobs.QUEUED
+
+    db.query(models.AnalysisJob).filter(models.AnalysisJob.id == queued[0]).update({"attempts": jobs.MAX_ATTEMPTS})
+    db.commit()
+    _set_in_flight(db, queued[0], jobs.WORKER_ID, age=0)
+    assert jobs._record_failure(queued[0], "timeout")["status"] == jobs.FAILED
+
+
+def test_worker_survives_an_error_escaping_a_job(monkeypatch):
+    claims = iter([1, 2])
+    ran = []
+
+    async def run(job_id):
+        ran.append(job_id)
+        if job_id == 1:
+            raise RuntimeError("database went away")
+
+    monkeypatch.setattr(jobs, "_claim_next", lambda: next(claims, None))
+    monkeypatch.setattr(jobs, "_run", run)
+    monkeypatch.setattr(jobs, "POLL_INTERVAL_SECONDS", 0.01)
+
+    async def main():
+        monkeypatch.setattr(jobs, "_wakeup", asyncio.Event())
+        worker = asyncio.create_task(jobs._worker_loop())
+        while len(ran) < 2 and not worker.done():
+            await asyncio.sleep(0.01)
+        worker.cancel()
+        await asyncio.gather(worker, return_exceptions=True)
+
+    asyncio.run(asyncio.wait_for(main(), 5))
+    assert ran == [1, 2]
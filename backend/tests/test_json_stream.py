@@ -0,0 +1,57 @@
+import json
+
+from json_stream import FieldParser
+
+REPORT = {
+    "scores": {"presence": 7, "skill": 6, "intent": 8, "psi": 6.9},
+    "player_evaluation": 'Calls "mine" early, keeps {shape} and [width]\\ on the net.',
+    "summary_bullets": ["Quick split step", "Late backhand clears"],
+    "course_forward": "Shadow footwork",
+}
+
+
+def _feed_all(parser, chunks):
+    fields = []
+    for chunk in chunks:
+        fields.extend(parser.feed(chunk))
+    return fields
+
+
+def test_fields_arrive_as_they_close_across_any_split():
+    document = json.dumps(REPORT)
+    text = f"```json\n{document}\n```"
+    for size in (1, 2, 3, 7, 64, len(text)):
+        parser = FieldParser()
+        fields = _feed_all(parser, [text[i:i + size] for i in range(0, len(text), size)])
+        assert fields == list(REPORT.items())
+        assert parser.complete
+        assert parser.document == document
+
+
+def test_field_is_reported_only_once_its_value_closes():
+    parser = FieldParser()
+    assert parser.feed('{"scores": {"presence": 7, ') == []
+    assert parser.feed('"skill": 6}') == []
+    assert parser.feed(', "course') == [("scores", {"presence": 7, "skill": 6})]
+    assert parser.feed('_forward": "Rest"}') == [("course_forward", "Rest")]
+
+
+def test_malformed_value_is_skipped():
+    parser = FieldParser()
+    fields = parser.feed('{"psi": 6.9.1, "skill": 6}')
+    assert fields == [("skill", 6)]
+    assert parser.complete
+
+
+def test_incomplete_document():
+    parser = FieldParser()
+    parser.feed('Sure! {"skill": 6, "intent": ')
+    assert not parser.complete
+    assert parser.document == '{"skill": 6, "intent": '
+    assert parser.text.startswith("Sure! ")
+
+
+def test_text_after_the_object_is_ignored():
+    parser = FieldParser()
+    assert parser.feed('{"skill": 6} {"intent": 8}') == [("skill", 6)]
+    assert parser.document == '{"skill": 6}'
@@ -0,0 +1,77 @@
+import threading
+from datetime import datetime, timedelta
+
+import pytest
+
+import models
+import outbox
+
+
+@pytest.fixture
+def pending(db, monkeypatch):
+    """Ids of twelve due messages, claimed five at a time."""
+    monkeypatch.setattr(outbox, "BATCH_SIZE", 5)
+    return [outbox.enqueue(f"player{index}@example.com", "Report", "Body") for index in range(12)]
+
+
+def test_racing_senders_claim_each_message_once(db, pending):
+    barrier = threading.Barrier(3)
+    batches = [[] for _ in range(3)]
+
+    def sender(index):
+        barrier.wait()
+        while batch := outbox._claim_batch():
+            batches[index].append(batch)
+
+    threads = [threading.Thread(target=sender, args=(index,)) for index in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(30)
+
+    claimed = [row.id for sender_batches in batches for batch in sender_batches for row in batch]
+    assert sorted(claimed) == pending
+    for sender_batches in batches:
+        for batch in sender_batches:
+            assert len({row.claim_token for row in batch}) == 1
+    rows = db.query(models.OutboxMessage).all()
+    assert {(row.status, row.attempts) for row in rows} == {(outbox.SENDING, 1)}
+
+
+def test_only_expired_claims_are_recovered(db, pending):
+    live, expired, legacy = outbox._claim_batch()[:3]
+    now = datetime.utcnow()
+    db.query(models.OutboxMessage).filter(models.OutboxMessage.id == expired.id).update(
+        {"claimed_at": now - timedelta(seconds=outbox.LEASE_SECONDS + 1)}
+    )
+    db.query(models.OutboxMessage).filter(models.OutboxMessage.id == legacy.id).update({"claimed_at": None})
+    db.commit()
+
+    assert outbox.recover_expired(db, now) == 2
+    db.commit()
+
+    db.expire_all()
+    statuses = {row.id: row.status for row in db.query(models.OutboxMessage)}
+    assert statuses[live.id] == outbox.SENDING
+    assert statuses[expired.id] == statuses[legacy.id] == outbox.PENDING
+
+
+def test_reclaimed_message_ignores_the_old_sender(db, pending):
+    first = outbox._claim_batch()
+    later = datetime.utcnow() + timedelta(seconds=outbox.LEASE_SECONDS + 1)
+    outbox.recover_expired(db, later)
+    db.commit()
+    second = outbox._claim_batch()
+    assert [row.id for row in second] == [row.id for row in first]
+
+    outbox._mark_sent(first[0])
+    outbox._record_failure(first[1], "late failure")
+    db.expire_all()
+    rows = [db.get(models.OutboxMessage, row.id) for row in second[:2]]
+    assert [(row.status, row.claim_token, row.error) for row in rows] == [
+        (outbox.SENDING, second[0].claim_token, None)
+    ] * 2
+
+    outbox._mark_sent(second[0])
+    db.expire_all()
+    assert db.get(models.OutboxMessage, second[0].id).status == outbox.SENT
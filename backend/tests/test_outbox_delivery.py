@@ -0,0 +1,140 @@
+"""Delivery through the outbox sender against a local aiosmtpd server."""
+import socket
+from datetime import datetime, timedelta
+
+import pytest
+from aiosmtpd.controller import Controller
+
+import models
+import outbox
+
+
+class Handler:
+    """Accepts mail, except for recipients whose local part asks for a rejection."""
+
+    def __init__(self):
+        self.connections = 0
+        self.delivered = []
+
+    async def handle_EHLO(self, server, session, envelope, hostname, responses):
+        self.connections += 1
+        session.host_name = hostname
+        return responses
+
+    async def handle_RCPT(self, server, session, envelope, address, rcpt_options):
+        if address.startswith("unknown"):
+            return "550 5.1.1 No such user"
+        if address.startswith("busy"):
+            return "451 4.3.0 Try again later"
+        envelope.rcpt_tos.append(address)
+        return "250 OK"
+
+    async def handle_DATA(self, server, session, envelope):
+        self.delivered.extend(envelope.rcpt_tos)
+        return "250 OK"
+
+
+def _free_port():
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        return probe.getsockname()[1]
+
+
+@pytest.fixture
+def smtp(db, monkeypatch):
+    handler = Handler()
+    controller = Controller(handler, hostname="127.0.0.1", port=_free_port())
+    controller.start()
+    monkeypatch.setattr(outbox, "SMTP_HOST", "127.0.0.1")
+    monkeypatch.setattr(outbox, "SMTP_PORT", controller.port)
+    monkeypatch.setattr(outbox, "SMTP_SSL", False)
+    monkeypatch.setattr(outbox, "SMTP_STARTTLS", False)
+    monkeypatch.setattr(outbox, "SMTP_USERNAME", None)
+    monkeypatch.setattr(outbox, "SMTP_PASSWORD", None)
+    yield handler
+    controller.stop()
+
+
+def _rows(db):
+    db.expire_all()
+    return {row.recipient: row for row in db.query(models.OutboxMessage)}
+
+
+def _send_due(session):
+    outbox._deliver(session, outbox._claim_batch())
+
+
+def test_batch_is_delivered_over_one_connection(db, smtp):
+    recipients = ["ana@example.com", "ben@example.com", "unknown@example.com", "busy@example.com", "cy@example.com"]
+    for recipient in recipients:
+        outbox.enqueue(recipient, "Your code", "123456")
+
+    session = outbox.SMTPSession()
+    before = datetime.utcnow()
+    _send_due(session)
+    session.close()
+
+    assert smtp.connections == 1
+    assert smtp.delivered == ["ana@example.com", "ben@example.com", "cy@example.com"]
+    rows = _rows(db)
+    assert {recipient: row.status for recipient, row in rows.items()} == {
+        "ana@example.com": outbox.SENT,
+        "ben@example.com": outbox.SENT,
+        "cy@example.com": outbox.SENT,
+        "unknown@example.com": outbox.FAILED,
+        "busy@example.com": outbox.PENDING,
+    }
+    assert "550" in rows["unknown@example.com"].error
+    busy = rows["busy@example.com"]
+    assert busy.claim_token is None and busy.claimed_at is None
+    assert busy.next_attempt_at >= before + timedelta(seconds=outbox.RETRY_BASE_SECONDS)
+
+
+def test_connection_is_reused_until_idle(db, smtp, monkeypatch):
+    session = outbox.SMTPSession()
+    outbox.enqueue("ana@example.com", "First", "1")
+    _send_due(session)
+    session.close_if_idle()
+    outbox.enqueue("ben@example.com", "Second", "2")
+    _send_due(session)
+    assert smtp.connections == 1
+
+    monkeypatch.setattr(outbox, "IDLE_TIMEOUT_SECONDS", 0)
+    session.close_if_idle()
+    outbox.enqueue("cy@example.com", "Third", "3")
+    _send_due(session)
+    session.close()
+    assert smtp.connections == 2
+    assert smtp.delivered == ["ana@example.com", "ben@example.com", "cy@example.com"]
+
+
+def test_temporary_rejections_back_off_exponentially(db, smtp):
+    outbox.enqueue("busy@example.com", "Your code", "123456")
+    session = outbox.SMTPSession()
+    delays = []
+    for _ in range(outbox.MAX_ATTEMPTS):
+        db.query(models.OutboxMessage).update({"next_attempt_at": datetime.utcnow()})
+        db.commit()
+        started = datetime.utcnow()
+        _send_due(session)
+        row = _rows(db)["busy@example.com"]
+        delays.append((row.next_attempt_at - started).total_seconds())
+    session.close()
+
+    assert row.status == outbox.FAILED
+    assert row.attempts == outbox.MAX_ATTEMPTS
+    for attempt, delay in enumerate(delays[:-1]):
+        assert delay == pytest.approx(outbox.RETRY_BASE_SECONDS * 2 ** attempt, abs=1)
+
+
+def test_unreachable_server_requeues_the_whole_batch(db, monkeypatch):
+    monkeypatch.setattr(outbox, "SMTP_HOST", "127.0.0.1")
+    monkeypatch.setattr(outbox, "SMTP_PORT", _free_port())
+    monkeypatch.setattr(outbox, "SMTP_SSL", False)
+    for recipient in ("ana@example.com", "ben@example.com"):
+        outbox.enqueue(recipient, "Your code", "123456")
+
+    _send_due(outbox.SMTPSession())
+    rows = _rows(db).values()
+    assert {(row.status, row.attempts, row.claim_token) for row in rows} == {(outbox.PENDING, 1, None)}
+    assert all(row.error for row in rows)
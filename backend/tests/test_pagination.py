@@ -0,0 +1,157 @@
+from datetime import datetime
+
+import pytest
+from fastapi import HTTPException, Response
+from fastapi.testclient import TestClient
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.schema import CreateIndex
+
+import main
+import models
+import pagination
+import schema
+from database import engine
+from pagination import OptionalPageParams, PageParams
+
+
+def _pages(query, paginate, limit):
+    """Every row of ``query``, fetched one page at a time by following cursors."""
+    rows, cursor = [], None
+    while True:
+        response = Response()
+        page = paginate(query, models.Evaluation, PageParams(limit=limit, cursor=cursor), response)
+        rows.extend(row.id for row in page)
+        cursor = response.headers.get(pagination.NEXT_CURSOR_HEADER)
+        if cursor is None:
+            return rows
+
+
+def test_cursor_round_trip():
+    when = datetime(2024, 5, 1, 9, 30, 15, 123456)
+    assert pagination.decode_date_cursor(pagination.encode_cursor(when, 42)) == (when, 42)
+    assert pagination.decode_date_cursor(pagination.encode_cursor(None, 7)) == (None, 7)
+    assert pagination.decode_id_cursor(pagination.encode_cursor(9)) == 9
+
+
+@pytest.mark.parametrize("cursor", ["***", pagination.encode_cursor(1, 2), pagination.encode_cursor("x", 1), "AAAA"])
+def test_malformed_cursor_is_a_bad_request(cursor):
+    with pytest.raises(HTTPException) as error:
+        pagination.decode_date_cursor(cursor)
+    assert error.value.status_code == 400
+
+
+@pytest.fixture
+def history(db, player):
+    """Evaluations with tied dates and missing dates, keyed by a label."""
+    dates = {
+        "old": datetime(2024, 1, 1),
+        "tie_a": datetime(2024, 2, 1),
+        "tie_b": datetime(2024, 2, 1),
+        "tie_c": datetime(2024, 2, 1),
+        "undated_a": None,
+        "new": datetime(2024, 3, 1),
+        "undated_b": None,
+    }
+    rows = {}
+    for label, date in dates.items():
+        rows[label] = models.Evaluation(player_id=player.id, session_id=label, date=date)
+        db.add(rows[label])
+        db.flush()
+    # The column default fills in a date on insert; clear it for the undated rows.
+    for label in ("undated_a", "undated_b"):
+        rows[label].date = None
+    db.commit()
+    return {label: row.id for label, row in rows.items()}
+
+
+@pytest.mark.parametrize("limit", [1, 2, 3, 7, 50])
+def test_date_pages_cover_ties_and_undated_rows_once(db, history, limit):
+    expected = [history[label] for label in ("new", "tie_c", "tie_b", "tie_a", "old", "undated_b", "undated_a")]
+    query = db.query(models.Evaluation)
+    assert _pages(query, pagination.paginate_by_date, limit) == expected
+
+
+def test_date_page_after_a_tie(db, history):
+    cursor = pagination.encode_cursor(datetime(2024, 2, 1), history["tie_b"])
+    page = pagination.paginate_by_date(
+        db.query(models.Evaluation), models.Evaluation, PageParams(limit=10, cursor=cursor), Response()
+    )
+    assert [row.session_id for row in page] == ["tie_a", "old", "undated_b", "undated_a"]
+
+
+def test_id_pages(db, history):
+    assert _pages(db.query(models.Evaluation), pagination.paginate_by_id, 3) == sorted(history.values())
+
+
+def test_unpaged_list_returns_every_row():
+    params = OptionalPageParams(limit=None, cursor=None)
+    assert params.limit is None
+    assert OptionalPageParams(limit=None, cursor="x").limit == pagination.DEFAULT_PAGE_SIZE
+
+
+def test_id_pages_without_limit(db, history):
+    response = Response()
+    rows = pagination.paginate_by_id(
+        db.query(models.Evaluation), models.Evaluation, OptionalPageParams(limit=None, cursor=None), response
+    )
+    assert [row.id for row in rows] == sorted(history.values())
+    assert pagination.NEXT_CURSOR_HEADER not in response.headers
+
+
+def test_date_list_without_limit(db, history):
+    response = Response()
+    rows = pagination.paginate_by_date(
+        db.query(models.Evaluation), models.Evaluation, OptionalPageParams(limit=None, cursor=None), response
+    )
+    assert [row.session_id for row in rows] == ["new", "tie_c", "tie_b", "tie_a", "old", "undated_b", "undated_a"]
+    assert pagination.NEXT_CURSOR_HEADER not in response.headers
+
+
+def test_list_endpoints_are_unpaged_by_default(db, player, monkeypatch):
+    monkeypatch.setattr(pagination, "DEFAULT_PAGE_SIZE", 2)
+    for index in range(5):
+        db.add(models.Evaluation(player_id=player.id, session_id=f"s{index}"))
+    db.commit()
+    client = TestClient(main.app)
+
+    response = client.get(f"/player/{player.id}/history")
+    assert len(response.json()) == 5
+    assert pagination.NEXT_CURSOR_HEADER not in response.headers
+
+    response = client.get(f"/player/{player.id}/history", params={"limit": 3})
+    assert len(response.json()) == 3
+    response = client.get(
+        f"/player/{player.id}/history", params={"cursor": response.headers[pagination.NEXT_CURSOR_HEADER]}
+    )
+    assert len(response.json()) == 2
+
+    for path in (f"/player/{player.id}/video-analyses", "/video-analysis", "/team-performances"):
+        response = client.get(path, params={"coach_username": "coach"})
+        assert response.status_code == 200, path
+
+
+def test_history_order_is_read_from_the_index(db, history):
+    schema._ensure_indexes()
+    query = (
+        db.query(models.Evaluation.id)
+        .filter(models.Evaluation.player_id == 1)
+        .order_by(models.Evaluation.date.desc().nulls_last(), models.Evaluation.id.desc())
+        .limit(10)
+    )
+    sql = str(query.statement.compile(engine, compile_kwargs={"literal_binds": True}))
+    with engine.connect() as connection:
+        plan = " ".join(str(row[-1]) for row in connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}"))
+    assert "ix_evaluations_player_date" in plan
+    assert "TEMP B-TREE" not in plan
+
+
+def test_postgresql_indexes_match_the_newest_first_order():
+    for table, name in (
+        (models.Evaluation.__table__, "ix_evaluations_player_date_desc"),
+        (models.VideoAnalysis.__table__, "ix_video_analyses_coach_format_date_desc"),
+        (models.VideoAnalysis.__table__, "ix_video_analyses_player_format_date_desc"),
+        (models.VideoAnalysis.__table__, "ix_video_analyses_player_date_desc"),
+    ):
+        (index,) = [index for index in table.indexes if index.name == name]
+        ddl = str(CreateIndex(index).compile(dialect=postgresql.dialect()))
+        assert ddl.endswith("date DESC NULLS LAST, id DESC)")
@@ -0,0 +1,131 @@
+import json
+from types import SimpleNamespace
+
+import pytest
+
+import main
+import models
+import report_store
+
+REPORT = {
+    "scores": {"presence": 7, "skill": 6, "intent": 8, "psi": 6.9},
+    "player_evaluation": "Strong net play; the backhand clear lands short — work on it.",
+    "course_forward": "Deep clears under fatigue",
+    "summary_bullets": ["Quick split step", "Late backhand clears"],
+    "formatted": "rendered on read",
+}
+PARTIAL = {"summary": "Legacy report without scores", "formatted": "Old formatted text"}
+
+
+def test_pack_round_trip_drops_derived_fields():
+    data = report_store.pack(REPORT)
+    assert data[0] == report_store.FORMAT_VERSION
+    expected = {key: value for key, value in REPORT.items() if key != "formatted"}
+    assert report_store.load(data) == expected
+    assert len(data) < len(json.dumps(expected).encode())
+
+
+def test_unknown_format_version():
+    data = report_store.pack(REPORT)
+    with pytest.raises(ValueError):
+        report_store.unpack_json(bytes([99]) + data[1:])
+
+
+def test_load_prefers_compressed_data_over_legacy_json():
+    data = report_store.pack({"course_forward": "new"})
+    assert report_store.load(data, '{"course_forward": "old"}') == {"course_forward": "new"}
+    assert report_store.load(None, '{"course_forward": "old"}') == {"course_forward": "old"}
+    assert report_store.load(None, None) is None
+
+
+@pytest.mark.parametrize("legacy_json", ["{not json", "[1, 2]", "null", '"text"'])
+def test_load_rejects_documents_that_are_not_objects(legacy_json):
+    assert report_store.load(None, legacy_json) is None
+
+
+def test_columns():
+    values = report_store.columns({**REPORT, "degraded": True})
+    assert values["ai_report_json"] is None
+    assert json.loads(values["summary_bullets"]) == REPORT["summary_bullets"]
+    assert values["report_degraded"] is True
+    assert report_store.columns({"summary_bullets": "one"})["summary_bullets"] is None
+
+
+def test_backfill_skips_malformed_rows(db, player):
+    legacy = ['{"course_forward": "Drills"}', "{not json", "[1, 2]", '{"course_forward": "Rest"}']
+    for index, legacy_json in enumerate(legacy):
+        db.add(
+            models.Evaluation(
+                player_id=player.id, session_id=f"s{index}", ai_report_json=legacy_json, ai_feedback="old"
+            )
+        )
+    db.commit()
+
+    last_id = report_store.backfill_batch(models.Evaluation, 0, batch_size=3)
+    assert last_id == 3
+    assert report_store.backfill_batch(models.Evaluation, last_id, batch_size=3) == 4
+    assert report_store.backfill_batch(models.Evaluation, 4, batch_size=3) is None
+
+    db.expire_all()
+    rows = db.query(models.Evaluation).order_by(models.Evaluation.id).all()
+    assert [report_store.load(row.ai_report_data) for row in (rows[0], rows[3])] == [
+        {"course_forward": "Drills"},
+        {"course_forward": "Rest"},
+    ]
+    assert [row.ai_report_json for row in rows] == [None, "{not json", "[1, 2]", None]
+    assert [row.ai_feedback for row in rows] == ["old"] * 4  # none of these can be rendered again
+
+
+def test_backfill_keeps_feedback_for_reports_it_cannot_render(db, player):
+    rows = [
+        models.Evaluation(player_id=player.id, session_id="full", ai_report_json=json.dumps(REPORT), ai_feedback="x"),
+        models.Evaluation(player_id=player.id, session_id="kept", ai_report_json=json.dumps(PARTIAL), ai_feedback="mine"),
+        models.Evaluation(player_id=player.id, session_id="moved", ai_report_json=json.dumps(PARTIAL)),
+    ]
+    db.add_all(rows)
+    db.commit()
+
+    assert report_store.backfill_batch(models.Evaluation) == rows[-1].id
+    db.expire_all()
+    assert [row.ai_feedback for row in rows] == [None, "mine", "Old formatted text"]
+    assert all(row.ai_report_json is None for row in rows)
+
+
+def _history_row(**columns):
+    values = dict(
+        id=1, session_id="s", date=None, pressure_score=None, skill_score=None, intent_score=None,
+        psi_score=None, ai_report_data=None, ai_report_json=None, ai_feedback=None, player="Ana",
+    )
+    values.update(columns)
+    return SimpleNamespace(**values)
+
+
+def test_history_passes_legacy_formatted_reports_through_verbatim():
+    stored = json.dumps(REPORT, indent=1)
+    item = main._history_item_json(_history_row(ai_report_json=stored))
+    assert item.endswith(f'"psi_report": {stored}}}')
+    assert json.loads(item)["ai_feedback"] == "rendered on read"
+
+
+def test_history_renders_compressed_reports():
+    item = json.loads(main._history_item_json(_history_row(ai_report_data=report_store.pack(REPORT))))
+    assert item["ai_feedback"].startswith("Presence Score (P): 7/10")
+    assert item["psi_report"]["formatted"] == item["ai_feedback"]
+
+
+def test_history_falls_back_to_feedback_for_partial_reports():
+    partial = {"summary": "no scores"}
+    item = json.loads(
+        main._history_item_json(_history_row(ai_report_data=report_store.pack(partial), ai_feedback="Stored text"))
+    )
+    assert item["ai_feedback"] == "Stored text"
+    assert item["psi_report"] == {**partial, "formatted": "Stored text"}
+
+    item = json.loads(main._history_item_json(_history_row(ai_report_data=report_store.pack(partial))))
+    assert item["ai_feedback"] is None
+    assert item["psi_report"] == partial
+
+
+def test_history_ignores_malformed_legacy_reports():
+    item = json.loads(main._history_item_json(_history_row(ai_report_json="{not json", ai_feedback="Stored text")))
+    assert (item["ai_feedback"], item["psi_report"]) == ("Stored text", None)
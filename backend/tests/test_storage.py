@@ -0,0 +1,155 @@
+import base64
+import hashlib
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+import models
+import storage
+
+VIDEO = b"\x00\x00\x00\x18ftypmp42" + bytes(range(256)) * 40
+
+
+@pytest.fixture(autouse=True)
+def blob_root(tmp_path, monkeypatch):
+    monkeypatch.setattr(storage, "BLOB_ROOT", tmp_path / "blobs")
+    return tmp_path / "blobs"
+
+
+def _leftovers(blob_root):
+    return list(blob_root.glob(".upload-*"))
+
+
+def test_writer_stores_under_the_content_hash(blob_root):
+    with storage.BlobWriter("video/mp4") as writer:
+        for start in range(0, len(VIDEO), 1000):
+            writer.write(VIDEO[start:start + 1000])
+        writer.write(b"")
+        ref = writer.commit()
+
+    digest = hashlib.sha256(VIDEO).hexdigest()
+    assert ref == f"blob:{digest}.mp4"
+    assert storage.blob_digest(ref) == digest
+    assert storage.blob_path(ref) == blob_root / digest[:2] / f"{digest}.mp4"
+    assert storage.blob_path(ref).read_bytes() == VIDEO
+    assert writer.size == len(VIDEO)
+    assert _leftovers(blob_root) == []
+
+
+def test_identical_uploads_share_one_file(blob_root):
+    refs = []
+    for _ in range(2):
+        with storage.BlobWriter("video/mp4") as writer:
+            writer.write(VIDEO)
+            refs.append(writer.commit())
+    assert refs[0] == refs[1]
+    assert len(list(blob_root.rglob("*.mp4"))) == 1
+    assert _leftovers(blob_root) == []
+
+
+def test_failed_write_leaves_nothing_behind(blob_root):
+    with pytest.raises(RuntimeError):
+        with storage.BlobWriter("video/mp4") as writer:
+            writer.write(VIDEO)
+            raise RuntimeError("client went away")
+    assert list(blob_root.rglob("*")) == []
+
+
+def test_adopt_file_moves_and_deduplicates(tmp_path, blob_root):
+    first, second = tmp_path / "first.part", tmp_path / "second.part"
+    first.write_bytes(VIDEO)
+    second.write_bytes(VIDEO)
+
+    ref = storage.adopt_file(first, "video/quicktime")
+    assert ref == f"blob:{hashlib.sha256(VIDEO).hexdigest()}.mov"
+    assert not first.exists()
+    assert storage.blob_path(ref).read_bytes() == VIDEO
+
+    assert storage.adopt_file(second, "video/quicktime") == ref
+    assert not second.exists()
+
+
+def test_store_data_url_decodes_across_slices(monkeypatch):
+    monkeypatch.setattr(storage, "CHUNK_SIZE", 12)
+    data_url = "data:video/webm;base64," + base64.b64encode(VIDEO).decode()
+    ref = storage.store_data_url(data_url)
+    assert ref.endswith(".webm")
+    assert storage.blob_path(ref).read_bytes() == VIDEO
+
+
+@pytest.mark.parametrize("ref", [None, "", "blob:abc", "blob:" + "0" * 64 + ".toolongext", "/etc/passwd"])
+def test_invalid_refs(ref):
+    assert not storage.is_blob_ref(ref)
+    assert not storage.exists(ref)
+    with pytest.raises(storage.BlobNotFound):
+        storage.blob_path(ref)
+
+
+def test_extension_for():
+    assert storage.extension_for("video/mp4; codecs=avc1") == ".mp4"
+    assert storage.extension_for("application/x-unknown") == ""
+    assert storage.extension_for(None) == ""
+
+
+def _inline_analysis(db, player, video_path):
+    analysis = models.VideoAnalysis(
+        coach_id=player.coach_id,
+        player_id=player.id,
+        session_id="s1",
+        game_format="singles",
+        event_type="drills",
+        player_appearance="Blue shirt",
+        video_path=video_path,
+    )
+    db.add(analysis)
+    db.commit()
+    return analysis.id
+
+
+def _video_path(db, analysis_id):
+    db.expire_all()
+    return db.get(models.VideoAnalysis, analysis_id).video_path
+
+
+def test_backfill_moves_inline_videos(db, player):
+    data_url = "data:video/mp4;base64," + base64.b64encode(VIDEO).decode()
+    stored = _inline_analysis(db, player, "blob:" + "0" * 64)
+    inline = _inline_analysis(db, player, data_url)
+    broken = _inline_analysis(db, player, "data:video/mp4;base64,AAAAA")
+
+    assert storage.backfill_batch(0, batch_size=1) == inline
+    ref = _video_path(db, inline)
+    assert storage.blob_path(ref).read_bytes() == VIDEO
+    assert storage.backfill_batch(inline) == broken
+    assert _video_path(db, broken) == "data:video/mp4;base64,AAAAA"
+    assert storage.backfill_batch(broken) is None
+    assert _video_path(db, stored) == "blob:" + "0" * 64
+
+
+def test_backfill_keeps_a_video_replaced_meanwhile(db, player, monkeypatch):
+    analysis_id = _inline_analysis(db, player, "data:video/mp4;base64," + base64.b64encode(VIDEO).decode())
+    store_data_url = storage.store_data_url
+
+    def replace_during_backfill(data_url):
+        db.get(models.VideoAnalysis, analysis_id).video_path = "blob:" + "1" * 64
+        db.commit()
+        return store_data_url(data_url)
+
+    monkeypatch.setattr(storage, "store_data_url", replace_during_backfill)
+    storage.backfill_batch()
+    assert _video_path(db, analysis_id) == "blob:" + "1" * 64
+
+
+def test_video_endpoint_does_not_migrate_inline_videos(db, player):
+    data_url = "data:video/mp4;base64," + base64.b64encode(VIDEO).decode()
+    analysis_id = _inline_analysis(db, player, data_url)
+    client = TestClient(main.app)
+
+    assert client.get(f"/video-analysis/{analysis_id}/video").status_code == 404
+    assert _video_path(db, analysis_id) == data_url
+
+    storage.backfill_batch()
+    response = client.get(f"/video-analysis/{analysis_id}/video")
+    assert response.status_code == 200
+    assert response.content == VIDEO
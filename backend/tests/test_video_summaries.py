@@ -0,0 +1,42 @@
+from datetime import datetime
+
+from fastapi.testclient import TestClient
+
+import main
+import models
+
+
+def _analysis(player, session_id, date, game_format="singles"):
+    return models.VideoAnalysis(
+        coach_id=player.coach_id,
+        player_id=player.id,
+        session_id=session_id,
+        date=date,
+        game_format=game_format,
+        event_type="drills",
+        player_appearance="Blue shirt",
+        video_path="blob:" + "0" * 64,
+        ai_report_json='{"summary_bullets": ["Quick feet"]}',
+        summary_bullets='["Quick feet"]',
+    )
+
+
+def test_summaries_leave_out_media_and_allow_undated_rows(db, player):
+    dated = _analysis(player, "dated", datetime(2024, 3, 1))
+    undated = _analysis(player, "undated", None)
+    db.add_all([dated, undated])
+    db.flush()
+    undated.date = None  # the column default fills one in on insert
+    db.commit()
+
+    client = TestClient(main.app)
+    for path in ("/video-analysis", f"/player/{player.id}/video-analyses"):
+        response = client.get(path, params={"coach_username": "coach"})
+        assert response.status_code == 200, path
+        items = response.json()
+        assert [(item["session_id"], item["date"]) for item in items] == [
+            ("dated", "2024-03-01T00:00:00"),
+            ("undated", None),
+        ]
+        assert all("video_path" not in item and "ai_report_json" not in item for item in items)
+        assert items[0]["has_report"] and items[0]["summary_bullets"] == ["Quick feet"]
@@ -0,0 +1,51 @@
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+import storage
+
+VIDEO = bytes(range(256)) * 64
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    monkeypatch.setattr(storage, "BLOB_ROOT", tmp_path / "blobs")
+    monkeypatch.setattr(main, "UPLOAD_WRITE_SLICE_BYTES", 4096)
+    return TestClient(main.app)
+
+
+def _chunks(data, size=1000):
+    for start in range(0, len(data), size):
+        yield data[start:start + size]
+
+
+def test_upload_is_stored(client):
+    response = client.post("/video-upload", content=_chunks(VIDEO), headers={"content-type": "video/mp4"})
+    assert response.status_code == 200
+    body = response.json()
+    assert body["size"] == len(VIDEO)
+    assert storage.blob_path(body["video_path"]).read_bytes() == VIDEO
+
+
+def test_oversized_upload_is_rejected(client, tmp_path, monkeypatch):
+    monkeypatch.setattr(main, "MAX_VIDEO_UPLOAD_BYTES", len(VIDEO) - 1)
+    response = client.post("/video-upload", content=_chunks(VIDEO), headers={"content-type": "video/mp4"})
+    assert response.status_code == 413
+    assert list((tmp_path / "blobs").rglob("*")) == []
+
+
+def test_upload_at_the_size_limit_is_accepted(client, monkeypatch):
+    monkeypatch.setattr(main, "MAX_VIDEO_UPLOAD_BYTES", len(VIDEO))
+    response = client.post("/video-upload", content=VIDEO, headers={"content-type": "video/mp4"})
+    assert response.status_code == 200
+
+
+def test_empty_upload_is_rejected(client, tmp_path):
+    response = client.post("/video-upload", content=b"", headers={"content-type": "video/mp4"})
+    assert response.status_code == 400
+    assert list((tmp_path / "blobs").rglob("*")) == []
+
+
+def test_non_video_upload_is_rejected(client):
+    response = client.post("/video-upload", content=VIDEO, headers={"content-type": "image/png"})
+    assert response.status_code == 415
@@ -0,0 +1,225 @@
+"""Resumable, chunked upload sessions persisted on disk.
+
+Each session lives in its own directory under ``MEDIA_ROOT/uploads``::
+
+    <upload_id>/
+        session.json   # declared size, chunk size and content type
+        data.part      # preallocated file; chunks are written at their offsets
+        chunks/<n>     # empty marker written once chunk ``n`` is durable
+
+Chunks never share mutable state, so clients may PUT them in parallel and a
+crashed server resumes from whatever markers exist on disk. Finalizing moves
+``data.part`` into the blob store without copying it.
+"""
+from __future__ import annotations
+
+import json
+import os
+import re
+import shutil
+import time
+import uuid
+from pathlib import Path
+from typing import Any
+
+import storage
+
+UPLOAD_ROOT = storage.MEDIA_ROOT / "uploads"
+DEFAULT_CHUNK_SIZE = int(os.getenv("UPLOAD_CHUNK_SIZE", str(8 * 1024 * 1024)))
+MIN_CHUNK_SIZE = 256 * 1024
+MAX_CHUNK_SIZE = 64 * 1024 * 1024
+SESSION_TTL_SECONDS = int(os.getenv("UPLOAD_SESSION_TTL_SECONDS", str(24 * 60 * 60)))
+
+_UPLOAD_ID_PATTERN = re.compile(r"^[0-9a-f]{32}$")
+
+
+class UploadError(Exception):
+    """Raised when a chunk or session request is invalid."""
+
+
+class UploadNotFound(UploadError):
+    """Raised when an upload session does not exist."""
+
+
+def _session_dir(upload_id: str) -> Path:
+    if not _UPLOAD_ID_PATTERN.match(upload_id or ""):
+        raise UploadNotFound("Upload session not found")
+    return UPLOAD_ROOT / upload_id
+
+
+def _load(upload_id: str) -> tuple[Path, dict[str, Any]]:
+    directory = _session_dir(upload_id)
+    try:
+        session = json.loads((directory / "session.json").read_text())
+    except FileNotFoundError:
+        raise UploadNotFound("Upload session not found") from None
+    return directory, session
+
+
+def _save(directory: Path, session: dict[str, Any]) -> None:
+    temp_path = directory / "session.json.tmp"
+    temp_path.write_text(json.dumps(session))
+    os.replace(temp_path, directory / "session.json")
+
+
+def chunk_count(session: dict[str, Any]) -> int:
+    return max(1, -(-session["size"] // session["chunk_size"]))
+
+
+def chunk_bounds(session: dict[str, Any], index: int) -> tuple[int, int]:
+    """Return the ``[start, end)`` byte range covered by chunk ``index``."""
+    if index < 0 or index >= chunk_count(session):
+        raise UploadError("Chunk index out of range")
+    start = index * session["chunk_size"]
+    return start, min(start + session["chunk_size"], session["size"])
+
+
+def received_chunks(directory: Path) -> list[int]:
+    try:
+        return sorted(int(name) for name in os.listdir(directory / "chunks") if name.isdigit())
+    except FileNotFoundError:
+        return []
+
+
+def received_ranges(session: dict[str, Any], chunks: list[int]) -> list[list[int]]:
+    """Merge received chunk indices into contiguous ``[start, end)`` byte ranges."""
+    ranges: list[list[int]] = []
+    for index in chunks:
+        start, end = chunk_bounds(session, index)
+        if ranges and ranges[-1][1] == start:
+            ranges[-1][1] = end
+        else:
+            ranges.append([start, end])
+    return ranges
+
+
+def create_session(size: int, content_type: str, chunk_size: int | None = None) -> dict[str, Any]:
+    """Create a new session and preallocate its data file."""
+    if size <= 0:
+        raise UploadError("Upload size must be positive")
+    chunk_size = chunk_size or DEFAULT_CHUNK_SIZE
+    if not MIN_CHUNK_SIZE <= chunk_size <= MAX_CHUNK_SIZE:
+        raise UploadError(f"Chunk size must be between {MIN_CHUNK_SIZE} and {MAX_CHUNK_SIZE} bytes")
+
+    purge_stale_sessions()
+
+    upload_id = uuid.uuid4().hex
+    directory = UPLOAD_ROOT / upload_id
+    (directory / "chunks").mkdir(parents=True)
+    with open(directory / "data.part", "wb") as handle:
+        handle.truncate(size)
+
+    session = {
+        "upload_id": upload_id,
+        "size": size,
+        "chunk_size": chunk_size,
+        "content_type": content_type,
+        "created_at": time.time(),
+        "video_path": None,
+    }
+    _save(directory, session)
+    return status(upload_id)
+
+
+def status(upload_id: str) -> dict[str, Any]:
+    directory, session = _load(upload_id)
+    chunks = received_chunks(directory)
+    received = set(chunks)
+    total = chunk_count(session)
+    return {
+        "upload_id": upload_id,
+        "size": session["size"],
+        "chunk_size": session["chunk_size"],
+        "chunk_count": total,
+        "received": received_ranges(session, chunks),
+        "missing_chunks": [index for index in range(total) if index not in received],
+        "video_path": session.get("video_path"),
+    }
+
+
+class ChunkWriter:
+    """Write one chunk in place at its offset inside ``data.part``."""
+
+    def __init__(self, upload_id: str, index: int, offset: int | None = None) -> None:
+        self.directory, self.session = _load(upload_id)
+        if self.session.get("video_path"):
+            raise UploadError("Upload has already been finalized")
+        self.index = index
+        self.start, self.end = chunk_bounds(self.session, index)
+        if offset is not None and offset != self.start:
+            raise UploadError(f"Chunk {index} must start at offset {self.start}")
+        self.position = self.start
+        self._fd = os.open(self.directory / "data.part", os.O_WRONLY)
+
+    def write(self, data: bytes) -> None:
+        if self.position + len(data) > self.end:
+            raise UploadError(f"Chunk {self.index} exceeds {self.end - self.start} bytes")
+        view = memoryview(data)
+        while view:
+            written = os.pwrite(self._fd, view, self.position)
+            self.position += written
+            view = view[written:]
+
+    def commit(self) -> None:
+        """Flush the chunk and record it as received."""
+        try:
+            if self.position != self.end:
+                raise UploadError(
+                    f"Chunk {self.index} is incomplete: expected {self.end - self.start} bytes, "
+                    f"got {self.position - self.start}"
+                )
+            os.fsync(self._fd)
+        finally:
+            os.close(self._fd)
+        (self.directory / "chunks" / str(self.index)).touch()
+
+    def abort(self) -> None:
+        try:
+            os.close(self._fd)
+        except OSError:
+            pass
+
+
+def finalize(upload_id: str) -> str:
+    """Move a complete upload into the blob store and return its reference.
+
+    Safe to call repeatedly: the blob reference is recorded in the session so a
+    retried request does not need the data file again.
+    """
+    directory, session = _load(upload_id)
+    if session.get("video_path"):
+        return session["video_path"]
+
+    missing = status(upload_id)["missing_chunks"]
+    if missing:
+        raise UploadError(f"Upload is missing {len(missing)} chunk(s)")
+
+    ref = storage.adopt_file(directory / "data.part", session["content_type"])
+    session["video_path"] = ref
+    _save(directory, session)
+    return ref
+
+
+def discard(upload_id: str) -> None:
+    directory = _session_dir(upload_id)
+    if not directory.is_dir():
+        raise UploadNotFound("Upload session not found")
+    shutil.rmtree(directory, ignore_errors=True)
+
+
+def purge_stale_sessions() -> None:
+    """Drop sessions that have not been touched within the TTL."""
+    if not UPLOAD_ROOT.exists():
+        return
+    cutoff = time.time() - SESSION_TTL_SECONDS
+    for directory in UPLOAD_ROOT.iterdir():
+        try:
+            if directory.is_dir() and (directory / "session.json").stat().st_mtime < cutoff:
+                last_chunk = max(
+                    (entry.stat().st_mtime for entry in (directory / "chunks").iterdir()),
+                    default=0,
+                )
+                if last_chunk < cutoff:
+                    shutil.rmtree(directory, ignore_errors=True)
+        except FileNotFoundError:
+            continue
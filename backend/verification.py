@@ -1,19 +1,13 @@
 """Verification code generation and validation."""
-import os
 import random
-import smtplib
 import string
-from datetime import datetime, timedelta
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
-from typing import Dict, Optional
-
 from dotenv import load_dotenv
 
+import code_store
+import outbox
+
 load_dotenv()
 
-# In-memory storage for verification codes (in production, use Redis or database)
-verification_store: Dict[str, Dict[str, any]] = {}
 
 def generate_verification_code() -> str:
     """Generate a 6-character alphanumeric code with 3 letters and 3 numbers."""
@@ -27,40 +21,15 @@ def generate_verification_code() -> str:
     return ''.join(chars)
 
 def store_verification_code(contact: str, code: str, verification_type: str) -> None:
-    """Store verification code with expiry time (10 minutes)."""
-    verification_store[contact] = {
-        'code': code,
-        'type': verification_type,
-        'expires_at': datetime.utcnow() + timedelta(minutes=10),
-        'attempts': 0
-    }
-
-def verify_code(contact: str, code: str) -> bool:
-    """Verify the provided code against stored code."""
-    stored = verification_store.get(contact)
-
-    if not stored:
-        return False
-
-    # Check expiry
-    if datetime.utcnow() > stored['expires_at']:
-        del verification_store[contact]
-        return False
-
-    # Check attempts (max 5)
-    if stored['attempts'] >= 5:
-        del verification_store[contact]
-        return False
+    """Store verification code with expiry time (10 minutes by default).
 
-    # Increment attempts
-    stored['attempts'] += 1
+    Raises ``code_store.RateLimited`` when the contact has requested too many codes.
+    """
+    code_store.store.put(contact, code, verification_type)
 
-    # Check code (case-insensitive)
-    if stored['code'].upper() == code.upper():
-        del verification_store[contact]  # Remove after successful verification
-        return True
-
-    return False
+def verify_code(contact: str, code: str) -> bool:
+    """Verify the provided code against stored code (case-insensitive, single use)."""
+    return code_store.store.check(contact, code)
 
 # Email-to-SMS gateways for major carriers
 CARRIER_GATEWAYS = {
@@ -74,21 +43,8 @@ CARRIER_GATEWAYS = {
 }
 
 def send_email_verification(email: str, code: str) -> bool:
-    """Send verification code via email using Gmail SMTP."""
-    gmail_email = os.getenv('GMAIL_EMAIL')
-    gmail_password = os.getenv('GMAIL_APP_PASSWORD')
-
-    if not gmail_email or not gmail_password:
-        print(f"[EMAIL] Gmail credentials not configured. Code: {code}")
-        return True  # Return True for development
-
+    """Queue a verification code email; the outbox sender delivers it."""
     try:
-        # Create message
-        msg = MIMEMultipart('alternative')
-        msg['Subject'] = 'NextShot AI - Email Verification Code'
-        msg['From'] = gmail_email
-        msg['To'] = email
-
         # HTML email body
         html = f"""
         <html>
@@ -121,32 +77,16 @@ def send_email_verification(email: str, code: str) -> bool:
         If you didn't request this code, please ignore this email.
         """
 
-        part1 = MIMEText(text, 'plain')
-        part2 = MIMEText(html, 'html')
-        msg.attach(part1)
-        msg.attach(part2)
-
-        # Send via Gmail SMTP
-        with smtplib.SMTP_SSL('smtp.gmail.com', 465) as server:
-            server.login(gmail_email, gmail_password)
-            server.send_message(msg)
-
-        print(f"[EMAIL] Successfully sent verification code to {email}")
+        outbox.enqueue(email, 'NextShot AI - Email Verification Code', text, html)
+        print(f"[EMAIL] Queued verification code for {email}")
         return True
 
     except Exception as e:
-        print(f"[EMAIL ERROR] Failed to send email: {str(e)}")
+        print(f"[EMAIL ERROR] Failed to queue email: {str(e)}")
         return False
 
 def send_sms_verification(phone: str, code: str, carrier: str = 'verizon') -> bool:
-    """Send verification code via SMS using email-to-SMS gateway (FREE)."""
-    gmail_email = os.getenv('GMAIL_EMAIL')
-    gmail_password = os.getenv('GMAIL_APP_PASSWORD')
-
-    if not gmail_email or not gmail_password:
-        print(f"[SMS] Gmail credentials not configured. Code: {code}")
-        return True  # Return True for development
-
+    """Queue a verification code SMS for an email-to-SMS gateway (FREE)."""
     # Get carrier gateway
     gateway = CARRIER_GATEWAYS.get(carrier.lower())
     if not gateway:
@@ -157,20 +97,11 @@ def send_sms_verification(phone: str, code: str, carrier: str = 'verizon') -> bo
     sms_email = f"{phone}@{gateway}"
 
     try:
-        # Create simple text message (SMS only supports plain text)
-        msg = MIMEText(f"NextShot AI verification code: {code}\n\nExpires in 10 minutes.")
-        msg['Subject'] = 'Verification Code'
-        msg['From'] = gmail_email
-        msg['To'] = sms_email
-
-        # Send via Gmail SMTP
-        with smtplib.SMTP_SSL('smtp.gmail.com', 465) as server:
-            server.login(gmail_email, gmail_password)
-            server.send_message(msg)
-
-        print(f"[SMS] Successfully sent verification code to {phone} via {carrier}")
+        # Simple text message (SMS only supports plain text)
+        outbox.enqueue(sms_email, 'Verification Code', f"NextShot AI verification code: {code}\n\nExpires in 10 minutes.")
+        print(f"[SMS] Queued verification code for {phone} via {carrier}")
         return True
 
     except Exception as e:
-        print(f"[SMS ERROR] Failed to send SMS: {str(e)}")
+        print(f"[SMS ERROR] Failed to queue SMS: {str(e)}")
         return False
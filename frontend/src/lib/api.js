@@ -16,3 +16,135 @@ export async function login(payload) {
     return { ok: false, error: error.message || 'Network error' }
   }
 }
+
+const UPLOAD_PARALLELISM = 3
+const UPLOAD_RETRIES = 4
+
+async function readJson(res, fallbackError) {
+  const data = await res.json().catch(() => ({}))
+  if (!res.ok) {
+    throw new Error(data.detail || fallbackError)
+  }
+  return data
+}
+
+async function putChunk(uploadId, index, blob) {
+  for (let attempt = 0; ; attempt += 1) {
+    try {
+      const res = await fetch(`${API_URL}/uploads/${uploadId}/chunks/${index}`, {
+        method: 'PUT',
+        body: blob
+      })
+      return await readJson(res, `Failed to upload chunk ${index}`)
+    } catch (error) {
+      if (attempt >= UPLOAD_RETRIES) throw error
+      await new Promise((resolve) => setTimeout(resolve, 500 * 2 ** attempt))
+    }
+  }
+}
+
+// Upload a large video in resumable chunks, then create its video analysis.
+// Passing an existing uploadId resumes an interrupted upload.
+export async function uploadVideoAnalysis(file, analysis, { uploadId, onProgress } = {}) {
+  let session
+  if (uploadId) {
+    session = await readJson(await fetch(`${API_URL}/uploads/${uploadId}`), 'Upload session not found')
+  } else {
+    const res = await fetch(`${API_URL}/uploads`, {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json' },
+      body: JSON.stringify({ size: file.size, content_type: file.type })
+    })
+    session = await readJson(res, 'Failed to start upload')
+  }
+
+  const pending = [...session.missing_chunks]
+  let completed = session.chunk_count - pending.length
+  onProgress?.({ uploadId: session.upload_id, completed, total: session.chunk_count })
+
+  const worker = async () => {
+    while (pending.length) {
+      const index = pending.shift()
+      const start = index * session.chunk_size
+      await putChunk(session.upload_id, index, file.slice(start, start + session.chunk_size))
+      completed += 1
+      onProgress?.({ uploadId: session.upload_id, completed, total: session.chunk_count })
+    }
+  }
+  await Promise.all(Array.from({ length: UPLOAD_PARALLELISM }, worker))
+
+  const res = await fetch(`${API_URL}/uploads/${session.upload_id}/finalize`, {
+    method: 'POST',
+    headers: { 'Content-Type': 'application/json' },
+    body: JSON.stringify(analysis)
+  })
+  return readJson(res, 'Failed to submit video analysis')
+}
+
+// Read a Server-Sent Events response body, calling onEvent(event, data) for each frame.
+async function readEventStream(res, onEvent) {
+  const reader = res.body.pipeThrough(new TextDecoderStream()).getReader()
+  let buffer = ''
+  for (;;) {
+    const { value, done } = await reader.read()
+    if (done) return
+    buffer += value
+    let boundary
+    while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+      const frame = buffer.slice(0, boundary)
+      buffer = buffer.slice(boundary + 2)
+      let event = 'message'
+      const data = []
+      for (const line of frame.split('\n')) {
+        if (line.startsWith('event:')) event = line.slice(6).trim()
+        else if (line.startsWith('data:')) data.push(line.slice(5).trimStart())
+      }
+      if (data.length) onEvent(event, JSON.parse(data.join('\n')))
+    }
+  }
+}
+
+// Submit an evaluation and stream its PSI report. onField(name, value) gets each
+// report field as the AI writes it; resolves with the saved evaluation.
+export async function submitEvaluationStream(payload, { onField } = {}) {
+  const res = await fetch(`${API_URL}/submit-evaluation/stream`, {
+    method: 'POST',
+    headers: { 'Content-Type': 'application/json' },
+    body: JSON.stringify(payload)
+  })
+  if (!res.ok) await readJson(res, 'Error submitting report.')
+
+  let result = null
+  await readEventStream(res, (event, data) => {
+    if (event === 'field') onField?.(data.name, data.value)
+    else if (event === 'report') result = data
+    else if (event === 'error') throw new Error(data.detail || 'Error submitting report.')
+  })
+  if (!result) throw new Error('Error: the report stream ended early.')
+  return result
+}
+
+// Lists return everything unless a limit is passed, so the client asks for pages.
+const PAGE_SIZE = 50
+
+// Fetch one page of a cursor-paginated list. `cursor` is null on the last page.
+export async function fetchPage(path, { cursor, limit = PAGE_SIZE, errorMessage = 'Request failed' } = {}) {
+  const url = new URL(`${API_URL}${path}`)
+  if (!url.searchParams.has('limit')) url.searchParams.set('limit', limit)
+  if (cursor) url.searchParams.set('cursor', cursor)
+  const res = await fetch(url)
+  const items = await readJson(res, errorMessage)
+  return { items, cursor: res.headers.get('X-Next-Cursor') }
+}
+
+// Follow cursors until the whole list has been read; for small lists like a roster.
+export async function fetchAllPages(path, options = {}) {
+  const all = []
+  let cursor = null
+  do {
+    const page = await fetchPage(path, { ...options, cursor })
+    all.push(...page.items)
+    cursor = page.cursor
+  } while (cursor)
+  return all
+}
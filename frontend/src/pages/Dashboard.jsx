@@ -1,7 +1,8 @@
-import { useState, useEffect, useCallback } from 'react'
+import { useState, useEffect, useCallback, useRef } from 'react'
 import { useNavigate } from 'react-router-dom'
 import { ChevronDown } from 'lucide-react'
 import AppShell from '../components/AppShell'
+import { fetchAllPages, submitEvaluationStream, uploadVideoAnalysis } from '../lib/api'
 
 const API_URL = 'http://127.0.0.1:8000'
 const LEVEL_OPTIONS = ['beginner', 'intermediate', 'advanced']
@@ -11,6 +12,36 @@ const inputBaseClasses =
 const shortTextareaClasses = `${inputBaseClasses} h-24 resize-none overflow-y-auto`
 const longTextareaClasses = `${inputBaseClasses} h-36 resize-none overflow-y-auto`
 
+// The PSI report as it streams in; sections appear as their fields complete
+function LiveReportPreview({ report }) {
+  const { scores, player_evaluation: evaluation, summary_bullets: bullets } = report
+  return (
+    <div className="space-y-3 rounded-md border border-white/10 bg-bg/60 p-4 text-sm" aria-live="polite">
+      {scores ? (
+        <div className="flex flex-wrap gap-4">
+          <span>Presence {scores.presence}/10</span>
+          <span>Skill {scores.skill}/10</span>
+          <span>Intent {scores.intent}/10</span>
+          {scores.psi != null && <span className="font-semibold text-accent">PSI {scores.psi}/10</span>}
+        </div>
+      ) : (
+        <p className="text-muted">AI is scoring the session...</p>
+      )}
+      {evaluation && <p className="text-text">{evaluation}</p>}
+      {bullets?.length > 0 && (
+        <ul className="list-disc space-y-1 pl-5 text-muted">
+          {bullets.map((bullet, index) => (
+            <li key={index}>{bullet}</li>
+          ))}
+        </ul>
+      )}
+      {report.degraded && (
+        <p className="text-red-400">AI was unavailable; scores come from your notes. Regenerate the report later.</p>
+      )}
+    </div>
+  )
+}
+
 function Dashboard() {
   const navigate = useNavigate()
   const [players, setPlayers] = useState([])
@@ -41,8 +72,10 @@ function Dashboard() {
   const [historyName, setHistoryName] = useState('')
   const [history, setHistory] = useState([])
   const [isLoadingHistory, setIsLoadingHistory] = useState(false)
-  const [profilePicture, setProfilePicture] = useState('')
+  const [profilePicture, setProfilePicture] = useState({})
   const [lastSubmittedReport, setLastSubmittedReport] = useState(null)
+  // Report fields shown as the AI writes them, before the report is saved
+  const [liveReport, setLiveReport] = useState(null)
 
   // Video Analysis State
   const [videoForm, setVideoForm] = useState({
@@ -58,35 +91,37 @@ function Dashboard() {
   })
   const [videoMessage, setVideoMessage] = useState('')
   const [isSubmittingVideo, setIsSubmittingVideo] = useState(false)
+  // Remembers an interrupted upload so resubmitting the same file resumes it
+  const pendingUpload = useRef({ file: null, uploadId: null })
 
   const loadPlayers = useCallback(async () => {
     const coachUsername = localStorage.getItem('coach')
     if (!coachUsername) return
 
-    const res = await fetch(`${API_URL}/players?coach_username=${coachUsername}`)
-    const data = await res.json()
+    const data = await fetchAllPages(`/players?coach_username=${coachUsername}&limit=200`)
     setPlayers(data)
   }, [])
 
-  const loadCoachProfile = useCallback(async () => {
+  // Profile and roster arrive together so first paint needs one round trip
+  const loadBootstrap = useCallback(async () => {
     const coachUsername = localStorage.getItem('coach')
     if (!coachUsername) return
 
     try {
-      const res = await fetch(`${API_URL}/coach/${coachUsername}`)
+      const res = await fetch(`${API_URL}/coach/${coachUsername}/bootstrap`)
       if (res.ok) {
         const data = await res.json()
-        setProfilePicture(data.profile_picture || '')
+        setPlayers(data.players)
+        setProfilePicture(data.coach.profile_picture_urls || {})
       }
     } catch (error) {
-      console.error('Failed to load coach profile:', error)
+      console.error('Failed to load dashboard:', error)
     }
   }, [])
 
   useEffect(() => {
-    loadPlayers()
-    loadCoachProfile()
-  }, [loadPlayers, loadCoachProfile])
+    loadBootstrap()
+  }, [loadBootstrap])
 
   const handleAddStudent = async (e) => {
     e.preventDefault()
@@ -162,9 +197,9 @@ function Dashboard() {
         setVideoMessage('Please select a video file')
         return
       }
-      // Check file size (max 100MB for videos)
-      if (file.size > 100 * 1024 * 1024) {
-        setVideoMessage('Video file must be less than 100MB')
+      // Check file size (max 2GB for videos; large files upload in resumable chunks)
+      if (file.size > 2 * 1024 * 1024 * 1024) {
+        setVideoMessage('Video file must be less than 2GB')
         return
       }
       setVideoForm({ ...videoForm, videoFile: file })
@@ -172,6 +207,36 @@ function Dashboard() {
     }
   }
 
+  // Follow the background analysis over Server-Sent Events until it finishes
+  const followVideoAnalysis = (videoAnalysisId) => {
+    const labels = {
+      queued: 'AI analysis queued...',
+      uploading: 'Sending video to AI...',
+      processing: 'AI is analysing the video...'
+    }
+    const source = new EventSource(`${API_URL}/video-analysis/${videoAnalysisId}/events`)
+    source.addEventListener('status', (event) => {
+      const job = JSON.parse(event.data)
+      if (job.status === 'done') {
+        setVideoMessage('Video analysis completed successfully')
+      } else if (job.status === 'degraded') {
+        setVideoMessage('Video saved, but AI analysis is unavailable right now. Request a new analysis from Student Reports later.')
+      } else if (job.status === 'failed') {
+        setVideoMessage(job.error ? `AI analysis failed: ${job.error}` : 'AI analysis failed')
+      } else {
+        setVideoMessage(`Video uploaded successfully. ${labels[job.status] || ''}`)
+        return
+      }
+      source.close()
+    })
+    source.addEventListener('field', (event) => {
+      const { name, value } = JSON.parse(event.data)
+      if (name === 'scores' && value?.psi != null) {
+        setVideoMessage(`Video uploaded successfully. PSI ${value.psi}/10, AI is writing the full report...`)
+      }
+    })
+  }
+
   const submitVideoAnalysis = async (e) => {
     e.preventDefault()
     setIsSubmittingVideo(true)
@@ -185,16 +250,9 @@ function Dashboard() {
     }
 
     try {
-      // For now, we'll store video as base64 in video_path
-      // In production, this would upload to a storage service
-      let videoPath = ''
-      if (videoForm.videoFile) {
-        const reader = new FileReader()
-        videoPath = await new Promise((resolve, reject) => {
-          reader.onloadend = () => resolve(reader.result)
-          reader.onerror = reject
-          reader.readAsDataURL(videoForm.videoFile)
-        })
+      if (!videoForm.videoFile) {
+        setVideoMessage('Please select a video file')
+        return
       }
 
       const payload = {
@@ -206,37 +264,43 @@ function Dashboard() {
         player_id: parseInt(videoForm.playerId),
         player_appearance: videoForm.playerAppearance,
         partner_id: videoForm.gameFormat === 'doubles' ? parseInt(videoForm.partnerId) : null,
-        partner_appearance: videoForm.gameFormat === 'doubles' ? videoForm.partnerAppearance : null,
-        video_path: videoPath
+        partner_appearance: videoForm.gameFormat === 'doubles' ? videoForm.partnerAppearance : null
       }
 
-      const res = await fetch(`${API_URL}/video-analysis`, {
-        method: 'POST',
-        headers: { 'Content-Type': 'application/json' },
-        body: JSON.stringify(payload)
-      })
-
-      const data = await res.json()
-      if (!res.ok) {
-        setVideoMessage(data.detail || 'Failed to submit video analysis')
-      } else {
-        setVideoMessage('Video analysis submitted successfully')
-        // Reset form
-        setVideoForm({
-          sessionId: '',
-          gameFormat: '',
-          eventType: '',
-          eventTypeDescription: '',
-          playerId: '',
-          playerAppearance: '',
-          partnerId: '',
-          partnerAppearance: '',
-          videoFile: null
+      const file = videoForm.videoFile
+      const resumeId = pendingUpload.current.file === file ? pendingUpload.current.uploadId : undefined
+      let result
+      try {
+        result = await uploadVideoAnalysis(file, payload, {
+          uploadId: resumeId,
+          onProgress: ({ uploadId, completed, total }) => {
+            pendingUpload.current = { file, uploadId }
+            setVideoMessage(`Uploading video... ${Math.round((completed / total) * 100)}%`)
+          }
         })
-        // Reset file input
-        const fileInput = document.getElementById('videoFile')
-        if (fileInput) fileInput.value = ''
+      } catch (error) {
+        setVideoMessage(`${error.message || 'Upload interrupted'}. Submit again to resume.`)
+        return
       }
+      pendingUpload.current = { file: null, uploadId: null }
+
+      setVideoMessage('Video uploaded successfully. AI analysis queued...')
+      followVideoAnalysis(result.video_analysis_id)
+      // Reset form
+      setVideoForm({
+        sessionId: '',
+        gameFormat: '',
+        eventType: '',
+        eventTypeDescription: '',
+        playerId: '',
+        playerAppearance: '',
+        partnerId: '',
+        partnerAppearance: '',
+        videoFile: null
+      })
+      // Reset file input
+      const fileInput = document.getElementById('videoFile')
+      if (fileInput) fileInput.value = ''
     } catch (error) {
       setVideoMessage(error.message || 'Failed to submit video analysis')
     } finally {
@@ -278,42 +342,38 @@ function Dashboard() {
       strengths: rest.strengths,
       comments: rest.comments
     }
+    setLiveReport({})
     try {
-      const res = await fetch(`${API_URL}/submit-evaluation`, {
-        method: 'POST',
-        headers: { 'Content-Type': 'application/json' },
-        body: JSON.stringify(payload)
+      const data = await submitEvaluationStream(payload, {
+        onField: (name, value) => setLiveReport((current) => ({ ...current, [name]: value }))
       })
-      const data = await res.json()
-      if (res.ok) {
-        setMessage('Report submitted.')
-        // Save the last submitted report info for View Report button
-        setLastSubmittedReport({
-          studentName: reportForm.studentName,
-          playerId: player.id,
-          evaluationId: data.evaluation_id
-        })
-        setReportForm({
-          studentName: '',
-          session_id: '',
-          date: '',
-          front_court: '',
-          back_court: '',
-          attack: '',
-          defense: '',
-          strokeplay: '',
-          footwork: '',
-          presence: '',
-          intent: '',
-          improvements: '',
-          strengths: '',
-          comments: ''
-        })
-      } else {
-        setMessage(data.detail || 'Error submitting report.')
-      }
-    } catch {
-      setMessage('Server error.')
+      setLiveReport(data.psi_report)
+      setMessage('Report submitted.')
+      // Save the last submitted report info for View Report button
+      setLastSubmittedReport({
+        studentName: reportForm.studentName,
+        playerId: player.id,
+        evaluationId: data.evaluation_id
+      })
+      setReportForm({
+        studentName: '',
+        session_id: '',
+        date: '',
+        front_court: '',
+        back_court: '',
+        attack: '',
+        defense: '',
+        strokeplay: '',
+        footwork: '',
+        presence: '',
+        intent: '',
+        improvements: '',
+        strengths: '',
+        comments: ''
+      })
+    } catch (error) {
+      setLiveReport(null)
+      setMessage(error.message || 'Server error.')
     } finally {
       setIsSubmittingReport(false)
     }
@@ -349,9 +409,10 @@ function Dashboard() {
     <AppShell showProtectedNav>
       <div className="space-y-10">
         <div className="flex items-center gap-4">
-          {profilePicture && (
+          {profilePicture['64'] && (
             <img
-              src={profilePicture}
+              src={`${API_URL}${profilePicture['64']}`}
+              srcSet={`${API_URL}${profilePicture['64']} 1x, ${API_URL}${profilePicture['256']} 2x`}
               alt="Profile"
               className="h-16 w-16 rounded-full object-cover border-2 border-accent"
             />
@@ -632,7 +693,7 @@ function Dashboard() {
 
             <div className="space-y-2">
               <label htmlFor="videoFile" className="text-sm font-medium text-muted">
-                Upload Video (Max 100MB)
+                Upload Video (Max 2GB)
               </label>
               <input
                 id="videoFile"
@@ -655,7 +716,7 @@ function Dashboard() {
             {videoMessage && (
               <p
                 className={`text-sm ${
-                  videoMessage.includes('success') ? 'text-accent' : 'text-red-400'
+                  videoMessage.includes('success') || videoMessage.startsWith('Uploading') ? 'text-accent' : 'text-red-400'
                 }`}
                 role="status"
               >
@@ -910,6 +971,8 @@ function Dashboard() {
                 </p>
               )}
             </div>
+
+            {liveReport && <LiveReportPreview report={liveReport} />}
           </form>
         </section>
 
@@ -42,7 +42,6 @@ export default function Settings() {
   // Profile Picture
   const [profilePicture, setProfilePicture] = useState(null)
   const [profilePicturePreview, setProfilePicturePreview] = useState(null)
-  const [initialProfilePicture, setInitialProfilePicture] = useState(null)
   const [isSavingPicture, setIsSavingPicture] = useState(false)
   const [pictureMessage, setPictureMessage] = useState('')
 
@@ -105,10 +104,8 @@ export default function Settings() {
           localStorage.setItem('coach', data.username)
         }
         setAiInstructions(data.ai_instructions || '')
-        const savedPicture = data.profile_picture || ''
-        setProfilePicture(savedPicture)
-        setProfilePicturePreview(savedPicture)
-        setInitialProfilePicture(savedPicture)
+        setProfilePicture(null)
+        setProfilePicturePreview(data.profile_picture_url ? `${API_URL}${data.profile_picture_url}` : null)
       }
     } catch (error) {
       console.error('Failed to load user data:', error)
@@ -118,9 +115,9 @@ export default function Settings() {
   const handleProfilePictureChange = (e) => {
     const file = e.target.files[0]
     if (file) {
-      // Check file size (max 2MB)
-      if (file.size > 2 * 1024 * 1024) {
-        setPictureMessage('File size must be less than 2MB')
+      // Check file size (max 10MB); the server resizes it to thumbnails
+      if (file.size > 10 * 1024 * 1024) {
+        setPictureMessage('File size must be less than 10MB')
         return
       }
 
@@ -130,17 +127,12 @@ export default function Settings() {
         return
       }
 
-      const reader = new FileReader()
-      reader.onloadend = () => {
-        const base64String = reader.result
-        setProfilePicture(base64String)
-        setProfilePicturePreview(base64String)
-        setPictureMessage('')
+      if (profilePicturePreview?.startsWith('blob:')) {
+        URL.revokeObjectURL(profilePicturePreview)
       }
-      reader.onerror = () => {
-        setPictureMessage('Error reading file')
-      }
-      reader.readAsDataURL(file)
+      setProfilePicture(file)
+      setProfilePicturePreview(URL.createObjectURL(file))
+      setPictureMessage('')
     }
   }
 
@@ -149,14 +141,19 @@ export default function Settings() {
     setPictureMessage('')
 
     try {
-      const res = await fetch(`${API_URL}/coach/${coachUsername}/update`, {
+      const res = await fetch(`${API_URL}/coach/${coachUsername}/profile-picture`, {
         method: 'PUT',
-        headers: { 'Content-Type': 'application/json' },
-        body: JSON.stringify({ profile_picture: profilePicture || '' })
+        headers: { 'Content-Type': profilePicture.type },
+        body: profilePicture
       })
 
       if (res.ok) {
-        setInitialProfilePicture(profilePicture)
+        const data = await res.json()
+        if (profilePicturePreview?.startsWith('blob:')) {
+          URL.revokeObjectURL(profilePicturePreview)
+        }
+        setProfilePicture(null)
+        setProfilePicturePreview(`${API_URL}${data.profile_picture_url}`)
         setPictureMessage('Profile picture saved successfully')
       } else {
         const errorData = await res.json().catch(() => ({}))
@@ -494,13 +491,13 @@ export default function Settings() {
                 </label>
                 <button
                   onClick={saveProfilePicture}
-                  disabled={isSavingPicture || profilePicture === initialProfilePicture}
+                  disabled={isSavingPicture || !profilePicture}
                   className="rounded-hero bg-accent px-4 py-2 font-medium text-bg transition-colors hover:bg-accent/90 disabled:opacity-50 disabled:cursor-not-allowed"
                 >
                   {isSavingPicture ? 'Saving...' : 'Save Picture'}
                 </button>
               </div>
-              <p className="text-xs text-muted">JPG, PNG or GIF (max. 2MB)</p>
+              <p className="text-xs text-muted">JPG, PNG, GIF or WebP (max. 10MB)</p>
               {pictureMessage && (
                 <p className={`text-sm ${pictureMessage.toLowerCase().includes('error') || pictureMessage.toLowerCase().includes('failed') ? 'text-red-400' : 'text-accent'}`}>
                   {pictureMessage}
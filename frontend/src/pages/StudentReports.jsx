@@ -1,6 +1,7 @@
 import { useEffect, useMemo, useState } from 'react'
 import { useLocation } from 'react-router-dom'
 import AppShell from '../components/AppShell'
+import { fetchAllPages, fetchPage } from '../lib/api'
 
 const API_URL = 'http://127.0.0.1:8000'
 
@@ -31,8 +32,112 @@ function ScoreBadge({ label, value, type }) {
   )
 }
 
+// Full video reports are large, so list endpoints only return summaries and
+// each card fetches its report when the coach expands it.
+function useVideoReport(analysisId) {
+  const [report, setReport] = useState(null)
+  const [isLoading, setIsLoading] = useState(false)
+  const [loadError, setLoadError] = useState('')
+
+  const loadReport = async () => {
+    setIsLoading(true)
+    setLoadError('')
+    try {
+      const response = await fetch(`${API_URL}/video-analysis/${analysisId}/report`)
+      if (!response.ok) {
+        throw new Error('Unable to load analysis')
+      }
+      setReport(await response.json())
+    } catch (err) {
+      setLoadError(err.message || 'Failed to fetch analysis')
+    } finally {
+      setIsLoading(false)
+    }
+  }
+
+  return { report, isLoading, loadError, loadReport }
+}
+
+function ShowReportButton({ isLoading, loadError, onClick }) {
+  return (
+    <div className="space-y-2 text-sm text-muted">
+      <button
+        type="button"
+        onClick={onClick}
+        disabled={isLoading}
+        className="rounded-md border border-white/10 px-3 py-1.5 text-xs font-medium text-text hover:border-accent disabled:opacity-60"
+      >
+        {isLoading ? 'Loading analysis...' : 'View full analysis'}
+      </button>
+      {loadError && <p className="text-red-400">{loadError}</p>}
+    </div>
+  )
+}
+
+// Degraded analyses were stored while the AI service was down and carry no scores.
+function DegradedNotice({ analysisId }) {
+  const [state, setState] = useState('idle')
+
+  const requestAnalysis = async () => {
+    setState('sending')
+    try {
+      const res = await fetch(`${API_URL}/video-analysis/${analysisId}/reanalyze`, { method: 'POST' })
+      setState(res.ok || res.status === 409 ? 'queued' : 'error')
+    } catch (error) {
+      console.error('Failed to queue analysis:', error)
+      setState('error')
+    }
+  }
+
+  return (
+    <div className="space-y-2 rounded-md border border-amber-500/40 bg-amber-500/10 p-3 text-sm text-amber-200">
+      <p>AI analysis was unavailable for this video, so no scores were recorded.</p>
+      {state === 'queued' ? (
+        <p className="text-xs">New analysis queued. Check back in a few minutes.</p>
+      ) : (
+        <button
+          type="button"
+          onClick={requestAnalysis}
+          disabled={state === 'sending'}
+          className="rounded-md border border-white/10 px-3 py-1.5 text-xs font-medium text-text hover:border-accent disabled:opacity-60"
+        >
+          {state === 'sending' ? 'Queuing...' : 'Request new analysis'}
+        </button>
+      )}
+      {state === 'error' && <p className="text-xs text-red-400">Could not queue the analysis. Try again later.</p>}
+    </div>
+  )
+}
+
+// The video endpoint supports byte ranges, so the browser only fetches the
+// parts of the match the coach actually watches.
+function MatchVideo({ analysisId }) {
+  const [isOpen, setIsOpen] = useState(false)
+
+  if (!isOpen) {
+    return (
+      <button
+        type="button"
+        onClick={() => setIsOpen(true)}
+        className="rounded-md border border-white/10 px-3 py-1.5 text-xs font-medium text-text hover:border-accent"
+      >
+        Watch match video
+      </button>
+    )
+  }
+
+  return (
+    <video
+      controls
+      preload="metadata"
+      src={`${API_URL}/video-analysis/${analysisId}/video`}
+      className="w-full rounded-md bg-black"
+    />
+  )
+}
+
 function VideoAnalysisCard({ analysis }) {
-  const report = analysis.ai_report_json ? JSON.parse(analysis.ai_report_json) : null
+  const { report, isLoading, loadError, loadReport } = useVideoReport(analysis.id)
 
   return (
     <div className="report-surface report-card space-y-6 rounded-card p-6 border-l-4 border-purple-500">
@@ -63,10 +168,16 @@ function VideoAnalysisCard({ analysis }) {
         </div>
       </header>
 
-      {!report ? (
+      <MatchVideo analysisId={analysis.id} />
+
+      {analysis.degraded && <DegradedNotice analysisId={analysis.id} />}
+
+      {!analysis.has_report ? (
         <div className="text-sm text-muted">
           <p>Video analysis is processing. This is a placeholder - full AI analysis coming soon.</p>
         </div>
+      ) : !report ? (
+        <ShowReportButton isLoading={isLoading} loadError={loadError} onClick={loadReport} />
       ) : (
         <section className="space-y-6 text-sm leading-relaxed text-muted">
           {/* AI Summary - Same format as coach assessment */}
@@ -211,6 +322,11 @@ function ReportCard({ report }) {
             type="psi"
           />
         </div>
+        {payload.degraded && (
+          <p className="text-xs text-amber-200">
+            AI was unavailable when this report was written; scores come from the coach notes. Regenerate it for a full analysis.
+          </p>
+        )}
       </header>
 
       <section className="space-y-4 text-sm leading-relaxed text-muted">
@@ -257,6 +373,195 @@ function List({ title, items }) {
   )
 }
 
+function TeamPerformanceCard({ analysis, players }) {
+  const { report, isLoading, loadError, loadReport } = useVideoReport(analysis.id)
+  const player1 = players.find(p => p.id === analysis.player_id)
+  const player2 = players.find(p => p.id === analysis.partner_id)
+
+  return (
+    <div className="report-surface report-card space-y-6 rounded-card p-6">
+      <header className="space-y-2">
+        <div className="flex flex-wrap items-center gap-2 text-xs text-muted">
+          <span className="font-semibold text-text">
+            {player1?.name || 'Player 1'} & {player2?.name || 'Player 2'}
+          </span>
+          <span>· Session {analysis.session_id}</span>
+          {analysis.date && <span>· {new Date(analysis.date).toLocaleDateString()}</span>}
+          <span>· {analysis.event_type.replace('_', ' ')}</span>
+        </div>
+        <div className="flex flex-wrap gap-2">
+          {analysis.presence_score !== null && (
+            <ScoreBadge label="Presence" value={analysis.presence_score} type="presence" />
+          )}
+          {analysis.skill_score !== null && (
+            <ScoreBadge label="Skill" value={analysis.skill_score} type="skill" />
+          )}
+          {analysis.intent_score !== null && (
+            <ScoreBadge label="Intent" value={analysis.intent_score} type="intent" />
+          )}
+          {analysis.psi_score !== null && (
+            <ScoreBadge
+              label="PSI"
+              value={typeof analysis.psi_score === 'number' ? analysis.psi_score.toFixed(1) : analysis.psi_score}
+              type="psi"
+            />
+          )}
+          {analysis.synergy_score !== null && (
+            <div className="score-badge" style={{ background: 'linear-gradient(135deg, #8b5cf6 0%, #ec4899 100%)' }}>
+              Team Synergy: <span className="font-semibold">{analysis.synergy_score}/10</span>
+            </div>
+          )}
+        </div>
+      </header>
+
+      <MatchVideo analysisId={analysis.id} />
+
+      {analysis.degraded && <DegradedNotice analysisId={analysis.id} />}
+
+      <section className="space-y-6 text-sm leading-relaxed text-muted">
+        {analysis.has_report && !report ? (
+          <ShowReportButton isLoading={isLoading} loadError={loadError} onClick={loadReport} />
+        ) : report ? (
+          <>
+            {/* Team Performance Section */}
+            {report.team_performance && (
+              <div className="border-t border-white/10 pt-4">
+                <h3 className="text-base font-semibold text-accent mb-3">Team Performance</h3>
+                <div className="grid gap-2 text-xs">
+                  {report.team_performance.coordination_rotation && (
+                    <p>• <span className="font-semibold">Coordination & Rotation:</span> {report.team_performance.coordination_rotation}</p>
+                  )}
+                  {report.team_performance.court_coverage_split && (
+                    <p>• <span className="font-semibold">Court Coverage Split:</span> {report.team_performance.court_coverage_split}</p>
+                  )}
+                  {report.team_performance.communication_indicators && (
+                    <p>• <span className="font-semibold">Communication:</span> {report.team_performance.communication_indicators}</p>
+                  )}
+                </div>
+              </div>
+            )}
+
+            {/* Player 1 Analysis */}
+            <div className="border-t border-white/10 pt-4">
+              <h3 className="text-base font-semibold text-text mb-3">{player1?.name || 'Player 1'} - Individual Analysis</h3>
+
+              <div className="space-y-3">
+                <div>
+                  <h4 className="mb-1 text-sm font-semibold text-text">Player evaluation</h4>
+                  <p>{report.player_evaluation || 'Analysis in progress'}</p>
+                </div>
+
+                <div className="grid gap-4 md:grid-cols-2">
+                  <List title="Strengths" items={report.player_strengths || []} />
+                  <List title="Weaknesses" items={report.player_weaknesses || []} />
+                </div>
+
+                {/* Technical Analysis */}
+                {report.technical_analysis && (
+                  <div>
+                    <h4 className="text-sm font-semibold text-accent mb-2">Technical Analysis</h4>
+                    <div className="grid gap-1 text-xs">
+                      {report.technical_analysis.smash_success_rate && (
+                        <p>• Smash: {report.technical_analysis.smash_success_rate}</p>
+                      )}
+                      {report.technical_analysis.drop_shot_precision && (
+                        <p>• Drop shot: {report.technical_analysis.drop_shot_precision}</p>
+                      )}
+                      {report.technical_analysis.net_play_effectiveness && (
+                        <p>• Net play: {report.technical_analysis.net_play_effectiveness}</p>
+                      )}
+                      {report.technical_analysis.unforced_errors && (
+                        <p>• Errors: {report.technical_analysis.unforced_errors}</p>
+                      )}
+                    </div>
+                  </div>
+                )}
+              </div>
+            </div>
+
+            {/* Player 2 Analysis */}
+            {report.partner_evaluation && (
+              <div className="border-t border-white/10 pt-4">
+                <h3 className="text-base font-semibold text-text mb-3">{player2?.name || 'Player 2'} - Individual Analysis</h3>
+
+                <div className="space-y-3">
+                  <div>
+                    <h4 className="mb-1 text-sm font-semibold text-text">Player evaluation</h4>
+                    <p>{report.partner_evaluation}</p>
+                  </div>
+
+                  <div className="grid gap-4 md:grid-cols-2">
+                    <List title="Strengths" items={report.partner_strengths || []} />
+                    <List title="Weaknesses" items={report.partner_weaknesses || []} />
+                  </div>
+                </div>
+              </div>
+            )}
+          </>
+        ) : (
+          <div>
+            <p className="text-muted">
+              Video analysis is being processed. Check back later for detailed insights.
+            </p>
+          </div>
+        )}
+      </section>
+    </div>
+  )
+}
+
+function LoadMoreButton({ loading, onClick }) {
+  return (
+    <div className="flex justify-center">
+      <button
+        type="button"
+        onClick={onClick}
+        disabled={loading}
+        className="rounded-md border border-white/10 px-4 py-2 text-sm font-medium text-muted transition-colors hover:text-text disabled:opacity-60"
+      >
+        {loading ? 'Loading...' : 'Load more'}
+      </button>
+    </div>
+  )
+}
+
+// Aggregates are maintained by the backend, so this is one small request no
+// matter how many sessions the player has.
+function PlayerStatsSummary({ stats }) {
+  if (!stats || stats.sessions === 0) return null
+
+  const psiTrend = stats.trend_slope
+  const trendLabel =
+    psiTrend === null ? '—' : `${psiTrend > 0 ? '▲' : psiTrend < 0 ? '▼' : '■'} ${Math.abs(psiTrend).toFixed(2)} per session`
+
+  return (
+    <div className="report-surface grid gap-3 rounded-card p-5 text-sm text-muted sm:grid-cols-2 lg:grid-cols-4">
+      <div>
+        <p className="text-xs uppercase tracking-wide">Sessions</p>
+        <p className="text-lg font-semibold text-text">{stats.sessions}</p>
+        <p className="text-xs">
+          {stats.evaluations} evaluations · {stats.video_analyses} videos
+        </p>
+      </div>
+      <div>
+        <p className="text-xs uppercase tracking-wide">PSI (last {stats.window})</p>
+        <p className="text-lg font-semibold text-text">{stats.rolling_averages.psi ?? '—'}</p>
+        <p className="text-xs">All-time {stats.averages.psi ?? '—'}</p>
+      </div>
+      <div>
+        <p className="text-xs uppercase tracking-wide">Trend</p>
+        <p className="text-lg font-semibold text-text">{trendLabel}</p>
+      </div>
+      <div>
+        <p className="text-xs uppercase tracking-wide">Best / worst PSI</p>
+        <p className="text-lg font-semibold text-text">
+          {stats.best_session?.psi ?? '—'} / {stats.worst_session?.psi ?? '—'}
+        </p>
+      </div>
+    </div>
+  )
+}
+
 function StudentReports() {
   const location = useLocation()
   const [players, setPlayers] = useState([])
@@ -268,6 +573,12 @@ function StudentReports() {
   const [teamPerformances, setTeamPerformances] = useState([])
   const [loadingTeamPerformances, setLoadingTeamPerformances] = useState(false)
   const [videoAnalyses, setVideoAnalyses] = useState([]) // Video analyses for selected player
+  // Cursors for the next page of each list; null once everything is loaded
+  const [reportsCursor, setReportsCursor] = useState(null)
+  const [videoCursor, setVideoCursor] = useState(null)
+  const [teamCursor, setTeamCursor] = useState(null)
+  const [loadingMore, setLoadingMore] = useState(false)
+  const [playerStats, setPlayerStats] = useState(null)
 
   useEffect(() => {
     const loadPlayers = async () => {
@@ -278,11 +589,9 @@ function StudentReports() {
           return
         }
 
-        const response = await fetch(`${API_URL}/players?coach_username=${coachUsername}`)
-        if (!response.ok) {
-          throw new Error('Unable to load players')
-        }
-        const data = await response.json()
+        const data = await fetchAllPages(`/players?coach_username=${coachUsername}&limit=200`, {
+          errorMessage: 'Unable to load players'
+        })
         setPlayers(data)
       } catch (err) {
         setError(err.message || 'Failed to fetch players')
@@ -306,8 +615,25 @@ function StudentReports() {
     [players, selectedPlayerId]
   )
 
+  useEffect(() => {
+    setPlayerStats(null)
+    if (!selectedPlayerId) return
+    let ignore = false
+    fetch(`${API_URL}/player/${selectedPlayerId}/stats`)
+      .then((response) => (response.ok ? response.json() : null))
+      .then((data) => {
+        if (!ignore) setPlayerStats(data)
+      })
+      .catch(() => {})
+    return () => {
+      ignore = true
+    }
+  }, [selectedPlayerId])
+
   useEffect(() => {
     const loadReports = async () => {
+      setReportsCursor(null)
+      setVideoCursor(null)
       if (!selectedPlayerId) {
         setReports([])
         setVideoAnalyses([])
@@ -316,19 +642,18 @@ function StudentReports() {
       setLoading(true)
       setError('')
       try {
-        // Load text-based evaluations
-        const response = await fetch(`${API_URL}/player/${selectedPlayerId}/history`)
-        if (!response.ok) {
-          throw new Error('Unable to load reports')
-        }
-        const data = await response.json()
-        setReports(data)
-
-        // Load video analyses for this player
-        const videoResponse = await fetch(`${API_URL}/player/${selectedPlayerId}/video-analyses`)
-        if (videoResponse.ok) {
-          const videoData = await videoResponse.json()
-          setVideoAnalyses(videoData)
+        // Load the first page of text-based evaluations
+        const page = await fetchPage(`/player/${selectedPlayerId}/history`, {
+          errorMessage: 'Unable to load reports'
+        })
+        setReports(page.items)
+        setReportsCursor(page.cursor)
+
+        // Load the first page of video analyses for this player
+        const videoPage = await fetchPage(`/player/${selectedPlayerId}/video-analyses`).catch(() => null)
+        if (videoPage) {
+          setVideoAnalyses(videoPage.items)
+          setVideoCursor(videoPage.cursor)
         }
       } catch (err) {
         setError(err.message || 'Failed to fetch reports')
@@ -342,6 +667,32 @@ function StudentReports() {
     loadReports()
   }, [selectedPlayerId])
 
+  const loadMoreReports = async () => {
+    setLoadingMore(true)
+    try {
+      const [page, videoPage] = await Promise.all([
+        reportsCursor &&
+          fetchPage(`/player/${selectedPlayerId}/history`, {
+            cursor: reportsCursor,
+            errorMessage: 'Unable to load reports'
+          }),
+        videoCursor && fetchPage(`/player/${selectedPlayerId}/video-analyses`, { cursor: videoCursor })
+      ])
+      if (page) {
+        setReports((current) => [...current, ...page.items])
+        setReportsCursor(page.cursor)
+      }
+      if (videoPage) {
+        setVideoAnalyses((current) => [...current, ...videoPage.items])
+        setVideoCursor(videoPage.cursor)
+      }
+    } catch (err) {
+      setError(err.message || 'Failed to fetch reports')
+    } finally {
+      setLoadingMore(false)
+    }
+  }
+
   // Scroll to specific evaluation if navigated from Dashboard
   useEffect(() => {
     const selectedEvaluationId = location.state?.selectedEvaluationId
@@ -371,15 +722,15 @@ function StudentReports() {
           return
         }
 
-        const response = await fetch(`${API_URL}/team-performances?coach_username=${coachUsername}`)
-        if (!response.ok) {
-          throw new Error('Unable to load team performances')
-        }
-        const data = await response.json()
-        setTeamPerformances(data)
+        const page = await fetchPage(`/team-performances?coach_username=${coachUsername}`, {
+          errorMessage: 'Unable to load team performances'
+        })
+        setTeamPerformances(page.items)
+        setTeamCursor(page.cursor)
       } catch (err) {
         setError(err.message || 'Failed to fetch team performances')
         setTeamPerformances([])
+        setTeamCursor(null)
       } finally {
         setLoadingTeamPerformances(false)
       }
@@ -388,6 +739,23 @@ function StudentReports() {
     loadTeamPerformances()
   }, [activeTab])
 
+  const loadMoreTeamPerformances = async () => {
+    setLoadingMore(true)
+    try {
+      const coachUsername = localStorage.getItem('coach')
+      const page = await fetchPage(`/team-performances?coach_username=${coachUsername}`, {
+        cursor: teamCursor,
+        errorMessage: 'Unable to load team performances'
+      })
+      setTeamPerformances((current) => [...current, ...page.items])
+      setTeamCursor(page.cursor)
+    } catch (err) {
+      setError(err.message || 'Failed to fetch team performances')
+    } finally {
+      setLoadingMore(false)
+    }
+  }
+
   return (
     <AppShell showProtectedNav>
       <div className="space-y-10">
@@ -465,6 +833,8 @@ function StudentReports() {
                 )}
               </div>
 
+              <PlayerStatsSummary stats={playerStats} />
+
               {loading ? (
                 <div className="report-surface rounded-card p-6 text-sm text-muted">
                   Loading reports...
@@ -485,6 +855,9 @@ function StudentReports() {
                   {reports.map((report) => (
                     <ReportCard key={`report-${report.id}`} report={report} />
                   ))}
+                  {(reportsCursor || videoCursor) && (
+                    <LoadMoreButton loading={loadingMore} onClick={loadMoreReports} />
+                  )}
                 </div>
               )}
             </section>
@@ -511,138 +884,10 @@ function StudentReports() {
               </div>
             ) : (
               <div className="space-y-6">
-                {teamPerformances.map((analysis) => {
-                  const player1 = players.find(p => p.id === analysis.player_id)
-                  const player2 = players.find(p => p.id === analysis.partner_id)
-
-                  return (
-                    <div key={analysis.id} className="report-surface report-card space-y-6 rounded-card p-6">
-                      <header className="space-y-2">
-                        <div className="flex flex-wrap items-center gap-2 text-xs text-muted">
-                          <span className="font-semibold text-text">
-                            {player1?.name || 'Player 1'} & {player2?.name || 'Player 2'}
-                          </span>
-                          <span>· Session {analysis.session_id}</span>
-                          {analysis.date && <span>· {new Date(analysis.date).toLocaleDateString()}</span>}
-                          <span>· {analysis.event_type.replace('_', ' ')}</span>
-                        </div>
-                        <div className="flex flex-wrap gap-2">
-                          {analysis.presence_score !== null && (
-                            <ScoreBadge label="Presence" value={analysis.presence_score} type="presence" />
-                          )}
-                          {analysis.skill_score !== null && (
-                            <ScoreBadge label="Skill" value={analysis.skill_score} type="skill" />
-                          )}
-                          {analysis.intent_score !== null && (
-                            <ScoreBadge label="Intent" value={analysis.intent_score} type="intent" />
-                          )}
-                          {analysis.psi_score !== null && (
-                            <ScoreBadge
-                              label="PSI"
-                              value={typeof analysis.psi_score === 'number' ? analysis.psi_score.toFixed(1) : analysis.psi_score}
-                              type="psi"
-                            />
-                          )}
-                          {analysis.synergy_score !== null && (
-                            <div className="score-badge" style={{ background: 'linear-gradient(135deg, #8b5cf6 0%, #ec4899 100%)' }}>
-                              Team Synergy: <span className="font-semibold">{analysis.synergy_score}/10</span>
-                            </div>
-                          )}
-                        </div>
-                      </header>
-
-                      <section className="space-y-6 text-sm leading-relaxed text-muted">
-                        {analysis.ai_report_json ? (() => {
-                          const report = JSON.parse(analysis.ai_report_json)
-                          return (
-                            <>
-                              {/* Team Performance Section */}
-                              {report.team_performance && (
-                                <div className="border-t border-white/10 pt-4">
-                                  <h3 className="text-base font-semibold text-accent mb-3">Team Performance</h3>
-                                  <div className="grid gap-2 text-xs">
-                                    {report.team_performance.coordination_rotation && (
-                                      <p>• <span className="font-semibold">Coordination & Rotation:</span> {report.team_performance.coordination_rotation}</p>
-                                    )}
-                                    {report.team_performance.court_coverage_split && (
-                                      <p>• <span className="font-semibold">Court Coverage Split:</span> {report.team_performance.court_coverage_split}</p>
-                                    )}
-                                    {report.team_performance.communication_indicators && (
-                                      <p>• <span className="font-semibold">Communication:</span> {report.team_performance.communication_indicators}</p>
-                                    )}
-                                  </div>
-                                </div>
-                              )}
-
-                              {/* Player 1 Analysis */}
-                              <div className="border-t border-white/10 pt-4">
-                                <h3 className="text-base font-semibold text-text mb-3">{player1?.name || 'Player 1'} - Individual Analysis</h3>
-
-                                <div className="space-y-3">
-                                  <div>
-                                    <h4 className="mb-1 text-sm font-semibold text-text">Player evaluation</h4>
-                                    <p>{report.player_evaluation || 'Analysis in progress'}</p>
-                                  </div>
-
-                                  <div className="grid gap-4 md:grid-cols-2">
-                                    <List title="Strengths" items={report.player_strengths || []} />
-                                    <List title="Weaknesses" items={report.player_weaknesses || []} />
-                                  </div>
-
-                                  {/* Technical Analysis */}
-                                  {report.technical_analysis && (
-                                    <div>
-                                      <h4 className="text-sm font-semibold text-accent mb-2">Technical Analysis</h4>
-                                      <div className="grid gap-1 text-xs">
-                                        {report.technical_analysis.smash_success_rate && (
-                                          <p>• Smash: {report.technical_analysis.smash_success_rate}</p>
-                                        )}
-                                        {report.technical_analysis.drop_shot_precision && (
-                                          <p>• Drop shot: {report.technical_analysis.drop_shot_precision}</p>
-                                        )}
-                                        {report.technical_analysis.net_play_effectiveness && (
-                                          <p>• Net play: {report.technical_analysis.net_play_effectiveness}</p>
-                                        )}
-                                        {report.technical_analysis.unforced_errors && (
-                                          <p>• Errors: {report.technical_analysis.unforced_errors}</p>
-                                        )}
-                                      </div>
-                                    </div>
-                                  )}
-                                </div>
-                              </div>
-
-                              {/* Player 2 Analysis */}
-                              {report.partner_evaluation && (
-                                <div className="border-t border-white/10 pt-4">
-                                  <h3 className="text-base font-semibold text-text mb-3">{player2?.name || 'Player 2'} - Individual Analysis</h3>
-
-                                  <div className="space-y-3">
-                                    <div>
-                                      <h4 className="mb-1 text-sm font-semibold text-text">Player evaluation</h4>
-                                      <p>{report.partner_evaluation}</p>
-                                    </div>
-
-                                    <div className="grid gap-4 md:grid-cols-2">
-                                      <List title="Strengths" items={report.partner_strengths || []} />
-                                      <List title="Weaknesses" items={report.partner_weaknesses || []} />
-                                    </div>
-                                  </div>
-                                </div>
-                              )}
-                            </>
-                          )
-                        })() : (
-                          <div>
-                            <p className="text-muted">
-                              Video analysis is being processed. Check back later for detailed insights.
-                            </p>
-                          </div>
-                        )}
-                      </section>
-                    </div>
-                  )
-                })}
+                {teamPerformances.map((analysis) => (
+                  <TeamPerformanceCard key={analysis.id} analysis={analysis} players={players} />
+                ))}
+                {teamCursor && <LoadMoreButton loading={loadingMore} onClick={loadMoreTeamPerformances} />}
               </div>
             )}
           </div>